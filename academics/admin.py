@@ -7,10 +7,10 @@ from .models import Course, Enrollment, Assignment, AssignmentSubmission, Attend
 # -------------------------------------
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
-    list_display = ['code', 'title', 'tutor', 'credit_hours', 'is_active', 'created_at']
+    list_display = ['code', 'title', 'tutor', 'credit_hours', 'enrollment_count', 'is_active', 'created_at']
     list_filter = ['is_active', 'credit_hours', 'created_at']
     search_fields = ['code', 'title', 'description', 'tutor']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['enrollment_count', 'created_at', 'updated_at']
     
 
     fieldsets = (
@@ -21,7 +21,7 @@ class CourseAdmin(admin.ModelAdmin):
             'fields': ('tutor', 'credit_hours')
         }),
         ('Status', {
-            'fields': ('is_active',)
+            'fields': ('is_active', 'enrollment_count')
         }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at'),
@@ -0,0 +1,137 @@
+# academics/counters.py
+"""
+Denormalized per-record counters, e.g. the enrolled students of a course,
+the graded submissions of an assignment or the late students of a class. Model signals adjust them with
+relative updates, so lists and dashboards read columns instead of counting
+related rows; ``reconcile_*`` recounts and repairs any drift left by bulk
+updates or deletes that bypass signals, or by saving a record whose loaded
+counters were already stale. The counters are not editable, so serializers
+never write them.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from .models import Course, Assignment, ClassSchedule
+
+# Enrollments with this status count towards Course.enrollment_count
+ENROLLED = 'enrolled'
+
+# Submission status -> Assignment counter of submissions in that status
+SUBMISSION_STATUS_COUNTERS = {
+    'submitted': 'submitted_count',
+    'graded': 'graded_count',
+    'late': 'late_count',
+    'missing': 'missing_count',
+}
+
+# Attendance status -> ClassSchedule counter of records in that status
+ATTENDANCE_STATUS_COUNTERS = {
+    'present': 'present_count',
+    'late': 'late_count',
+    'absent': 'absent_count',
+    'excused': 'excused_count',
+}
+
+
+def _adjust(model, deltas):
+    """
+    Apply ``deltas`` (pk -> {counter: change}) with relative updates. A
+    counter that drifted low stops at 0 rather than failing the write.
+    """
+    for pk, changes in deltas.items():
+        changes = {counter: Greatest(F(counter) + delta, 0) for counter, delta in changes.items() if delta}
+        if changes:
+            model.objects.filter(pk=pk).update(**changes)
+
+
+def _reconcile(model, actual):
+    """
+    Compare the counters of every ``model`` row with ``actual`` (counter ->
+    aggregate expression) and correct the ones that drifted. Returns the
+    drift, as pk -> {counter: stored minus actual value}.
+    """
+    rows = model.objects.annotate(**{f'actual_{counter}': expression for counter, expression in actual.items()})
+    drift = {}
+    for row in rows.values('pk', *actual, *(f'actual_{counter}' for counter in actual)):
+        differences = {
+            counter: row[counter] - row[f'actual_{counter}']
+            for counter in actual if row[counter] != row[f'actual_{counter}']
+        }
+        if differences:
+            drift[row['pk']] = differences
+    # Relative, so records changing meanwhile are not overwritten
+    _adjust(model, {
+        pk: {counter: -difference for counter, difference in differences.items()}
+        for pk, differences in drift.items()
+    })
+    return drift
+
+
+def record_enrollment_change(previous, current):
+    """
+    Move an enrollment from ``previous`` to ``current``, each a
+    ``(course_id, status)`` pair or None when the enrollment is absent
+    """
+    deltas = defaultdict(Counter)
+    if previous is not None and previous[1] == ENROLLED:
+        deltas[previous[0]]['enrollment_count'] -= 1
+    if current is not None and current[1] == ENROLLED:
+        deltas[current[0]]['enrollment_count'] += 1
+    _adjust(Course, deltas)
+
+
+def record_submission_change(previous, current):
+    """
+    Move a submission from ``previous`` to ``current``, each an
+    ``(assignment_id, status, graded)`` triple or None when the submission
+    is absent
+    """
+    deltas = defaultdict(Counter)
+    for record, sign in ((previous, -1), (current, 1)):
+        if record is None:
+            continue
+        assignment_id, status, graded = record
+        deltas[assignment_id]['submission_count'] += sign
+        if status in SUBMISSION_STATUS_COUNTERS:
+            deltas[assignment_id][SUBMISSION_STATUS_COUNTERS[status]] += sign
+        if not graded:
+            deltas[assignment_id]['pending_count'] += sign
+    _adjust(Assignment, deltas)
+
+
+def record_attendance_change(previous, current):
+    """
+    Move an attendance record from ``previous`` to ``current``, each a
+    ``(class_schedule_id, status)`` pair or None when the record is absent
+    """
+    deltas = defaultdict(Counter)
+    for record, sign in ((previous, -1), (current, 1)):
+        if record is not None and record[1] in ATTENDANCE_STATUS_COUNTERS:
+            deltas[record[0]][ATTENDANCE_STATUS_COUNTERS[record[1]]] += sign
+    _adjust(ClassSchedule, deltas)
+
+
+def reconcile_enrollment_counts():
+    return _reconcile(Course, {
+        'enrollment_count': Count('enrollments', filter=Q(enrollments__status=ENROLLED)),
+    })
+
+
+def reconcile_submission_counts():
+    return _reconcile(Assignment, {
+        'submission_count': Count('submissions'),
+        'pending_count': Count('submissions', filter=Q(submissions__grade__isnull=True)),
+        **{
+            counter: Count('submissions', filter=Q(submissions__status=status))
+            for status, counter in SUBMISSION_STATUS_COUNTERS.items()
+        },
+    })
+
+
+def reconcile_attendance_counts():
+    return _reconcile(ClassSchedule, {
+        counter: Count('attendances', filter=Q(attendances__status=status))
+        for status, counter in ATTENDANCE_STATUS_COUNTERS.items()
+    })
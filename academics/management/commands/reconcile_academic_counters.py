@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from academics import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the denormalized course, assignment and class counters and repair any drift. "
+        "Schedule it periodically, e.g. nightly from cron."
+    )
+
+    def handle(self, *args, **options):
+        for label, reconcile in (
+            ('Course', counters.reconcile_enrollment_counts),
+            ('Assignment', counters.reconcile_submission_counts),
+            ('ClassSchedule', counters.reconcile_attendance_counts),
+        ):
+            drift = reconcile()
+            for pk, differences in drift.items():
+                for counter, difference in differences.items():
+                    self.stdout.write(self.style.WARNING(f"{label} {pk}: {counter} was off by {difference:+d}"))
+            self.stdout.write(self.style.SUCCESS(f"{label} counters reconciled, {len(drift)} record(s) corrected"))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_enrollments(apps, schema_editor):
+    Course = apps.get_model('academics', 'Course')
+    courses = Course.objects.annotate(enrolled=Count('enrollments', filter=Q(enrollments__status='enrolled')))
+    for course in courses:
+        if course.enrolled:
+            Course.objects.filter(pk=course.pk).update(enrollment_count=course.enrolled)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0005_assignment_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='enrollment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Students currently enrolled, kept current by signals'),
+        ),
+        migrations.AlterField(
+            model_name='enrollment',
+            name='course',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollments', to='academics.course'),
+        ),
+        migrations.RunPython(count_enrollments, migrations.RunPython.noop),
+    ]
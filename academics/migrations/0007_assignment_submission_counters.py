@@ -0,0 +1,55 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:59
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+STATUS_COUNTERS = {'submitted': 'submitted_count', 'graded': 'graded_count', 'late': 'late_count', 'missing': 'missing_count'}
+
+
+def count_submissions(apps, schema_editor):
+    Assignment = apps.get_model('academics', 'Assignment')
+    assignments = Assignment.objects.annotate(
+        counted_submissions=Count('submissions'),
+        **{f'counted_{counter}': Count('submissions', filter=Q(submissions__status=value)) for value, counter in STATUS_COUNTERS.items()},
+    ).filter(counted_submissions__gt=0)
+    for assignment in assignments:
+        Assignment.objects.filter(pk=assignment.pk).update(
+            submission_count=assignment.counted_submissions,
+            **{counter: getattr(assignment, f'counted_{counter}') for counter in STATUS_COUNTERS.values()},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_course_enrollment_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='graded_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='late_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='missing_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='assignment',
+            name='submitted_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_submissions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:00
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+STATUS_COUNTERS = {'present': 'present_count', 'late': 'late_count', 'absent': 'absent_count', 'excused': 'excused_count'}
+
+
+def count_attendances(apps, schema_editor):
+    ClassSchedule = apps.get_model('academics', 'ClassSchedule')
+    schedules = ClassSchedule.objects.annotate(
+        recorded=Count('attendances'),
+        **{f'counted_{counter}': Count('attendances', filter=Q(attendances__status=value)) for value, counter in STATUS_COUNTERS.items()},
+    ).filter(recorded__gt=0)
+    for schedule in schedules:
+        ClassSchedule.objects.filter(pk=schedule.pk).update(
+            **{counter: getattr(schedule, f'counted_{counter}') for counter in STATUS_COUNTERS.values()}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_assignment_submission_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classschedule',
+            name='absent_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='classschedule',
+            name='excused_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='classschedule',
+            name='late_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='classschedule',
+            name='present_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_attendances, migrations.RunPython.noop),
+    ]
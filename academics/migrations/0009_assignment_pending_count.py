@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:34
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_pending(apps, schema_editor):
+    Assignment = apps.get_model('academics', 'Assignment')
+    assignments = Assignment.objects.annotate(
+        pending=Count('submissions', filter=Q(submissions__grade__isnull=True)),
+    ).filter(pending__gt=0)
+    for assignment in assignments:
+        Assignment.objects.filter(pk=assignment.pk).update(pending_count=assignment.pending)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0008_classschedule_attendance_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_pending, migrations.RunPython.noop),
+    ]
@@ -16,6 +16,7 @@ class Course(models.Model):
     subject = models.CharField(max_length=255, blank=True, null=True)
     is_active = models.BooleanField(default=True)
     max_students = models.IntegerField(default=50)
+    enrollment_count = models.PositiveIntegerField(default=0, editable=False, help_text="Students currently enrolled, kept current by signals")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -28,7 +29,7 @@ class Course(models.Model):
 # -------------------------------------
 class Enrollment(models.Model):
     student = models.ForeignKey(CustomUser, on_delete=models.CASCADE, limit_choices_to={"role": "student"})
-    course = models.ForeignKey(Course, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='enrollments')
     enrolled_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, choices=[
         ('enrolled', 'Enrolled'),
@@ -68,6 +69,13 @@ class Assignment(models.Model):
     ], default='homework')
     attachment_url = models.URLField(blank=True, null=True)
     instructions = models.TextField(blank=True, null=True)
+    # Submissions in total, per status and without a grade, kept current by signals
+    submission_count = models.PositiveIntegerField(default=0, editable=False)
+    submitted_count = models.PositiveIntegerField(default=0, editable=False)
+    graded_count = models.PositiveIntegerField(default=0, editable=False)
+    late_count = models.PositiveIntegerField(default=0, editable=False)
+    missing_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.title
@@ -166,6 +174,11 @@ class ClassSchedule(models.Model):
         ('presentation', 'Presentation')
     ], default='lecture')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Attendance records per status, kept current by signals
+    present_count = models.PositiveIntegerField(default=0, editable=False)
+    late_count = models.PositiveIntegerField(default=0, editable=False)
+    absent_count = models.PositiveIntegerField(default=0, editable=False)
+    excused_count = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.title} - {self.scheduled_date}"
@@ -5,22 +5,25 @@ from .models import (
     AdminTutorAssignment, AdminStudentAssignment, ClassSchedule, TutorPerformance
 )
 from users.models import CustomUser
+from users.serializers import PublicUserSerializer
+from config.excerpts import ExcerptField
+from config.sparse import SparseFieldsetsMixin
 
+# Columns of a user sent in the ``included`` section of compact responses
+USER_SUMMARY_FIELDS = ['username', 'first_name', 'last_name']
 
-class CourseSerializer(serializers.ModelSerializer):
+
+class CourseSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     tutor_name = serializers.CharField(source='tutor.username', read_only=True)
-    enrollment_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Course
         fields = "__all__"
-        read_only_fields = ["id", "created_at", "updated_at"]
-    
-    def get_enrollment_count(self, obj):
-        return obj.enrollments.filter(status='enrolled').count()
+        read_only_fields = ["id", "enrollment_count", "created_at", "updated_at"]
+        expandable_fields = {'tutor': PublicUserSerializer}
 
 
-class EnrollmentSerializer(serializers.ModelSerializer):
+class EnrollmentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.username', read_only=True)
     course_title = serializers.CharField(source='course.title', read_only=True)
     course_code = serializers.CharField(source='course.code', read_only=True)
@@ -29,23 +32,31 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         model = Enrollment
         fields = "__all__"
         read_only_fields = ["id", "enrolled_at"]
+        expandable_fields = {'student': PublicUserSerializer, 'course': CourseSerializer}
+        sideload_fields = {'student': ('users', USER_SUMMARY_FIELDS), 'course': ('courses', ['code', 'title'])}
 
 
-class AssignmentSerializer(serializers.ModelSerializer):
+class AssignmentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     tutor_name = serializers.CharField(source='tutor.username', read_only=True)
     course_title = serializers.CharField(source='course.title', read_only=True)
-    submission_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Assignment
         fields = "__all__"
         read_only_fields = ["id", "created_at"]
-    
-    def get_submission_count(self, obj):
-        return obj.submissions.count()
+        expandable_fields = {'course': CourseSerializer, 'tutor': PublicUserSerializer}
+
+
+class AssignmentListSerializer(AssignmentSerializer):
+    """Assignments in lists, with an excerpt instead of the full instructions"""
+    instructions_excerpt = ExcerptField('instructions')
 
+    class Meta(AssignmentSerializer.Meta):
+        fields = None
+        exclude = ['instructions']
 
-class AssignmentSubmissionSerializer(serializers.ModelSerializer):
+
+class AssignmentSubmissionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.username', read_only=True)
     assignment_title = serializers.CharField(source='assignment.title', read_only=True)
     graded_by_name = serializers.CharField(source='graded_by.username', read_only=True)
@@ -54,6 +65,12 @@ class AssignmentSubmissionSerializer(serializers.ModelSerializer):
         model = AssignmentSubmission
         fields = "__all__"
         read_only_fields = ["id", "submitted_at", "graded_at"]
+        expandable_fields = {'assignment': AssignmentSerializer, 'student': PublicUserSerializer, 'graded_by': PublicUserSerializer}
+        sideload_fields = {
+            'assignment': ('assignments', ['title', 'due_date', 'course']),
+            'student': ('users', USER_SUMMARY_FIELDS),
+            'graded_by': ('users', USER_SUMMARY_FIELDS),
+        }
     
     def validate(self, data):
         # Only tutors can grade submissions
@@ -62,7 +79,16 @@ class AssignmentSubmissionSerializer(serializers.ModelSerializer):
         return data
 
 
-class AdminTutorAssignmentSerializer(serializers.ModelSerializer):
+class AssignmentSubmissionListSerializer(AssignmentSubmissionSerializer):
+    """Submissions in lists, with an excerpt instead of the submitted text"""
+    submitted_content_excerpt = ExcerptField('submitted_content')
+
+    class Meta(AssignmentSubmissionSerializer.Meta):
+        fields = None
+        exclude = ['submitted_content']
+
+
+class AdminTutorAssignmentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     admin_name = serializers.CharField(source='admin.username', read_only=True)
     tutor_name = serializers.CharField(source='tutor.username', read_only=True)
     
@@ -70,9 +96,10 @@ class AdminTutorAssignmentSerializer(serializers.ModelSerializer):
         model = AdminTutorAssignment
         fields = "__all__"
         read_only_fields = ["id", "assigned_date"]
+        expandable_fields = {'admin': PublicUserSerializer, 'tutor': PublicUserSerializer}
 
 
-class AdminStudentAssignmentSerializer(serializers.ModelSerializer):
+class AdminStudentAssignmentSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     admin_name = serializers.CharField(source='admin.username', read_only=True)
     student_name = serializers.CharField(source='student.username', read_only=True)
     
@@ -80,23 +107,38 @@ class AdminStudentAssignmentSerializer(serializers.ModelSerializer):
         model = AdminStudentAssignment
         fields = "__all__"
         read_only_fields = ["id", "assigned_date"]
+        expandable_fields = {'admin': PublicUserSerializer, 'student': PublicUserSerializer}
 
 
-class ClassScheduleSerializer(serializers.ModelSerializer):
+class ClassScheduleSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     tutor_name = serializers.CharField(source='tutor.username', read_only=True)
     course_title = serializers.CharField(source='course.title', read_only=True)
-    attendance_count = serializers.SerializerMethodField()
+    attendance_count = serializers.IntegerField(source='present_count', read_only=True)
+    attendance_summary = serializers.SerializerMethodField()
     
     class Meta:
         model = ClassSchedule
         fields = "__all__"
         read_only_fields = ["id", "created_at"]
+        expandable_fields = {'course': CourseSerializer, 'tutor': PublicUserSerializer}
+        field_sources = {
+            'attendance_summary': [
+                'present_count', 'late_count', 'absent_count', 'excused_count', 'course', 'course__enrollment_count'
+            ],
+        }
     
-    def get_attendance_count(self, obj):
-        return obj.attendances.filter(status='present').count()
+    def get_attendance_summary(self, obj):
+        """Attendance records per status and the headcount expected from the course's enrollments"""
+        counts = {
+            'present': obj.present_count,
+            'late': obj.late_count,
+            'absent': obj.absent_count,
+            'excused': obj.excused_count,
+        }
+        return {**counts, 'recorded': sum(counts.values()), 'expected': obj.course.enrollment_count}
 
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.username', read_only=True)
     class_title = serializers.CharField(source='class_schedule.title', read_only=True)
     
@@ -104,15 +146,21 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = "__all__"
         read_only_fields = ["id", "attended_at"]
+        expandable_fields = {'class_schedule': ClassScheduleSerializer, 'student': PublicUserSerializer}
+        sideload_fields = {
+            'class_schedule': ('class_schedules', ['title', 'scheduled_date', 'course']),
+            'student': ('users', USER_SUMMARY_FIELDS),
+        }
 
 
-class TutorPerformanceSerializer(serializers.ModelSerializer):
+class TutorPerformanceSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     tutor_name = serializers.CharField(source='tutor.username', read_only=True)
     
     class Meta:
         model = TutorPerformance
         fields = "__all__"
         read_only_fields = ["id", "created_at"]
+        expandable_fields = {'tutor': PublicUserSerializer}
 
 
 # Dashboard Analytics Serializers
@@ -147,6 +195,46 @@ class AdminDashboardSerializer(serializers.Serializer):
     system_health = serializers.DictField()
 
 
+class AdminTutorManagementSerializer(serializers.Serializer):
+    """Tutor row of the admin management list, read from annotations"""
+    id = serializers.IntegerField()
+    username = serializers.CharField()
+    email = serializers.EmailField()
+    department = serializers.CharField()
+    subjects = serializers.CharField()
+    courses_taught = serializers.IntegerField()
+    students_managed = serializers.IntegerField()
+    avg_rating = serializers.FloatField()
+    attendance_rate = serializers.FloatField()
+    status = serializers.SerializerMethodField()
+
+    def get_status(self, obj):
+        return 'active'  # Could be dynamic based on assignments
+
+
+class AdminStudentManagementSerializer(serializers.Serializer):
+    """Student row of the admin management list, read from annotations"""
+    id = serializers.IntegerField()
+    username = serializers.CharField()
+    email = serializers.EmailField()
+    student_number = serializers.CharField()
+    course_of_study = serializers.CharField()
+    admission_year = serializers.SerializerMethodField()
+    courses_enrolled = serializers.IntegerField()
+    completed_courses = serializers.IntegerField()
+    progress_rate = serializers.SerializerMethodField()
+    recent_submissions = serializers.IntegerField()
+    status = serializers.CharField()
+
+    def get_admission_year(self, obj):
+        return obj['admission_year'] or 'N/A'
+
+    def get_progress_rate(self, obj):
+        if not obj['courses_enrolled']:
+            return 0.0
+        return obj['completed_courses'] / obj['courses_enrolled'] * 100
+
+
 # Detailed serializers with nested relationships
 class DetailedCourseSerializer(serializers.ModelSerializer):
     tutor = serializers.StringRelatedField()
@@ -0,0 +1,70 @@
+from django.db.models.signals import post_save, post_delete
+
+from config.tracking import track_previous_values, previous_values
+from . import counters
+from .models import Enrollment, AssignmentSubmission, Attendance
+
+
+def count_course_enrollment(sender, instance, created=False, raw=False, **kwargs):
+    """Keep Course.enrollment_count current"""
+    if raw:
+        return
+    current = (instance.course_id, instance.status)
+    if created:
+        counters.record_enrollment_change(None, current)
+        return
+    previous = previous_values(instance)
+    if previous is not None and (previous['course'], previous['status']) != current:
+        counters.record_enrollment_change((previous['course'], previous['status']), current)
+
+
+def uncount_course_enrollment(sender, instance, **kwargs):
+    counters.record_enrollment_change((instance.course_id, instance.status), None)
+
+
+def count_submission(sender, instance, created=False, raw=False, **kwargs):
+    """Keep the submission counters of the assignment current"""
+    if raw:
+        return
+    current = (instance.assignment_id, instance.status, instance.grade is not None)
+    if created:
+        counters.record_submission_change(None, current)
+        return
+    previous = previous_values(instance)
+    if previous is None:
+        return
+    previous = (previous['assignment'], previous['status'], previous['grade'] is not None)
+    if previous != current:
+        counters.record_submission_change(previous, current)
+
+
+def uncount_submission(sender, instance, **kwargs):
+    counters.record_submission_change((instance.assignment_id, instance.status, instance.grade is not None), None)
+
+
+def count_attendance(sender, instance, created=False, raw=False, **kwargs):
+    """Keep the attendance counters of the class current"""
+    if raw:
+        return
+    current = (instance.class_schedule_id, instance.status)
+    if created:
+        counters.record_attendance_change(None, current)
+        return
+    previous = previous_values(instance)
+    if previous is not None and (previous['class_schedule'], previous['status']) != current:
+        counters.record_attendance_change((previous['class_schedule'], previous['status']), current)
+
+
+def uncount_attendance(sender, instance, **kwargs):
+    counters.record_attendance_change((instance.class_schedule_id, instance.status), None)
+
+
+track_previous_values(Enrollment, ['course', 'status'])
+post_save.connect(count_course_enrollment, sender=Enrollment, dispatch_uid='course_enrollment_save')
+post_delete.connect(uncount_course_enrollment, sender=Enrollment, dispatch_uid='course_enrollment_delete')
+track_previous_values(AssignmentSubmission, ['assignment', 'status', 'grade'])
+post_save.connect(count_submission, sender=AssignmentSubmission, dispatch_uid='assignment_submission_save')
+post_delete.connect(uncount_submission, sender=AssignmentSubmission, dispatch_uid='assignment_submission_delete')
+track_previous_values(Attendance, ['class_schedule', 'status'])
+post_save.connect(count_attendance, sender=Attendance, dispatch_uid='class_attendance_save')
+post_delete.connect(uncount_attendance, sender=Attendance, dispatch_uid='class_attendance_delete')
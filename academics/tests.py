@@ -1,3 +1,513 @@
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+import json
+
+from django.apps import apps
+from django.core.management import call_command
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from communication.search.backends import search_documents
+
+from users.models import CustomUser, StudentProfile, TutorProfile
+from . import counters
+from .models import Assignment, AssignmentSubmission, Attendance, ClassSchedule, Course, Enrollment, TutorPerformance
+
+
+class CourseSearchIndexTests(APITestCase):
+    def search(self, query):
+        return [course.code for course, highlights in search_documents('course', query)[0]]
+
+    def test_signals_maintain_the_index(self):
+        course = Course.objects.create(code='PHY101', title='Mechanics', description='', subject='Physics')
+        self.assertEqual(self.search('mechan'), ['PHY101'])
+
+        course.is_active = False
+        course.save()
+        self.assertEqual(self.search('mechan'), [])
+
+        course.is_active = True
+        course.title = 'Thermodynamics'
+        course.save()
+        self.assertEqual(self.search('thermo'), ['PHY101'])
+
+        course.delete()
+        self.assertEqual(self.search('thermo'), [])
+
+
+def run_backfill(migration, function):
+    """Run a data migration's backfill against the current models"""
+    getattr(import_module(f'academics.migrations.{migration}'), function)(apps, None)
+
+
+class CourseEnrollmentCounterTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(code='C1', title='Course', description='', subject='Maths')
+        self.other = Course.objects.create(code='C2', title='Course', description='', subject='Maths')
+        self.students = [
+            CustomUser.objects.create_user(username=f'student{i}', email=f's{i}@example.com', role='student')
+            for i in range(3)
+        ]
+
+    def counts(self):
+        return [course.enrollment_count for course in Course.objects.order_by('code')]
+
+    def test_signals_maintain_the_count(self):
+        first, second = [Enrollment.objects.create(student=student, course=self.course) for student in self.students[:2]]
+        self.assertEqual(self.counts(), [2, 0])
+
+        first.status = 'dropped'
+        first.save()
+        self.assertEqual(self.counts(), [1, 0])
+        first.status = 'enrolled'
+        first.save()
+        self.assertEqual(self.counts(), [2, 0])
+
+        second.course = self.other
+        second.save()
+        self.assertEqual(self.counts(), [1, 1])
+
+        first.delete()
+        self.assertEqual(self.counts(), [0, 1])
+
+    def test_drifted_counter_stops_at_zero(self):
+        enrollment = Enrollment.objects.create(student=self.students[0], course=self.course)
+        Course.objects.filter(pk=self.course.pk).update(enrollment_count=0)
+        enrollment.delete()
+        self.assertEqual(self.counts(), [0, 0])
+
+    def test_reconcile_repairs_drift(self):
+        for student in self.students:
+            Enrollment.objects.create(student=student, course=self.course)
+        Course.objects.filter(pk=self.course.pk).update(enrollment_count=7)
+        self.assertEqual(counters.reconcile_enrollment_counts(), {self.course.pk: {'enrollment_count': 4}})
+        self.assertEqual(self.counts(), [3, 0])
+        self.assertEqual(counters.reconcile_enrollment_counts(), {})
+
+    def test_migration_backfills_existing_enrollments(self):
+        Enrollment.objects.bulk_create([
+            Enrollment(student=self.students[0], course=self.course),
+            Enrollment(student=self.students[1], course=self.course),
+            Enrollment(student=self.students[2], course=self.course, status='dropped'),
+        ])
+        self.assertEqual(self.counts(), [0, 0])
+        run_backfill('0006_course_enrollment_count', 'count_enrollments')
+        self.assertEqual(self.counts(), [2, 0])
+
+    def test_reconcile_command(self):
+        Enrollment.objects.create(student=self.students[0], course=self.course)
+        Course.objects.filter(pk=self.course.pk).update(enrollment_count=0)
+        out = StringIO()
+        call_command('reconcile_academic_counters', stdout=out)
+        self.assertIn('enrollment_count was off by -1', out.getvalue())
+        self.assertEqual(self.counts(), [1, 0])
+
+
+class AssignmentSubmissionCounterTests(APITestCase):
+    def setUp(self):
+        self.tutor = CustomUser.objects.create_user(username='tutor', email='tutor@example.com', role='tutor')
+        course = Course.objects.create(code='C1', title='Course', description='', subject='Maths', tutor=self.tutor)
+        self.assignments = [
+            Assignment.objects.create(
+                course=course, tutor=self.tutor, title=f'Essay {number}', due_date=timezone.now(), max_points=10
+            )
+            for number in range(2)
+        ]
+        self.students = [
+            CustomUser.objects.create_user(username=f'student{i}', email=f's{i}@example.com', role='student')
+            for i in range(3)
+        ]
+
+    def submit(self, student, status='submitted', assignment=None, **fields):
+        return AssignmentSubmission.objects.create(
+            assignment=assignment or self.assignments[0], student=student,
+            submitted_content='text', status=status, **fields
+        )
+
+    def counts(self, assignment=None):
+        assignment = Assignment.objects.get(pk=(assignment or self.assignments[0]).pk)
+        return {
+            field: getattr(assignment, field)
+            for field in ('submission_count', 'submitted_count', 'graded_count', 'late_count', 'missing_count', 'pending_count')
+        }
+
+    def pending_grading(self):
+        self.client.force_authenticate(self.tutor)
+        return self.client.get(reverse('tutor_dashboard')).data['pending_grading']
+
+    def test_signals_maintain_the_counters(self):
+        first = self.submit(self.students[0])
+        self.submit(self.students[1], status='late')
+        self.submit(self.students[2], status='missing')
+        self.assertEqual(self.counts(), {
+            'submission_count': 3, 'submitted_count': 1, 'graded_count': 0,
+            'late_count': 1, 'missing_count': 1, 'pending_count': 3,
+        })
+
+        first.grade = Decimal('8.00')
+        first.status = 'graded'
+        first.save()
+        self.assertEqual((self.counts()['submitted_count'], self.counts()['graded_count']), (0, 1))
+        self.assertEqual(self.counts()['pending_count'], 2)
+
+        first.assignment = self.assignments[1]
+        first.save()
+        self.assertEqual(self.counts()['submission_count'], 2)
+        self.assertEqual(self.counts(self.assignments[1])['graded_count'], 1)
+
+        first.delete()
+        self.assertEqual(self.counts(self.assignments[1])['submission_count'], 0)
+
+    def test_pending_grading_matches_the_live_count(self):
+        self.submit(self.students[0])
+        self.submit(self.students[1], status='missing')
+        # Graded in name only: still waiting for a grade
+        self.submit(self.students[2], status='graded')
+        self.submit(self.students[0], status='graded', assignment=self.assignments[1], grade=Decimal('9.00'))
+        live = AssignmentSubmission.objects.filter(assignment__tutor=self.tutor, grade__isnull=True).count()
+        self.assertEqual(self.pending_grading(), live)
+        self.assertEqual(live, 3)
+
+    def test_reconcile_repairs_drift(self):
+        self.submit(self.students[0])
+        Assignment.objects.filter(pk=self.assignments[0].pk).update(submitted_count=4, pending_count=0)
+        drift = counters.reconcile_submission_counts()
+        self.assertEqual(drift, {self.assignments[0].pk: {'submitted_count': 3, 'pending_count': -1}})
+        self.assertEqual((self.counts()['submitted_count'], self.counts()['pending_count']), (1, 1))
+
+    def test_migrations_backfill_existing_submissions(self):
+        AssignmentSubmission.objects.bulk_create([
+            AssignmentSubmission(assignment=self.assignments[0], student=self.students[0], submitted_content='', status='late'),
+            AssignmentSubmission(
+                assignment=self.assignments[0], student=self.students[1], submitted_content='',
+                status='graded', grade=Decimal('7.00'),
+            ),
+        ])
+        run_backfill('0007_assignment_submission_counters', 'count_submissions')
+        run_backfill('0009_assignment_pending_count', 'count_pending')
+        self.assertEqual(self.counts(), {
+            'submission_count': 2, 'submitted_count': 0, 'graded_count': 1,
+            'late_count': 1, 'missing_count': 0, 'pending_count': 1,
+        })
+
+
+class ClassAttendanceCounterTests(APITestCase):
+    def setUp(self):
+        self.tutor = CustomUser.objects.create_user(username='tutor', email='tutor@example.com', role='tutor')
+        self.course = Course.objects.create(code='C1', title='Course', description='', subject='Maths', tutor=self.tutor)
+        self.schedules = [
+            ClassSchedule.objects.create(
+                course=self.course, tutor=self.tutor, title=f'Lecture {number}',
+                scheduled_date=timezone.now(), duration_minutes=60
+            )
+            for number in range(2)
+        ]
+        self.students = [
+            CustomUser.objects.create_user(username=f'student{i}', email=f's{i}@example.com', role='student')
+            for i in range(3)
+        ]
+        for student in self.students:
+            Enrollment.objects.create(student=student, course=self.course)
+
+    def counts(self, schedule=None):
+        schedule = ClassSchedule.objects.get(pk=(schedule or self.schedules[0]).pk)
+        return [schedule.present_count, schedule.late_count, schedule.absent_count, schedule.excused_count]
+
+    def test_signals_maintain_the_counters(self):
+        first = Attendance.objects.create(class_schedule=self.schedules[0], student=self.students[0])
+        Attendance.objects.create(class_schedule=self.schedules[0], student=self.students[1], status='late')
+        self.assertEqual(self.counts(), [1, 1, 0, 0])
+
+        first.status = 'excused'
+        first.save()
+        self.assertEqual(self.counts(), [0, 1, 0, 1])
+
+        first.class_schedule = self.schedules[1]
+        first.save()
+        self.assertEqual(self.counts(), [0, 1, 0, 0])
+        self.assertEqual(self.counts(self.schedules[1]), [0, 0, 0, 1])
+
+        first.delete()
+        self.assertEqual(self.counts(self.schedules[1]), [0, 0, 0, 0])
+
+    def test_attendance_summary(self):
+        Attendance.objects.create(class_schedule=self.schedules[0], student=self.students[0])
+        Attendance.objects.create(class_schedule=self.schedules[0], student=self.students[1], status='absent')
+        self.client.force_authenticate(self.tutor)
+        response = self.client.get(
+            reverse('class-schedules-detail', args=[self.schedules[0].pk]),
+            {'fields': 'attendance_count,attendance_summary'},
+        )
+        self.assertEqual(response.data, {
+            'attendance_count': 1,
+            'attendance_summary': {'present': 1, 'late': 0, 'absent': 1, 'excused': 0, 'recorded': 2, 'expected': 3},
+        })
+
+    def test_reconcile_repairs_drift(self):
+        Attendance.objects.create(class_schedule=self.schedules[0], student=self.students[0], status='late')
+        ClassSchedule.objects.filter(pk=self.schedules[0].pk).update(late_count=0, absent_count=2)
+        drift = counters.reconcile_attendance_counts()
+        self.assertEqual(drift, {self.schedules[0].pk: {'late_count': -1, 'absent_count': 2}})
+        self.assertEqual(self.counts(), [0, 1, 0, 0])
+
+    def test_migration_backfills_existing_attendance(self):
+        Attendance.objects.bulk_create([
+            Attendance(class_schedule=self.schedules[0], student=self.students[0]),
+            Attendance(class_schedule=self.schedules[0], student=self.students[1], status='excused'),
+            Attendance(class_schedule=self.schedules[1], student=self.students[2], status='absent'),
+        ])
+        run_backfill('0008_classschedule_attendance_counters', 'count_attendances')
+        self.assertEqual(self.counts(), [1, 0, 0, 1])
+        self.assertEqual(self.counts(self.schedules[1]), [0, 0, 1, 0])
+
+
+class CompactListTests(APITestCase):
+    def setUp(self):
+        self.tutor = CustomUser.objects.create_user(username='tutor', email='tutor@example.com', role='tutor')
+        self.courses = [
+            Course.objects.create(code=f'C{number}', title=f'Course {number}', description='', subject='Maths', tutor=self.tutor)
+            for number in range(2)
+        ]
+        self.assignment = Assignment.objects.create(
+            course=self.courses[0], tutor=self.tutor, title='Essay', due_date=timezone.now(), max_points=10
+        )
+        self.schedule = ClassSchedule.objects.create(
+            course=self.courses[0], tutor=self.tutor, title='Lecture', scheduled_date=timezone.now(), duration_minutes=60
+        )
+        self.students = []
+        self.add_students(3)
+        self.client.force_authenticate(self.tutor)
+
+    def add_students(self, number):
+        for _ in range(number):
+            student = CustomUser.objects.create_user(
+                username=f'student{len(self.students)}', email=f's{len(self.students)}@example.com',
+                role='student', first_name='Ada',
+            )
+            self.students.append(student)
+            for course in self.courses:
+                Enrollment.objects.create(student=student, course=course)
+            AssignmentSubmission.objects.create(
+                assignment=self.assignment, student=student, submitted_content='text',
+                status='graded', grade=Decimal('5.00'), graded_by=self.tutor,
+            )
+            Attendance.objects.create(class_schedule=self.schedule, student=student)
+
+    def users(self, *users):
+        return {user.pk: {'username': user.username, 'first_name': user.first_name, 'last_name': ''} for user in users}
+
+    def get_compact(self, name, queries=3):
+        # One query for the page and one per included key, however many rows
+        with self.assertNumQueries(queries):
+            response = self.client.get(reverse(name), {'compact': 'true'})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_enrollments(self):
+        data = self.get_compact('enrollment-list')
+        self.assertEqual(len(data['results']), 6)
+        for row in data['results']:
+            self.assertIsInstance(row['student'], int)
+            self.assertIsInstance(row['course'], int)
+            self.assertFalse({'student_name', 'course_title', 'course_code'} & set(row))
+        self.assertEqual(data['included'], {
+            'users': self.users(*self.students),
+            'courses': {course.pk: {'code': course.code, 'title': course.title} for course in self.courses},
+        })
+
+        self.add_students(2)
+        self.assertEqual(len(self.get_compact('enrollment-list')['results']), 10)
+
+    def test_submissions_share_the_users_of_students_and_graders(self):
+        data = self.get_compact('submissions-list')
+        self.assertEqual(len(data['results']), 3)
+        self.assertFalse({'student_name', 'assignment_title', 'graded_by_name'} & set(data['results'][0]))
+        self.assertEqual(data['results'][0]['graded_by'], self.tutor.pk)
+        # The grader is sent once, next to the students
+        self.assertEqual(data['included']['users'], self.users(self.tutor, *self.students))
+        self.assertEqual(data['included']['assignments'], {self.assignment.pk: {
+            'title': 'Essay', 'due_date': self.assignment.due_date, 'course': self.courses[0].pk,
+        }})
+
+    def test_attendance(self):
+        data = self.get_compact('attendance-list')
+        self.assertEqual(len(data['results']), 3)
+        self.assertFalse({'student_name', 'class_title'} & set(data['results'][0]))
+        self.assertEqual(data['included'], {
+            'users': self.users(*self.students),
+            'class_schedules': {self.schedule.pk: {
+                'title': 'Lecture', 'scheduled_date': self.schedule.scheduled_date, 'course': self.courses[0].pk,
+            }},
+        })
+
+    def test_full_lists_are_unchanged(self):
+        response = self.client.get(reverse('enrollment-list'))
+        self.assertNotIn('included', response.data)
+        self.assertEqual(response.data['results'][0]['student_name'], self.students[-1].username)
+
+
+class AdminTutorManagementViewTests(APITestCase):
+    url = reverse('admin_tutors')
+
+    def setUp(self):
+        admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.client.force_authenticate(admin)
+        self.students = [
+            CustomUser.objects.create_user(username=f'student{i}', email=f's{i}@example.com', role='student')
+            for i in range(3)
+        ]
+
+    def add_tutor(self, number, department='Science', courses=1, ratings=(Decimal('4.00'),)):
+        tutor = CustomUser.objects.create_user(
+            username=f'tutor{number:02}', email=f't{number}@example.com', role='tutor'
+        )
+        TutorProfile.objects.create(user=tutor, staff_number=f'S{number}', department=department, subjects='Maths')
+        for c in range(courses):
+            course = Course.objects.create(
+                code=f'C{number}-{c}', title='Course', description='', subject='Maths', tutor=tutor
+            )
+            for student in self.students:
+                Enrollment.objects.create(student=student, course=course)
+        now = timezone.now()
+        for rating in ratings:
+            TutorPerformance.objects.create(
+                tutor=tutor, period_start=now, period_end=now, avg_rating=rating, attendance_rate=Decimal('90.00')
+            )
+        return tutor
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_tutors(self):
+        for number in range(2):
+            self.add_tutor(number)
+        few = self.count_queries(self.url)
+        for number in range(2, 12):
+            self.add_tutor(number, courses=2, ratings=(Decimal('3.00'), Decimal('5.00')))
+        self.assertEqual(self.count_queries(self.url), few)
+        self.assertEqual(self.count_queries(f'{self.url}?ordering=-students_managed'), few)
+
+    def test_metrics(self):
+        self.add_tutor(1, courses=2, ratings=(Decimal('3.00'), Decimal('4.00')))
+        dropped = Enrollment.objects.get(course__code='C1-0', student=self.students[0])
+        dropped.status = 'dropped'
+        dropped.save()
+        CustomUser.objects.create_user(username='tutor02', email='t2@example.com', role='tutor')
+
+        first, second = self.client.get(self.url).data['results']
+        self.assertEqual(first['courses_taught'], 2)
+        self.assertEqual(first['students_managed'], 5)
+        self.assertEqual(first['avg_rating'], 3.5)
+        self.assertEqual(first['attendance_rate'], 90.0)
+        self.assertEqual(
+            (second['department'], second['courses_taught'], second['students_managed'], second['avg_rating']),
+            ('N/A', 0, 0, 0.0),
+        )
+
+    def test_sort_filter_and_paging(self):
+        for number in range(7):
+            self.add_tutor(number, department='Arts' if number % 2 else 'Science', ratings=(Decimal(number),))
+
+        response = self.client.get(f'{self.url}?department=arts&ordering=-avg_rating&page_size=2')
+        usernames = []
+        while True:
+            usernames += [row['username'] for row in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(usernames, ['tutor05', 'tutor03', 'tutor01'])
+
+
+class AdminStudentManagementViewTests(APITestCase):
+    url = reverse('admin_students')
+
+    def setUp(self):
+        admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin')
+        self.client.force_authenticate(admin)
+        tutor = CustomUser.objects.create_user(username='tutor', email='tutor@example.com', role='tutor')
+        self.courses = [
+            Course.objects.create(code=f'C{c}', title='Course', description='', subject='Maths', tutor=tutor)
+            for c in range(2)
+        ]
+
+    def add_students(self, count):
+        for _ in range(count):
+            number = CustomUser.objects.filter(role='student').count()
+            student = CustomUser.objects.create_user(
+                username=f'student{number:02}', email=f's{number}@example.com', role='student'
+            )
+            Enrollment.objects.create(student=student, course=self.courses[0], status='completed')
+            Enrollment.objects.create(student=student, course=self.courses[1])
+
+    def test_query_count_does_not_grow_with_students(self):
+        self.add_students(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        self.add_students(10)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(self.url)
+        self.assertEqual(len(many), len(few))
+        row = response.data['results'][0]
+        self.assertEqual((row['courses_enrolled'], row['completed_courses'], row['progress_rate']), (2, 1, 50.0))
+        self.assertEqual(row['student_number'], 'N/A')
+
+    def test_pages_cover_students_without_a_profile(self):
+        self.add_students(5)
+        for number, year in ((0, 2022), (1, 2023), (2, 2023)):
+            StudentProfile.objects.create(
+                user=CustomUser.objects.get(username=f'student{number:02}'),
+                student_number=f'N{number}', course_of_study='Maths', admission_year=year,
+            )
+        for ordering in ('-admission_year', 'admission_year', '-student_number'):
+            rows, url = [], f'{self.url}?ordering={ordering}&page_size=2'
+            while url:
+                response = self.client.get(url)
+                rows += [(row['username'], row['admission_year']) for row in response.data['results']]
+                url = response.data['next']
+            with self.subTest(ordering=ordering):
+                self.assertEqual(len({username for username, year in rows}), 5)
+        self.assertEqual(rows[-1][1], 'N/A')
+
+    def test_exports_stream_every_student(self):
+        self.add_students(25)
+        response = self.client.get(f'{self.url}?format=csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['id', 'username'])
+        self.assertEqual(len(lines), 26)
+
+        response = self.client.get(f'{self.url}?format=ndjson&ordering=-username')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[0]['username'], 'student24')
+
+
+class ExpansionPrivacyTests(APITestCase):
+    def test_expanded_users_carry_no_private_fields(self):
+        tutor = CustomUser.objects.create_user(username='tutor', email='tutor@example.com', role='tutor')
+        student = CustomUser.objects.create_user(username='student', email='student@example.com', role='student')
+        course = Course.objects.create(code='C1', title='Course', description='', subject='Maths', tutor=tutor)
+        Enrollment.objects.create(student=student, course=course)
+        ClassSchedule.objects.create(
+            course=course, tutor=tutor, title='Lecture', scheduled_date=timezone.now(), duration_minutes=60
+        )
 
-# Create your tests here.
+        for user, url, expand in (
+            (student, reverse('course-list'), 'tutor'),
+            (tutor, reverse('enrollment-list'), 'student,course'),
+            (student, reverse('class-schedules-list'), 'tutor'),
+        ):
+            self.client.force_authenticate(user)
+            response = self.client.get(url, {'expand': expand})
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.data['results'])
+                self.assertNotIn(b'@example.com', response.content)
@@ -4,17 +4,20 @@ from rest_framework import viewsets, permissions, filters, status, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Count, Avg, Q, F
-from django.db.models.functions import TruncDate
+from django.db import transaction
+from django.db.models import Count, Avg, Q, Sum, OuterRef, Subquery, Value, CharField, DecimalField
+from django.db.models.functions import Coalesce, TruncDate
 from .models import (
     Course, Enrollment, Assignment, AssignmentSubmission, Attendance,
     AdminTutorAssignment, AdminStudentAssignment, ClassSchedule, TutorPerformance
 )
 from .serializers import (
-    CourseSerializer, EnrollmentSerializer, AssignmentSerializer, AssignmentSubmissionSerializer,
+    CourseSerializer, EnrollmentSerializer, AssignmentSerializer, AssignmentListSerializer,
+    AssignmentSubmissionSerializer, AssignmentSubmissionListSerializer,
     AttendanceSerializer, AdminTutorAssignmentSerializer, AdminStudentAssignmentSerializer,
     ClassScheduleSerializer, TutorPerformanceSerializer,
     TutorDashboardSerializer, StudentDashboardSerializer, AdminDashboardSerializer,
+    AdminTutorManagementSerializer, AdminStudentManagementSerializer,
     DetailedCourseSerializer, DetailedAssignmentSerializer, DetailedEnrollmentSerializer
 )
 from users.permissions import (
@@ -22,18 +25,24 @@ from users.permissions import (
     IsTutorOfStudent, IsEnrolledInCourse, IsAdminOfUser
 )
 from users.models import CustomUser
+from communication.counters import get_statistics
+from config.excerpts import ListSerializerMixin
+from config.export import StreamingExportMixin
+from config.sideload import SideloadMixin
+from config.sparse import SparseQuerysetMixin
 
 
 # -------------------------------------
 # Enhanced Course ViewSet
 # -------------------------------------
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = Course.objects.select_related('tutor').all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.IsAuthenticated, RoleBasedPermission]
     filter_backends = [filters.SearchFilter]
     search_fields = ['code', 'title', 'description', 'subject']
     required_roles = ['admin', 'tutor', 'student']
+    ordering = '-created_at'
 
     def get_queryset(self):
         user = self.request.user
@@ -70,11 +79,12 @@ class CourseViewSet(viewsets.ModelViewSet):
 # -------------------------------------
 # Enhanced Enrollment ViewSet
 # -------------------------------------
-class EnrollmentViewSet(viewsets.ModelViewSet):
+class EnrollmentViewSet(SideloadMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = Enrollment.objects.select_related('student', 'course').all()
     serializer_class = EnrollmentSerializer
     permission_classes = [permissions.IsAuthenticated, RoleBasedPermission]
     required_roles = ['admin', 'tutor', 'student']
+    ordering = '-enrolled_at'
 
     def get_queryset(self):
         user = self.request.user
@@ -127,11 +137,13 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
 # -------------------------------------
 # Enhanced Assignment ViewSet
 # -------------------------------------
-class AssignmentViewSet(viewsets.ModelViewSet):
+class AssignmentViewSet(SparseQuerysetMixin, ListSerializerMixin, viewsets.ModelViewSet):
     queryset = Assignment.objects.select_related('course', 'tutor').all()
     serializer_class = AssignmentSerializer
+    list_serializer_class = AssignmentListSerializer
     permission_classes = [permissions.IsAuthenticated, RoleBasedPermission]
     required_roles = ['admin', 'tutor', 'student']
+    ordering = '-created_at'
 
     def get_queryset(self):
         user = self.request.user
@@ -159,11 +171,13 @@ class AssignmentViewSet(viewsets.ModelViewSet):
 # -------------------------------------
 # Assignment Submission ViewSet
 # -------------------------------------
-class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
+class AssignmentSubmissionViewSet(SideloadMixin, SparseQuerysetMixin, ListSerializerMixin, viewsets.ModelViewSet):
     queryset = AssignmentSubmission.objects.select_related('assignment', 'student', 'graded_by').all()
     serializer_class = AssignmentSubmissionSerializer
+    list_serializer_class = AssignmentSubmissionListSerializer
     permission_classes = [permissions.IsAuthenticated, RoleBasedPermission, IsOwnerOrAdmin]
     required_roles = ['admin', 'tutor', 'student']
+    ordering = '-submitted_at'
 
     def get_queryset(self):
         user = self.request.user
@@ -181,7 +195,13 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create submission for students"""
-        serializer.save(student=self.request.user)
+        # The assignment counters are updated in the same transaction
+        with transaction.atomic():
+            serializer.save(student=self.request.user)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
 
     @action(detail=True, methods=['post'])
     def grade(self, request, pk=None):
@@ -202,7 +222,8 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
             submission.graded_by = request.user
             submission.graded_at = timezone.now()
             submission.status = 'graded'
-            submission.save()
+            with transaction.atomic():
+                submission.save()
 
             serializer = AssignmentSubmissionSerializer(submission)
             return Response(serializer.data)
@@ -216,11 +237,12 @@ class AssignmentSubmissionViewSet(viewsets.ModelViewSet):
 # -------------------------------------
 # Class Schedule ViewSet
 # -------------------------------------
-class ClassScheduleViewSet(viewsets.ModelViewSet):
+class ClassScheduleViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = ClassSchedule.objects.select_related('course', 'tutor').all()
     serializer_class = ClassScheduleSerializer
     permission_classes = [permissions.IsAuthenticated, RoleBasedPermission]
     required_roles = ['admin', 'tutor', 'student']
+    ordering = 'scheduled_date'
 
     def get_queryset(self):
         user = self.request.user
@@ -240,11 +262,14 @@ class ClassScheduleViewSet(viewsets.ModelViewSet):
 # -------------------------------------
 # Attendance ViewSet
 # -------------------------------------
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(SideloadMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     queryset = Attendance.objects.select_related('class_schedule', 'student').all()
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated, RoleBasedPermission]
     required_roles = ['admin', 'tutor', 'student']
+    ordering = '-attended_at'
+    # A class register is read in one go
+    max_page_size = 200
 
     def get_queryset(self):
         user = self.request.user
@@ -264,77 +289,85 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 # -------------------------------------
 # Admin Management Views
 # -------------------------------------
-class AdminTutorManagementView(generics.GenericAPIView):
+def _per_user(queryset, user_field, aggregate, default=0, output_field=None):
+    """
+    ``aggregate`` over the rows of ``queryset`` belonging to the outer user,
+    as a correlated subquery; separate joins would multiply each other's rows
+    """
+    rows = queryset.filter(**{user_field: OuterRef('pk')}).order_by().values(user_field)
+    value = Subquery(rows.annotate(value=aggregate).values('value'), output_field=output_field)
+    return Coalesce(value, Value(default), output_field=output_field)
+
+
+class AdminTutorManagementView(generics.ListAPIView):
+    """
+    Tutors with their performance metrics, one query per page. Sort with
+    ``?ordering=`` on any metric (``-avg_rating``), filter with
+    ``?department=``.
+    """
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
-    
-    def get(self, request):
-        """Get all tutors with performance metrics"""
-        tutors = CustomUser.objects.filter(role='tutor').select_related('tutor_profile')
-        
-        tutor_data = []
-        for tutor in tutors:
-            courses_taught = Course.objects.filter(tutor=tutor).count()
-            students_managed = Enrollment.objects.filter(course__tutor=tutor, status='enrolled').count()
-            
-            # Calculate performance metrics
-            avg_rating = TutorPerformance.objects.filter(tutor=tutor).aggregate(
-                avg_rating=Avg('avg_rating')
-            )['avg_rating'] or 0
-            
-            attendance_rate = TutorPerformance.objects.filter(tutor=tutor).aggregate(
-                attendance_rate=Avg('attendance_rate')
-            )['attendance_rate'] or 0
-            
-            tutor_data.append({
-                'id': tutor.id,
-                'username': tutor.username,
-                'email': tutor.email,
-                'department': tutor.tutor_profile.department if hasattr(tutor, 'tutor_profile') else 'N/A',
-                'subjects': tutor.tutor_profile.subjects if hasattr(tutor, 'tutor_profile') else 'N/A',
-                'courses_taught': courses_taught,
-                'students_managed': students_managed,
-                'avg_rating': float(avg_rating),
-                'attendance_rate': float(attendance_rate),
-                'status': 'active'  # Could be dynamic based on assignments
-            })
-        
-        return Response(tutor_data)
+    serializer_class = AdminTutorManagementSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = [
+        'username', 'email', 'department', 'courses_taught', 'students_managed', 'avg_rating', 'attendance_rate'
+    ]
+    ordering = 'username'
+
+    def get_queryset(self):
+        rate = DecimalField(max_digits=5, decimal_places=2)
+        tutors = CustomUser.objects.filter(role='tutor').annotate(
+            department=Coalesce('tutor_profile__department', Value('N/A'), output_field=CharField()),
+            subjects=Coalesce('tutor_profile__subjects', Value('N/A'), output_field=CharField()),
+            courses_taught=_per_user(Course.objects.all(), 'tutor', Count('pk')),
+            # Course.enrollment_count counts the enrolled students
+            students_managed=_per_user(Course.objects.all(), 'tutor', Sum('enrollment_count')),
+            avg_rating=_per_user(TutorPerformance.objects.all(), 'tutor', Avg('avg_rating'), output_field=rate),
+            attendance_rate=_per_user(
+                TutorPerformance.objects.all(), 'tutor', Avg('attendance_rate'), output_field=rate
+            ),
+        )
+        department = self.request.query_params.get('department')
+        if department:
+            tutors = tutors.filter(tutor_profile__department__iexact=department)
+        return tutors.values(
+            'id', 'username', 'email', 'department', 'subjects',
+            'courses_taught', 'students_managed', 'avg_rating', 'attendance_rate',
+        )
 
 
-class AdminStudentManagementView(generics.GenericAPIView):
+class AdminStudentManagementView(StreamingExportMixin, generics.ListAPIView):
+    """
+    Students with their progress metrics, one query per page. Sort with
+    ``?ordering=``; ``?format=csv`` or ``?format=ndjson`` streams every
+    student as a file instead.
+    """
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
-    
-    def get(self, request):
-        """Get all students with progress metrics"""
-        students = CustomUser.objects.filter(role='student').select_related('student_profile')
-        
-        student_data = []
-        for student in students:
-            enrollments = Enrollment.objects.filter(student=student)
-            courses_enrolled = enrollments.count()
-            completed_courses = enrollments.filter(status='completed').count()
-            progress_rate = (completed_courses / courses_enrolled * 100) if courses_enrolled > 0 else 0
-            
-            recent_submissions = AssignmentSubmission.objects.filter(
-                student=student,
-                submitted_at__gte=timezone.now() - timezone.timedelta(days=30)
-            ).count()
-            
-            student_data.append({
-                'id': student.id,
-                'username': student.username,
-                'email': student.email,
-                'student_number': student.student_profile.student_number if hasattr(student, 'student_profile') else 'N/A',
-                'course_of_study': student.student_profile.course_of_study if hasattr(student, 'student_profile') else 'N/A',
-                'admission_year': student.student_profile.admission_year if hasattr(student, 'student_profile') else 'N/A',
-                'courses_enrolled': courses_enrolled,
-                'completed_courses': completed_courses,
-                'progress_rate': float(progress_rate),
-                'recent_submissions': recent_submissions,
-                'status': student.student_profile.status if hasattr(student, 'student_profile') else 'active'
-            })
-        
-        return Response(student_data)
+    serializer_class = AdminStudentManagementSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = [
+        'username', 'email', 'student_number', 'admission_year',
+        'courses_enrolled', 'completed_courses', 'recent_submissions',
+    ]
+    ordering = 'username'
+    export_filename = 'students'
+
+    def get_queryset(self):
+        recent = timezone.now() - timezone.timedelta(days=30)
+        return CustomUser.objects.filter(role='student').annotate(
+            student_number=Coalesce('student_profile__student_number', Value('N/A'), output_field=CharField()),
+            course_of_study=Coalesce('student_profile__course_of_study', Value('N/A'), output_field=CharField()),
+            # 0 for students without a profile: cursor pages can't be keyed on NULLs
+            admission_year=Coalesce('student_profile__admission_year', Value(0)),
+            status=Coalesce('student_profile__status', Value('active'), output_field=CharField()),
+            courses_enrolled=_per_user(Enrollment.objects.all(), 'student', Count('pk')),
+            completed_courses=_per_user(Enrollment.objects.filter(status='completed'), 'student', Count('pk')),
+            recent_submissions=_per_user(
+                AssignmentSubmission.objects.filter(submitted_at__gte=recent), 'student', Count('pk')
+            ),
+        ).values(
+            'id', 'username', 'email', 'student_number', 'course_of_study', 'admission_year', 'status',
+            'courses_enrolled', 'completed_courses', 'recent_submissions',
+        )
 
 
 # -------------------------------------
@@ -350,10 +383,10 @@ class TutorDashboardView(generics.GenericAPIView):
         
         courses_taught = Course.objects.filter(tutor=tutor).count()
         students_managed = Enrollment.objects.filter(course__tutor=tutor, status='enrolled').distinct().count()
-        pending_grading = AssignmentSubmission.objects.filter(
-            assignment__tutor=tutor,
-            grade__isnull=True
-        ).count()
+        # Submissions without a grade, whatever their status
+        pending_grading = Assignment.objects.filter(tutor=tutor).aggregate(
+            pending=Sum('pending_count')
+        )['pending'] or 0
         upcoming_classes = ClassSchedule.objects.filter(
             tutor=tutor,
             scheduled_date__gte=timezone.now()
@@ -435,15 +468,12 @@ class AdminDashboardView(generics.GenericAPIView):
     
     def get(self, request):
         """Get admin dashboard analytics"""
-        total_users = CustomUser.objects.count()
-        total_students = CustomUser.objects.filter(role='student').count()
-        total_tutors = CustomUser.objects.filter(role='tutor').count()
-        total_courses = Course.objects.count()
-        active_enrollments = Enrollment.objects.filter(status='enrolled').count()
+        # Platform totals come from the signal-maintained statistics row
+        statistics = get_statistics()
         
         # Calculate completion rate
-        total_enrollments = Enrollment.objects.count()
-        completed_enrollments = Enrollment.objects.filter(status='completed').count()
+        total_enrollments = statistics.total_enrollments
+        completed_enrollments = statistics.completed_enrollments
         completion_rate = (completed_enrollments / total_enrollments * 100) if total_enrollments > 0 else 0
         
         # System health metrics
@@ -460,11 +490,11 @@ class AdminDashboardView(generics.GenericAPIView):
         }
         
         data = {
-            'total_users': total_users,
-            'total_students': total_students,
-            'total_tutors': total_tutors,
-            'total_courses': total_courses,
-            'active_enrollments': active_enrollments,
+            'total_users': statistics.total_users,
+            'total_students': statistics.active_students,
+            'total_tutors': statistics.tutors,
+            'total_courses': statistics.courses,
+            'active_enrollments': statistics.active_enrollments,
             'completion_rate': float(completion_rate),
             'system_health': system_health
         }
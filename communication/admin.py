@@ -1,16 +1,45 @@
 # admin.py
 from django.contrib import admin
-from .models import Statistics, News, Event, Testimonial, CampusLife, ContactMessage, Book
+from . import counters
+from .models import Statistics, StatisticsSnapshot, News, Event, Testimonial, CampusLife, ContactMessage, Book
 
 
 @admin.register(Statistics)
 class StatisticsAdmin(admin.ModelAdmin):
-    list_display = ['active_students', 'courses', 'success_rate', 'tutors', 'updated_at']
-    fields = ['active_students', 'courses', 'success_rate', 'tutors']
+    list_display = ['active_students', 'courses', 'success_rate', 'tutors', 'updated_at', 'reconciled_at']
+    fields = [
+        'active_students', 'courses', 'success_rate', 'tutors', 'total_users', 'total_enrollments',
+        'active_enrollments', 'completed_enrollments', 'dropped_enrollments', 'reconciled_at'
+    ]
+    # Maintained by signals; fix drift with the reconcile action instead of editing
+    readonly_fields = fields
+    actions = ['reconcile']
     
     def has_add_permission(self, request):
         # Only allow one statistics record
         return not Statistics.objects.exists()
+    
+    @admin.action(description="Recount statistics from the database")
+    def reconcile(self, request, queryset):
+        statistics, drift = counters.reconcile()
+        if drift:
+            self.message_user(request, f"Statistics recounted, corrected: {', '.join(f'{k} ({v:+d})' for k, v in drift.items())}")
+        else:
+            self.message_user(request, "Statistics recounted, no drift found")
+
+
+@admin.register(StatisticsSnapshot)
+class StatisticsSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['period', 'period_start', 'total_users', 'active_students', 'courses', 'total_enrollments', 'new_users', 'new_enrollments']
+    list_filter = ['period']
+    date_hierarchy = 'period_start'
+
+    # Written by the snapshot_statistics command only
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(News)
@@ -113,7 +142,7 @@ class CampusLifeAdmin(admin.ModelAdmin):
     list_filter = ['published', 'created_at']
     search_fields = ['title', 'description']
     date_hierarchy = 'created_at'
-    readonly_fields = ['created_at', 'uploaded_by']
+    readonly_fields = ['created_at', 'updated_at', 'uploaded_by']
     
     fieldsets = (
         ('Image Details', {
@@ -126,7 +155,7 @@ class CampusLifeAdmin(admin.ModelAdmin):
             'fields': ('published',)
         }),
         ('Metadata', {
-            'fields': ('uploaded_by', 'created_at'),
+            'fields': ('uploaded_by', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
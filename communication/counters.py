@@ -0,0 +1,130 @@
+# counters.py
+"""
+Platform counters kept in the single ``Statistics`` row. Model signals
+adjust them with relative updates as users, courses and enrollments change,
+so readers fetch one row instead of counting tables. ``reconcile`` recounts
+everything and repairs any drift.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Case, When, F, Q, Value, Count, IntegerField
+from django.utils import timezone
+
+from academics.models import Enrollment, Course
+from .home import mark_home_content_stale
+from .models import Statistics
+
+User = get_user_model()
+
+# User role -> counter of users with that role
+ROLE_COUNTERS = {'student': 'active_students', 'tutor': 'tutors'}
+
+# Enrollment status -> counter of enrollments in that status
+ENROLLMENT_STATUS_COUNTERS = {
+    'enrolled': 'active_enrollments',
+    'completed': 'completed_enrollments',
+    'dropped': 'dropped_enrollments',
+}
+
+
+def success_rate(completed, dropped):
+    """Rounded percentage of finished (completed or dropped) enrollments that were completed"""
+    finished = completed + dropped
+    return (completed * 200 + finished) // (finished * 2) if finished else 0
+
+
+def _success_rate_expression():
+    completed, finished = F('completed_enrollments'), F('completed_enrollments') + F('dropped_enrollments')
+    return Case(
+        When(Q(completed_enrollments__gt=0) | Q(dropped_enrollments__gt=0), then=(completed * 200 + finished) / (finished * 2)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def get_statistics():
+    """The statistics row, created from a full count the first time"""
+    statistics = Statistics.objects.first()
+    if statistics is None:
+        statistics, drift = reconcile()
+    return statistics
+
+
+def adjust(**deltas):
+    """Add ``deltas`` (counter -> change) to the statistics row"""
+    deltas = {counter: delta for counter, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        pk = Statistics.objects.values_list('pk', flat=True).first()
+        if pk is None:
+            # The first full count already includes the change being recorded
+            reconcile()
+            return
+        rows = Statistics.objects.filter(pk=pk)
+        rows.update(updated_at=timezone.now(), **{counter: F(counter) + delta for counter, delta in deltas.items()})
+        if deltas.keys() & set(ENROLLMENT_STATUS_COUNTERS.values()):
+            rows.update(success_rate=_success_rate_expression())
+    # Relative updates bypass Statistics signals. Counters change on every
+    # signup and enrollment, so the homepage is only marked stale here and
+    # rebuilt on its next read rather than in this request.
+    transaction.on_commit(mark_home_content_stale)
+
+
+def _moved(counters, previous, current):
+    """Deltas of moving a record from the ``previous`` to the ``current`` value (None: absent)"""
+    return {
+        counter: (current == value) - (previous == value)
+        for value, counter in counters.items()
+    }
+
+
+def record_user_change(previous_role, role):
+    adjust(total_users=(role is not None) - (previous_role is not None), **_moved(ROLE_COUNTERS, previous_role, role))
+
+
+def record_enrollment_change(previous_status, status):
+    adjust(
+        total_enrollments=(status is not None) - (previous_status is not None),
+        **_moved(ENROLLMENT_STATUS_COUNTERS, previous_status, status),
+    )
+
+
+def record_course_change(delta):
+    adjust(courses=delta)
+
+
+def count_all():
+    """Exact value of every counter, counted from the tables"""
+    users = User.objects.aggregate(
+        total_users=Count('id'),
+        **{counter: Count('id', filter=Q(role=role)) for role, counter in ROLE_COUNTERS.items()},
+    )
+    enrollments = Enrollment.objects.aggregate(
+        total_enrollments=Count('id'),
+        **{counter: Count('id', filter=Q(status=value)) for value, counter in ENROLLMENT_STATUS_COUNTERS.items()},
+    )
+    return {**users, **enrollments, 'courses': Course.objects.count()}
+
+
+def reconcile():
+    """
+    Recount every counter into the statistics row. Returns the row and the
+    drift found, as counter -> stored minus actual value.
+    """
+    with transaction.atomic():
+        statistics = Statistics.objects.select_for_update().first() or Statistics()
+        counts = count_all()
+        drift = {}
+        if statistics.pk is not None:
+            drift = {
+                counter: getattr(statistics, counter) - value
+                for counter, value in counts.items()
+                if getattr(statistics, counter) != value
+            }
+        for counter, value in counts.items():
+            setattr(statistics, counter, value)
+        statistics.success_rate = success_rate(counts['completed_enrollments'], counts['dropped_enrollments'])
+        statistics.reconciled_at = timezone.now()
+        statistics.save()
+    return statistics, drift
@@ -0,0 +1,199 @@
+# history.py
+"""
+Daily statistics snapshots with weekly and monthly rollups, so growth charts
+read a handful of pre-aggregated rows instead of scanning the user and
+enrollment tables.
+"""
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from academics.models import Course, Enrollment
+from .counters import get_statistics
+from .models import StatisticsSnapshot
+
+User = get_user_model()
+
+PERIODS = ('day', 'week', 'month')
+
+# Values at the end of a period; rollups take them from the period's last day
+LEVEL_FIELDS = (
+    'total_users', 'active_students', 'tutors', 'courses', 'total_enrollments',
+    'active_enrollments', 'completed_enrollments', 'dropped_enrollments', 'success_rate',
+)
+# Counts of what happened during a period; rollups add them up
+ACTIVITY_FIELDS = ('new_users', 'new_enrollments')
+
+# Range shown when a history request gives no start date
+DEFAULT_RANGES = {
+    'day': lambda end: end - timedelta(days=29),
+    'week': lambda end: end - timedelta(weeks=11),
+    'month': lambda end: (end.replace(day=1) - timedelta(days=335)).replace(day=1),
+}
+# Upper bound on the rows returned by one history request
+MAX_POINTS = 400
+
+
+def period_start(day, period):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def period_end(start, period):
+    """Last day of the period beginning on ``start``"""
+    if period == 'week':
+        return start + timedelta(days=6)
+    if period == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return start
+
+
+def _day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def rollup(day):
+    """Recompute the week and month rows containing ``day`` from its daily rows"""
+    for period in ('week', 'month'):
+        start = period_start(day, period)
+        days = list(StatisticsSnapshot.objects.filter(
+            period='day', period_start__range=(start, period_end(start, period))
+        ).order_by('period_start'))
+        if not days:
+            continue
+        values = {field: getattr(days[-1], field) for field in LEVEL_FIELDS}
+        values.update({field: sum(getattr(snapshot, field) for snapshot in days) for field in ACTIVITY_FIELDS})
+        StatisticsSnapshot.objects.update_or_create(period=period, period_start=start, defaults=values)
+
+
+def _levels_at(end):
+    """
+    Levels as of ``end``, counted from join, course creation and enrollment
+    dates like ``backfill``: roles are today's and enrollment status history
+    is unknown
+    """
+    users = User.objects.filter(date_joined__lt=end).aggregate(
+        total_users=Count('id'),
+        active_students=Count('id', filter=Q(role='student')),
+        tutors=Count('id', filter=Q(role='tutor')),
+    )
+    return {
+        **users,
+        'courses': Course.objects.filter(created_at__lt=end).count(),
+        'total_enrollments': Enrollment.objects.filter(enrolled_at__lt=end).count(),
+    }
+
+
+def record_day(day=None):
+    """
+    Append the snapshot of ``day`` (default: yesterday) and refresh its
+    rollups. Yesterday's levels are copied from the live statistics row, so
+    that run belongs just after the day ends; earlier days are counted as of
+    their end instead. Daily rows are never overwritten; returns None when
+    the day was already recorded.
+    """
+    today = timezone.localdate()
+    yesterday = today - timedelta(days=1)
+    day = day or yesterday
+    if day >= today:
+        raise ValueError("Only days that have ended can be recorded")
+
+    start, end = _day_bounds(day)
+    if day == yesterday:
+        statistics = get_statistics()
+        levels = {field: getattr(statistics, field) for field in LEVEL_FIELDS}
+    else:
+        # Today's live counters would be wrong for an earlier day
+        levels = _levels_at(end)
+    with transaction.atomic():
+        snapshot, created = StatisticsSnapshot.objects.get_or_create(
+            period='day', period_start=day,
+            defaults={
+                **levels,
+                'new_users': User.objects.filter(date_joined__gte=start, date_joined__lt=end).count(),
+                'new_enrollments': Enrollment.objects.filter(enrolled_at__gte=start, enrolled_at__lt=end).count(),
+            },
+        )
+        if not created:
+            return None
+        rollup(day)
+    return snapshot
+
+
+def _daily_counts(queryset, field, end, **filters):
+    """Per-day counts of ``queryset`` rows by the date of ``field`` before ``end``"""
+    rows = (
+        queryset.filter(**{f'{field}__lt': end})
+        .annotate(day=TruncDate(field))
+        .values('day')
+        .annotate(total=Count('id'), **{name: Count('id', filter=condition) for name, condition in filters.items()})
+        .order_by('day')
+    )
+    return {row['day']: row for row in rows}
+
+
+def backfill(start, end):
+    """
+    Create the missing daily rows from ``start`` to ``end`` (inclusive) from
+    join, course creation and enrollment dates, then their rollups. Roles are
+    today's, and enrollment status history is unknown, so those counters are
+    left empty. Returns the number of days added.
+    """
+    end_of_range = _day_bounds(end)[1]
+    users = _daily_counts(User.objects.all(), 'date_joined', end_of_range, students=Q(role='student'), tutors=Q(role='tutor'))
+    courses = _daily_counts(Course.objects.all(), 'created_at', end_of_range)
+    enrollments = _daily_counts(Enrollment.objects.all(), 'enrolled_at', end_of_range)
+    existing = set(StatisticsSnapshot.objects.filter(
+        period='day', period_start__range=(start, end)
+    ).values_list('period_start', flat=True))
+
+    # Levels are running totals of everything created up to each day
+    totals = dict.fromkeys(('users', 'students', 'tutors', 'courses', 'enrollments'), 0)
+    for day, row in users.items():
+        if day < start:
+            totals['users'] += row['total']
+            totals['students'] += row['students']
+            totals['tutors'] += row['tutors']
+    totals['courses'] = sum(row['total'] for day, row in courses.items() if day < start)
+    totals['enrollments'] = sum(row['total'] for day, row in enrollments.items() if day < start)
+
+    snapshots = []
+    day = start
+    while day <= end:
+        joined = users.get(day, {'total': 0, 'students': 0, 'tutors': 0})
+        enrolled = enrollments.get(day, {'total': 0})
+        totals['users'] += joined['total']
+        totals['students'] += joined['students']
+        totals['tutors'] += joined['tutors']
+        totals['courses'] += courses.get(day, {'total': 0})['total']
+        totals['enrollments'] += enrolled['total']
+        if day not in existing:
+            snapshots.append(StatisticsSnapshot(
+                period='day', period_start=day,
+                total_users=totals['users'],
+                active_students=totals['students'],
+                tutors=totals['tutors'],
+                courses=totals['courses'],
+                total_enrollments=totals['enrollments'],
+                new_users=joined['total'],
+                new_enrollments=enrolled['total'],
+            ))
+        day += timedelta(days=1)
+
+    with transaction.atomic():
+        StatisticsSnapshot.objects.bulk_create(snapshots)
+        rolled = set()
+        for snapshot in snapshots:
+            key = (period_start(snapshot.period_start, 'week'), period_start(snapshot.period_start, 'month'))
+            if key not in rolled:
+                rollup(snapshot.period_start)
+                rolled.add(key)
+    return len(snapshots)
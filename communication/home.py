@@ -0,0 +1,270 @@
+# home.py
+"""
+Composite payload of the landing page. It is built once, cached with a
+strong ETag and dropped whenever one of the models it shows changes.
+
+The payload is also published as static snapshot files (plain, gzip and
+brotli) that a lightweight view or the front proxy serves without Django's
+ORM or DRF. Readers go through the snapshot, whose files every worker
+process shares, so a change handled by one process reaches all of them
+without a shared cache.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import brotli
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Statistics, News, Event, Testimonial, CampusLife
+from .serializers import (
+    StatisticsSerializer, NewsSerializer, EventSerializer, TestimonialSerializer, CampusLifeSerializer
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'home-content'
+
+# Changes to these models can alter the payload
+HOME_CONTENT_MODELS = (Statistics, News, Event, Testimonial, CampusLife)
+
+
+def build_home_content():
+    """Query and serialize the landing page content"""
+    # Get latest statistics
+    latest_stats = Statistics.objects.first()
+
+    # Get latest published news (limit to 3)
+    latest_news = News.objects.filter(published=True).order_by('-created_at')[:3]
+
+    # Get upcoming events (limit to 3)
+    upcoming_events = Event.objects.filter(
+        published=True,
+        event_date__gte=timezone.now()
+    ).order_by('event_date')[:3]
+
+    # Get approved testimonials (limit to 3)
+    testimonials = Testimonial.objects.filter(approved=True).order_by('-created_at')[:3]
+
+    # Get campus life images (limit to 6)
+    campus_images = CampusLife.objects.filter(published=True).order_by('-created_at')[:6]
+
+    return {
+        'statistics': StatisticsSerializer(latest_stats).data if latest_stats else None,
+        'news': NewsSerializer(latest_news, many=True).data,
+        'events': EventSerializer(upcoming_events, many=True).data,
+        'testimonials': TestimonialSerializer(testimonials, many=True).data,
+        'campus_life': CampusLifeSerializer(campus_images, many=True).data
+    }
+
+
+def _timeout(payload):
+    # The first listed event drops off the page once it starts
+    timeout = settings.HOME_CONTENT_CACHE_TIMEOUT
+    starts = parse_datetime(payload['events'][0]['event_date'] or '') if payload['events'] else None
+    if starts is not None:
+        timeout = min(timeout, max(int((starts - timezone.now()).total_seconds()) + 1, 1))
+    return timeout
+
+
+def get_home_content():
+    """
+    Cached ``{'payload', 'etag'}`` entry; the ETag is a hash of the JSON
+    body, so identical content always gets the same tag
+    """
+    entry = cache.get(CACHE_KEY)
+    if entry is None:
+        payload = build_home_content()
+        body = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+        timeout = _timeout(payload)
+        entry = {
+            'payload': payload,
+            'body': body,
+            'etag': f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"',
+            'expires_at': time.time() + timeout,
+        }
+        cache.set(CACHE_KEY, entry, timeout)
+    return entry
+
+
+def invalidate_home_content():
+    cache.delete(CACHE_KEY)
+
+
+# -------------------------------------
+# Static snapshot
+# -------------------------------------
+SNAPSHOT_NAME = 'home-content.json'
+# Content-Encoding -> file suffix, in order of preference
+SNAPSHOT_ENCODINGS = {'br': '.br', 'gzip': '.gz', 'identity': ''}
+
+
+def _write_atomic(path, data):
+    # Readers see either the old or the new file, never a partial one
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, path)
+
+
+def snapshot_path(encoding='identity'):
+    return os.path.join(settings.HOME_CONTENT_SNAPSHOT_DIR, SNAPSHOT_NAME + SNAPSHOT_ENCODINGS[encoding])
+
+
+def stale_marker_path():
+    return snapshot_path('identity') + '.stale'
+
+
+def mark_home_content_stale():
+    """
+    Drop the cached payload and flag the snapshot as outdated without
+    rebuilding either; the next read or ``publish_home_content`` run does.
+    Meant for frequent changes such as counter updates.
+    """
+    invalidate_home_content()
+    try:
+        os.makedirs(settings.HOME_CONTENT_SNAPSHOT_DIR, exist_ok=True)
+        with open(stale_marker_path(), 'wb'):
+            pass
+    except OSError:
+        logger.exception("Marking the home content snapshot stale failed")
+
+
+def publish_snapshot():
+    """
+    Write the current payload and its compressed variants to the snapshot
+    directory, unless the files already hold content with the same ETag.
+    The metadata file is replaced last, so it only ever describes complete
+    files.
+    """
+    # Cleared first, so a change while publishing marks the new files stale again
+    try:
+        os.remove(stale_marker_path())
+    except FileNotFoundError:
+        pass
+    entry = get_home_content()
+    body = entry['body'].encode()
+    os.makedirs(settings.HOME_CONTENT_SNAPSHOT_DIR, exist_ok=True)
+    try:
+        with open(snapshot_path('identity') + '.meta', 'rb') as f:
+            current = json.load(f)
+    except (FileNotFoundError, ValueError):
+        current = None
+    if current is None or current['etag'] != entry['etag']:
+        _write_atomic(snapshot_path('identity'), body)
+        _write_atomic(snapshot_path('gzip'), gzip.compress(body, compresslevel=9, mtime=0))
+        _write_atomic(snapshot_path('br'), brotli.compress(body, quality=11))
+    # Unchanged content only gets its expiry moved
+    meta = {'etag': entry['etag'], 'expires_at': entry['expires_at']}
+    _write_atomic(snapshot_path('identity') + '.meta', json.dumps(meta).encode())
+    return entry
+
+
+def choose_encoding(accept_encoding):
+    """Preferred snapshot encoding allowed by an Accept-Encoding header"""
+    accepted = set()
+    for coding in accept_encoding.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0
+        if name and quality > 0:
+            accepted.add(name.lower())
+    return next(
+        encoding for encoding in SNAPSHOT_ENCODINGS
+        if encoding == 'identity' or encoding in accepted or '*' in accepted
+    )
+
+
+class SnapshotReader:
+    """
+    Per-process copy of the snapshot files, re-read only when the metadata
+    file changes. An expired, stale or missing snapshot is republished first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self.snapshot = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(snapshot_path('identity') + '.meta')
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        """``{'etag', 'expires_at', 'bodies'}`` with one body per encoding"""
+        version = self._stat()
+        if version is not None and version == self._version and not self._outdated():
+            return self.snapshot
+        with self._lock:
+            version = self._stat()
+            if version != self._version:
+                self._load(version)
+            if self.snapshot is None or self._outdated():
+                invalidate_home_content()
+                publish_snapshot()
+                self._load(self._stat())
+        return self.snapshot
+
+    def _outdated(self):
+        return time.time() >= self.snapshot['expires_at'] or os.path.exists(stale_marker_path())
+
+    def _load(self, version):
+        # A publish in the middle of reading changes the metadata, so read again
+        while version is not None:
+            with open(snapshot_path('identity') + '.meta', 'rb') as f:
+                snapshot = json.load(f)
+            snapshot['bodies'] = {}
+            for encoding in SNAPSHOT_ENCODINGS:
+                with open(snapshot_path(encoding), 'rb') as f:
+                    snapshot['bodies'][encoding] = f.read()
+            snapshot['payload'] = json.loads(snapshot['bodies']['identity'])
+            if self._stat() == version:
+                self._version, self.snapshot = version, snapshot
+                return
+            version = self._stat()
+        self._version = self.snapshot = None
+
+
+def refresh_home_content():
+    """Rebuild the cached payload and republish the snapshot after a change"""
+    invalidate_home_content()
+    try:
+        publish_snapshot()
+    except OSError:
+        # Saving content must not fail because the snapshot directory is unwritable
+        logger.exception("Publishing the home content snapshot failed")
+
+
+snapshot_reader = SnapshotReader()
+
+
+def current_home_content():
+    """
+    ``{'etag', 'payload'}`` of the published snapshot, answered from memory
+    while the snapshot is current. Falls back to the cached entry when the
+    snapshot directory can't be written.
+    """
+    try:
+        return snapshot_reader.get()
+    except OSError:
+        logger.exception("Reading the home content snapshot failed")
+        return get_home_content()
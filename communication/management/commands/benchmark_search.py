@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from communication.search import trigram
+from communication.search.backends import get_backend
+from communication.search.benchmark import (
+    Corpus, ReferenceIndex, QueryCounter, global_recall, quick_recall, summarize,
+)
+from communication.search.cache import global_search_cache
+from communication.search.prefix import quick_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark global and quick search on a synthetic corpus in a throwaway "
+        "SQLite database: p50/p95/p99 latency, SQL queries per request and recall"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000, help="Records generated per category")
+        parser.add_argument('--queries', type=int, default=200, help="Queries replayed per endpoint")
+        parser.add_argument('--warmup', type=int, default=10, help="Unmeasured queries run first")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--endpoint', choices=['global', 'quick', 'both'], default='both',
+        )
+        parser.add_argument(
+            '--backend',
+            help="Dotted path of the search backend to benchmark instead of the configured one",
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help="Clear the search cache before every request",
+        )
+        parser.add_argument(
+            '--database',
+            help="SQLite file to build the corpus in (default: a temporary file, removed afterwards)",
+        )
+        parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write("The benchmark runs against SQLite only")
+            return
+
+        with tempfile.TemporaryDirectory(prefix='search-benchmark-') as directory:
+            path = options['database'] or os.path.join(directory, 'benchmark.sqlite3')
+            connection.settings_dict['TEST']['NAME'] = path
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                overrides = {'ALLOWED_HOSTS': ['testserver']}
+                if options['backend']:
+                    overrides['SEARCH_BACKEND'] = options['backend']
+                with override_settings(**overrides):
+                    report = self.run_benchmark(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=bool(options['database']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.print_report(report)
+
+    def run_benchmark(self, options):
+        corpus = Corpus(options['size'], seed=options['seed'])
+        started = time.perf_counter()
+        corpus.generate()
+        backend = get_backend()
+        backend.rebuild()
+        trigram.rebuild()
+        quick_search_index.rebuild()
+        cache.clear()
+        reference = ReferenceIndex(corpus)
+        setup_seconds = time.perf_counter() - started
+
+        queries = corpus.queries(options['warmup'] + options['queries'])
+        endpoints = ['global', 'quick'] if options['endpoint'] == 'both' else [options['endpoint']]
+        report = {
+            'backend': backend.name,
+            'size': options['size'],
+            'queries': options['queries'],
+            'cold': options['cold'],
+            'setup_seconds': round(setup_seconds, 2),
+            'endpoints': {},
+        }
+
+        client = Client()
+        counter = QueryCounter()
+        counter.install()
+        try:
+            for endpoint in endpoints:
+                url = '/api/search/global/' if endpoint == 'global' else '/api/search/quick/'
+                samples = []
+                partial = 0
+                for position, (kind, query, intended) in enumerate(queries):
+                    if options['cold']:
+                        cache.clear()
+                    counter.count = 0
+                    started = time.perf_counter()
+                    response = client.get(url, {'q': query}).json()
+                    seconds = time.perf_counter() - started
+                    if position < options['warmup']:
+                        continue
+
+                    # Typos are scored against what the user meant to type
+                    if endpoint == 'global':
+                        recall = global_recall(response, reference.global_answers(kind, intended))
+                        partial += bool(response.get('partial'))
+                    else:
+                        recall = quick_recall(response, reference.quick_answers(kind, intended))
+                    samples.append((kind, seconds, counter.count, recall))
+
+                summary = summarize(samples)
+                if endpoint == 'global':
+                    summary['partial_responses'] = partial
+                report['endpoints'][endpoint] = summary
+        finally:
+            counter.uninstall()
+        report['global_search_cache'] = global_search_cache.metrics()
+        return report
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"Backend {report['backend']}, {report['size']} records per category, "
+            f"{report['queries']} queries{' (cold cache)' if report['cold'] else ''}, "
+            f"setup {report['setup_seconds']}s"
+        )
+        for endpoint, summary in report['endpoints'].items():
+            self.stdout.write(f"\n{endpoint}_search")
+            self.stdout.write(
+                f"  latency ms  p50 {summary['p50_ms']:.2f}  p95 {summary['p95_ms']:.2f}  p99 {summary['p99_ms']:.2f}"
+            )
+            self.stdout.write(f"  SQL queries mean {summary['mean_queries']:.1f}  max {summary['max_queries']}")
+            recall = '  '.join(
+                f"{kind} {value:.3f}" if value is not None else f"{kind} -"
+                for kind, value in summary['recall'].items()
+            )
+            self.stdout.write(f"  recall      {recall}")
+            if 'partial_responses' in summary:
+                self.stdout.write(f"  partial responses {summary['partial_responses']}")
+        self.stdout.write(self.style.SUCCESS("\nBenchmark finished"))
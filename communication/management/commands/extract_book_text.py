@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from communication.models import Book
+from communication.search.extraction import extract_book_text
+
+
+class Command(BaseCommand):
+    help = "Extract and index the PDF text of books, e.g. those uploaded before extraction existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('book_ids', nargs='*', type=int, help="Only these books (default: all with a PDF)")
+        parser.add_argument(
+            '--missing', action='store_true',
+            help="Skip books whose text was already extracted",
+        )
+
+    def handle(self, *args, **options):
+        books = Book.objects.exclude(pdf_file='').exclude(pdf_file__isnull=True)
+        if options['book_ids']:
+            books = books.filter(pk__in=options['book_ids'])
+        if options['missing']:
+            books = books.exclude(text_status='extracted')
+
+        for book in books.iterator():
+            extract_book_text(book)
+            book.refresh_from_db(fields=['text_status'])
+            self.stdout.write(f"{book.title}: {book.text_status}")
+        self.stdout.write(self.style.SUCCESS("Book text extraction finished"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from communication import home
+
+
+class Command(BaseCommand):
+    help = "Rebuild the home content payload and write its snapshot files"
+
+    def handle(self, *args, **options):
+        home.invalidate_home_content()
+        entry = home.publish_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Published {home.snapshot_path()} ({entry['etag']})"))
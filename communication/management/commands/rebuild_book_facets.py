@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from communication.search import facets
+
+
+class Command(BaseCommand):
+    help = "Recount the precomputed Book facet counts from the books table"
+
+    def handle(self, *args, **options):
+        cells = facets.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Book facet counts rebuilt ({cells} combination(s))"))
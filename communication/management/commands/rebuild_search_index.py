@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from communication.search import trigram
+from communication.search.backends import get_backend
+from communication.search.documents import INDEXED_DOCUMENTS
+
+
+class Command(BaseCommand):
+    help = "Rebuild the global search index from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', dest='doc_types', action='append',
+            choices=sorted({d.doc_type for d in INDEXED_DOCUMENTS} | set(trigram.TRIGRAM_SOURCES)),
+            help="Only rebuild the given document type (can be repeated)",
+        )
+        parser.add_argument(
+            '--backend',
+            help="Dotted path of the backend to rebuild instead of the configured one",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = import_string(options['backend'])() if options['backend'] else get_backend()
+        doc_types = options['doc_types'] or [d.doc_type for d in INDEXED_DOCUMENTS] + list(trigram.TRIGRAM_SOURCES)
+
+        documents = [d for d in INDEXED_DOCUMENTS if d.doc_type in doc_types]
+        if documents:
+            counts = backend.rebuild(documents, batch_size=options['batch_size'])
+            for doc_type, count in counts.items():
+                self.stdout.write(f"Indexed {count} {doc_type} record(s)")
+
+        trigram_types = [t for t in trigram.TRIGRAM_SOURCES if t in doc_types]
+        if trigram_types:
+            for doc_type, count in trigram.rebuild(trigram_types).items():
+                self.stdout.write(f"Indexed trigrams of {count} {doc_type} record(s)")
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt ({backend.name})"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from communication import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the platform counters in the Statistics row and repair any drift. "
+        "Schedule it periodically, e.g. nightly from cron."
+    )
+
+    def handle(self, *args, **options):
+        statistics, drift = counters.reconcile()
+        for counter, difference in drift.items():
+            self.stdout.write(self.style.WARNING(f"{counter} was off by {difference:+d}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Statistics reconciled: {statistics.active_students} students, {statistics.tutors} tutors, "
+            f"{statistics.courses} courses, {statistics.success_rate}% success rate"
+        ))
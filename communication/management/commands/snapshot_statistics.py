@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from communication import history
+
+
+def date_argument(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+
+class Command(BaseCommand):
+    help = (
+        "Append yesterday's statistics snapshot and update its weekly and monthly "
+        "rollups. Schedule it daily, shortly after midnight."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date_argument, help="Record this day (YYYY-MM-DD) instead of yesterday")
+        parser.add_argument(
+            '--backfill-from', type=date_argument,
+            help="Also create missing days from this date (YYYY-MM-DD) up to the day before yesterday "
+                 "from join and enrollment dates",
+        )
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        if options['backfill_from']:
+            added = history.backfill(options['backfill_from'], yesterday - timedelta(days=1))
+            self.stdout.write(f"Backfilled {added} day(s)")
+
+        day = options['date'] or yesterday
+        try:
+            snapshot = history.record_day(day)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if snapshot is None:
+            self.stdout.write(f"{day} was already recorded")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Recorded statistics of {day}"))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0006_book'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('column', models.CharField(max_length=20)),
+                ('token', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField(default=1)),
+                ('weight', models.PositiveIntegerField(default=1, help_text='Column weight multiplied by frequency')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doc_type', 'token'], name='search_posting_token_idx'), models.Index(fields=['doc_type', 'object_id'], name='search_posting_object_idx')],
+            },
+        ),
+    ]
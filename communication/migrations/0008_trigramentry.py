@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0007_searchposting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrigramEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('doc_type', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('field', models.CharField(max_length=20)),
+                ('trigram', models.CharField(max_length=3)),
+                ('gram_count', models.PositiveSmallIntegerField(help_text='Distinct trigrams in the field value')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doc_type', 'trigram', 'object_id'], name='trigram_entry_gram_idx'), models.Index(fields=['doc_type', 'object_id'], name='trigram_entry_object_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:35
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_books(apps, schema_editor):
+    Book = apps.get_model('communication', 'Book')
+    BookFacetCount = apps.get_model('communication', 'BookFacetCount')
+    cells = (
+        Book.objects.order_by()
+        .values('genre', 'language', 'publication_year', 'is_available')
+        .annotate(book_count=Count('id'))
+    )
+    BookFacetCount.objects.bulk_create(BookFacetCount(**cell) for cell in cells)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0008_trigramentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('genre', models.CharField(blank=True, max_length=100, null=True)),
+                ('language', models.CharField(max_length=50)),
+                ('publication_year', models.IntegerField(blank=True, null=True)),
+                ('is_available', models.BooleanField()),
+                ('book_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('genre', 'language', 'publication_year', 'is_available')},
+            },
+        ),
+        migrations.RunPython(count_existing_books, migrations.RunPython.noop),
+    ]
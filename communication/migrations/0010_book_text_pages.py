@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0009_bookfacetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='text_status',
+            field=models.CharField(choices=[('none', 'No PDF'), ('pending', 'Pending'), ('extracted', 'Extracted'), ('failed', 'Failed')], default='none', help_text='Progress of the PDF text extraction', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='BookPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_number', models.PositiveIntegerField()),
+                ('text', models.TextField()),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='text_pages', to='communication.book')),
+            ],
+            options={
+                'ordering': ['book', 'page_number'],
+                'unique_together': {('book', 'page_number')},
+            },
+        ),
+    ]
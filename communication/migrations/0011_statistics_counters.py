@@ -0,0 +1,81 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:44
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def count_statistics(apps, schema_editor):
+    Statistics = apps.get_model('communication', 'Statistics')
+    CustomUser = apps.get_model('users', 'CustomUser')
+    Course = apps.get_model('academics', 'Course')
+    Enrollment = apps.get_model('academics', 'Enrollment')
+
+    counts = CustomUser.objects.aggregate(
+        total_users=Count('id'),
+        active_students=Count('id', filter=Q(role='student')),
+        tutors=Count('id', filter=Q(role='tutor')),
+    )
+    counts.update(Enrollment.objects.aggregate(
+        total_enrollments=Count('id'),
+        active_enrollments=Count('id', filter=Q(status='enrolled')),
+        completed_enrollments=Count('id', filter=Q(status='completed')),
+        dropped_enrollments=Count('id', filter=Q(status='dropped')),
+    ))
+    counts['courses'] = Course.objects.count()
+    finished = counts['completed_enrollments'] + counts['dropped_enrollments']
+    counts['success_rate'] = (counts['completed_enrollments'] * 200 + finished) // (finished * 2) if finished else 0
+
+    statistics = Statistics.objects.order_by('-updated_at').first() or Statistics()
+    for counter, value in counts.items():
+        setattr(statistics, counter, value)
+    statistics.reconciled_at = timezone.now()
+    statistics.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0010_book_text_pages'),
+        ('academics', '0005_assignment_updated_at'),
+        ('users', '0002_alter_customuser_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statistics',
+            name='active_enrollments',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='statistics',
+            name='completed_enrollments',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='statistics',
+            name='dropped_enrollments',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='statistics',
+            name='reconciled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='statistics',
+            name='total_enrollments',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='statistics',
+            name='total_users',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='statistics',
+            name='success_rate',
+            field=models.IntegerField(default=0, help_text='Percentage of finished enrollments that were completed'),
+        ),
+        migrations.RunPython(count_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-17 00:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0011_statistics_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('total_users', models.IntegerField()),
+                ('active_students', models.IntegerField()),
+                ('tutors', models.IntegerField()),
+                ('courses', models.IntegerField()),
+                ('total_enrollments', models.IntegerField()),
+                ('active_enrollments', models.IntegerField(blank=True, null=True)),
+                ('completed_enrollments', models.IntegerField(blank=True, null=True)),
+                ('dropped_enrollments', models.IntegerField(blank=True, null=True)),
+                ('success_rate', models.IntegerField(blank=True, null=True)),
+                ('new_users', models.IntegerField()),
+                ('new_enrollments', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['period', 'period_start'],
+                'unique_together': {('period', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 02:10
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def copy_created_at(apps, schema_editor):
+    CampusLife = apps.get_model('communication', 'CampusLife')
+    CampusLife.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0012_statisticssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campuslife',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:16
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+FACET_FIELDS = ('genre', 'language', 'publication_year', 'is_available')
+
+
+def recount_with_unset_values(apps, schema_editor):
+    """Recount the cells with '' and 0 in place of NULL, merging the cells that now coincide"""
+    Book = apps.get_model('communication', 'Book')
+    BookFacetCount = apps.get_model('communication', 'BookFacetCount')
+    counts = Counter()
+    for group in Book.objects.order_by().values(*FACET_FIELDS).annotate(book_count=Count('id')):
+        counts[(group['genre'] or '', group['language'], group['publication_year'] or 0, group['is_available'])] += group['book_count']
+    BookFacetCount.objects.all().delete()
+    BookFacetCount.objects.bulk_create(
+        BookFacetCount(book_count=count, **dict(zip(FACET_FIELDS, cell))) for cell, count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0013_campuslife_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_with_unset_values, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='bookfacetcount',
+            name='genre',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='bookfacetcount',
+            name='publication_year',
+            field=models.IntegerField(default=0),
+        ),
+    ]
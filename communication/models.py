@@ -6,11 +6,21 @@ from django.utils import timezone
 from users.models import CustomUser
 
 class Statistics(models.Model):
-    """Site-wide statistics"""
+    """
+    Site-wide statistics. A single row whose counters are kept current by
+    model signals (see ``communication.counters``) and periodically
+    reconciled with ``manage.py reconcile_statistics``.
+    """
     active_students = models.IntegerField(default=0)
     courses = models.IntegerField(default=0)
-    success_rate = models.IntegerField(default=0)
+    success_rate = models.IntegerField(default=0, help_text="Percentage of finished enrollments that were completed")
     tutors = models.IntegerField(default=0)
+    total_users = models.IntegerField(default=0)
+    total_enrollments = models.IntegerField(default=0)
+    active_enrollments = models.IntegerField(default=0)
+    completed_enrollments = models.IntegerField(default=0)
+    dropped_enrollments = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -21,6 +31,41 @@ class Statistics(models.Model):
         return f"Statistics - Updated {self.updated_at.strftime('%Y-%m-%d')}"
 
 
+class StatisticsSnapshot(models.Model):
+    """
+    Statistics history. Daily rows are appended once per day; weekly and
+    monthly rows are rollups of the daily rows in their period.
+    """
+    period = models.CharField(max_length=5, choices=[
+        ('day', 'Day'),
+        ('week', 'Week'),
+        ('month', 'Month')
+    ])
+    period_start = models.DateField()
+    # Levels at the end of the period
+    total_users = models.IntegerField()
+    active_students = models.IntegerField()
+    tutors = models.IntegerField()
+    courses = models.IntegerField()
+    total_enrollments = models.IntegerField()
+    # Unknown for days backfilled from join and enrollment dates
+    active_enrollments = models.IntegerField(null=True, blank=True)
+    completed_enrollments = models.IntegerField(null=True, blank=True)
+    dropped_enrollments = models.IntegerField(null=True, blank=True)
+    success_rate = models.IntegerField(null=True, blank=True)
+    # Activity during the period
+    new_users = models.IntegerField()
+    new_enrollments = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['period', 'period_start']
+        unique_together = ['period', 'period_start']
+
+    def __str__(self):
+        return f"Statistics {self.period} of {self.period_start}"
+
+
 class News(models.Model):
     """News articles"""
     title = models.CharField(max_length=255)
@@ -100,6 +145,7 @@ class CampusLife(models.Model):
     image_url = models.URLField(blank=True, null=True, help_text="Alternative to uploading image")
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='campus_images')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     published = models.BooleanField(default=True)
     
     class Meta:
@@ -242,6 +288,12 @@ class Book(models.Model):
     pages = models.IntegerField(blank=True, null=True)
     is_available = models.BooleanField(default=True)
     uploaded_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    text_status = models.CharField(max_length=10, choices=[
+        ('none', 'No PDF'),
+        ('pending', 'Pending'),
+        ('extracted', 'Extracted'),
+        ('failed', 'Failed')
+    ], default='none', help_text="Progress of the PDF text extraction")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -264,3 +316,79 @@ class Book(models.Model):
         if self.pdf_file:
             return self.pdf_file.url
         return None
+
+
+class BookPage(models.Model):
+    """Text of one page of a book's PDF, indexed for full-text search"""
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='text_pages')
+    page_number = models.PositiveIntegerField()
+    text = models.TextField()
+
+    class Meta:
+        ordering = ['book', 'page_number']
+        unique_together = ['book', 'page_number']
+
+    def __str__(self):
+        return f"{self.book.title} - page {self.page_number}"
+
+
+# -------------------------------------
+# Search Index Models
+# -------------------------------------
+class SearchPosting(models.Model):
+    """Inverted index entry: one token found in one column of a searchable record"""
+    doc_type = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    column = models.CharField(max_length=20)
+    token = models.CharField(max_length=64)
+    frequency = models.PositiveIntegerField(default=1)
+    weight = models.PositiveIntegerField(default=1, help_text="Column weight multiplied by frequency")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['doc_type', 'token'], name='search_posting_token_idx'),
+            models.Index(fields=['doc_type', 'object_id'], name='search_posting_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> {self.doc_type}:{self.object_id}"
+
+
+class TrigramEntry(models.Model):
+    """Trigram of one field value, used for typo-tolerant lookups"""
+    doc_type = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    field = models.CharField(max_length=20)
+    trigram = models.CharField(max_length=3)
+    gram_count = models.PositiveSmallIntegerField(help_text="Distinct trigrams in the field value")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['doc_type', 'trigram', 'object_id'], name='trigram_entry_gram_idx'),
+            models.Index(fields=['doc_type', 'object_id'], name='trigram_entry_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} -> {self.doc_type}:{self.object_id}.{self.field}"
+
+
+# -------------------------------------
+# Book Facet Models
+# -------------------------------------
+class BookFacetCount(models.Model):
+    """
+    Number of books sharing one combination of facet values, kept up to date
+    by Book signals so facet counts never scan the books table. Books without
+    a genre or year count in the '' and 0 cells.
+    """
+    genre = models.CharField(max_length=100, blank=True, default='')
+    language = models.CharField(max_length=50)
+    publication_year = models.IntegerField(default=0)
+    is_available = models.BooleanField()
+    book_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['genre', 'language', 'publication_year', 'is_available']
+
+    def __str__(self):
+        return f"{self.genre}/{self.language}/{self.publication_year}/{self.is_available}: {self.book_count}"
@@ -0,0 +1,6 @@
+"""
+Search index for the global and quick search endpoints.
+
+Searchable models are described in ``documents``; ``backends`` keeps their
+index current and answers ranked queries.
+"""
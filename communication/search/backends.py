@@ -0,0 +1,457 @@
+# search/backends.py
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.db.models import Q, Sum, Max, Case, When, Value, IntegerField
+from django.utils.module_loading import import_string
+
+from communication.models import SearchPosting
+from .documents import INDEXED_DOCUMENTS, get_document, get_document_for_model
+from .text import token_counts, query_terms, mark_terms, render_marked, MARK_START, MARK_END, PREFIX_END
+
+
+class SearchHit:
+    """One ranked match; ``highlights`` is None when the backend leaves highlighting to Python"""
+    __slots__ = ('object_id', 'score', 'highlights')
+
+    def __init__(self, object_id, score, highlights=None):
+        self.object_id = object_id
+        self.score = score
+        self.highlights = highlights
+
+
+class BaseSearchBackend:
+    """
+    Interface shared by the search backends.
+
+    Hits are ordered by descending score, then ascending object id. ``after``
+    is the ``(score, object_id)`` of the last hit already returned, so pages
+    are fetched by keyset rather than offset. ``fields`` restricts matching
+    to a subset of the document's search fields, and ``within`` (a queryset
+    of the document's model) to the records it selects.
+    """
+    name = None
+
+    def index_instance(self, instance):
+        raise NotImplementedError
+
+    def remove_instance(self, instance):
+        raise NotImplementedError
+
+    def index_records(self, document, instances):
+        """Index new records of one type at once, e.g. rows saved with ``bulk_create``"""
+        raise NotImplementedError
+
+    def remove_records(self, document, object_ids):
+        raise NotImplementedError
+
+    def create_tables(self, documents=None):
+        """Create the storage the index keeps outside model tables, if any"""
+
+    def indexed_count(self, document):
+        """Number of records of a document type in the index"""
+        raise NotImplementedError
+
+    def rebuild(self, documents=None, batch_size=500):
+        """Re-index every searchable record, returning the number indexed per type"""
+        raise NotImplementedError
+
+    def sync(self, documents=None, batch_size=500):
+        """
+        Create the index storage and rebuild the document types whose index
+        holds a different number of records than are searchable, e.g. rows
+        that existed before the index did. Returns the number indexed per
+        rebuilt type.
+        """
+        documents = documents or INDEXED_DOCUMENTS
+        self.create_tables(documents)
+        stale = [d for d in documents if self.indexed_count(d) != d.get_queryset().count()]
+        return self.rebuild(stale, batch_size=batch_size) if stale else {}
+
+    def search(self, document, query, limit=10, fields=None, after=None, within=None):
+        raise NotImplementedError
+
+    def count(self, document, query, fields=None, cap=1000, within=None):
+        """
+        Number of matching records as ``(count, is_estimate)``. Counting
+        stops after ``cap`` matches, which are then reported as an estimate.
+        """
+        raise NotImplementedError
+
+    def highlight(self, document, instance, query):
+        terms = query_terms(query)
+        return {
+            field: mark_terms(value, terms, snippet=field in document.snippet_fields)
+            for field, value in document.get_values(instance).items()
+        }
+
+
+class PostingsBackend(BaseSearchBackend):
+    """
+    Portable inverted index stored in ``SearchPosting`` rows.
+
+    Every query term must match the prefix of some token of the record, and
+    hits are ranked by the summed weight of their matching postings.
+    """
+    name = 'postings'
+
+    def build_postings(self, document, instance):
+        postings = []
+        for field, text in document.get_values(instance).items():
+            for token, frequency in token_counts(text).items():
+                postings.append(SearchPosting(
+                    doc_type=document.doc_type,
+                    object_id=instance.pk,
+                    column=field,
+                    token=token,
+                    frequency=frequency,
+                    weight=document.fields[field] * frequency,
+                ))
+        return postings
+
+    def index_instance(self, instance):
+        document = get_document_for_model(type(instance))
+        with transaction.atomic():
+            self.remove_instance(instance)
+            if document.is_searchable(instance):
+                SearchPosting.objects.bulk_create(self.build_postings(document, instance))
+
+    def remove_instance(self, instance):
+        document = get_document_for_model(type(instance))
+        SearchPosting.objects.filter(doc_type=document.doc_type, object_id=instance.pk).delete()
+
+    def index_records(self, document, instances):
+        SearchPosting.objects.bulk_create(
+            [
+                posting
+                for instance in instances if document.is_searchable(instance)
+                for posting in self.build_postings(document, instance)
+            ],
+            batch_size=500,
+        )
+
+    def remove_records(self, document, object_ids):
+        SearchPosting.objects.filter(doc_type=document.doc_type, object_id__in=list(object_ids)).delete()
+
+    def indexed_count(self, document):
+        return SearchPosting.objects.filter(doc_type=document.doc_type).values('object_id').distinct().count()
+
+    def rebuild(self, documents=None, batch_size=500):
+        counts = {}
+        for document in documents or INDEXED_DOCUMENTS:
+            indexed = 0
+            with transaction.atomic():
+                SearchPosting.objects.filter(doc_type=document.doc_type).delete()
+                batch = []
+                for instance in document.get_queryset().iterator(chunk_size=batch_size):
+                    batch.extend(self.build_postings(document, instance))
+                    indexed += 1
+                    if len(batch) >= batch_size:
+                        SearchPosting.objects.bulk_create(batch)
+                        batch = []
+                SearchPosting.objects.bulk_create(batch)
+            counts[document.doc_type] = indexed
+        return counts
+
+    def _hits(self, document, query, fields=None, within=None):
+        terms = query_terms(query)
+        if not terms:
+            return None
+
+        postings = SearchPosting.objects.filter(doc_type=document.doc_type)
+        if fields:
+            postings = postings.filter(column__in=fields)
+        if within is not None:
+            postings = postings.filter(object_id__in=within.values('pk'))
+
+        term_filters = [Q(token__gte=term, token__lt=term + PREFIX_END) for term in terms]
+        matched = {
+            f'term_{position}': Max(Case(When(term_filter, then=Value(1)), default=Value(0), output_field=IntegerField()))
+            for position, term_filter in enumerate(term_filters)
+        }
+        return (
+            postings
+            .filter(reduce(or_, term_filters))
+            .values('object_id')
+            .annotate(score=Sum('weight'), **matched)
+            .filter(**{name: 1 for name in matched})
+        )
+
+    def search(self, document, query, limit=10, fields=None, after=None, within=None):
+        hits = self._hits(document, query, fields, within)
+        if hits is None:
+            return []
+        if after is not None:
+            score, object_id = after
+            hits = hits.filter(Q(score__lt=score) | Q(score=score, object_id__gt=object_id))
+        hits = hits.order_by('-score', 'object_id').values_list('object_id', 'score')
+        return [SearchHit(object_id, score) for object_id, score in hits[:limit]]
+
+    def count(self, document, query, fields=None, cap=1000, within=None):
+        hits = self._hits(document, query, fields, within)
+        if hits is None:
+            return 0, False
+        total = hits.order_by()[:cap + 1].count()
+        return min(total, cap), total > cap
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    SQLite FTS5 virtual tables, one per document type, keyed by the record's
+    primary key. Ranking uses BM25 with the document's field weights, and
+    highlights/snippets are produced by SQLite.
+    """
+    name = 'fts5'
+    tokenizer = 'unicode61 remove_diacritics 2'
+    snippet_tokens = 12
+
+    @staticmethod
+    def is_available():
+        if connection.vendor != 'sqlite':
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            return any(option == 'ENABLE_FTS5' for option, in cursor.fetchall())
+
+    def table_name(self, document):
+        return f'communication_search_{document.doc_type}'
+
+    def _create_table(self, cursor, document):
+        table = connection.ops.quote_name(self.table_name(document))
+        columns = ', '.join(document.fields)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+            f"{columns}, tokenize='{self.tokenizer}', prefix='2 3')"
+        )
+
+    def create_tables(self, documents=None):
+        # Created after migrations (see signals.sync_search_index), never while serving requests
+        with transaction.atomic(), connection.cursor() as cursor:
+            for document in documents or INDEXED_DOCUMENTS:
+                self._create_table(cursor, document)
+
+    def indexed_count(self, document):
+        table = connection.ops.quote_name(self.table_name(document))
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {table}")
+            return cursor.fetchone()[0]
+
+    def _insert(self, cursor, document, rows):
+        table = connection.ops.quote_name(self.table_name(document))
+        placeholders = ', '.join(['%s'] * (len(document.fields) + 1))
+        cursor.executemany(
+            f"INSERT INTO {table}(rowid, {', '.join(document.fields)}) VALUES ({placeholders})",
+            rows,
+        )
+
+    def _row(self, document, instance):
+        values = document.get_values(instance)
+        return [instance.pk] + [values[field] for field in document.fields]
+
+    def index_instance(self, instance):
+        document = get_document_for_model(type(instance))
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._delete(cursor, document, instance.pk)
+            if document.is_searchable(instance):
+                self._insert(cursor, document, [self._row(document, instance)])
+
+    def remove_instance(self, instance):
+        document = get_document_for_model(type(instance))
+        with connection.cursor() as cursor:
+            self._delete(cursor, document, instance.pk)
+
+    def _delete(self, cursor, document, object_id):
+        table = connection.ops.quote_name(self.table_name(document))
+        cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [object_id])
+
+    def index_records(self, document, instances):
+        rows = [self._row(document, instance) for instance in instances if document.is_searchable(instance)]
+        if rows:
+            with connection.cursor() as cursor:
+                self._insert(cursor, document, rows)
+
+    def remove_records(self, document, object_ids):
+        object_ids = list(object_ids)
+        if not object_ids:
+            return
+        table = connection.ops.quote_name(self.table_name(document))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid IN ({', '.join(['%s'] * len(object_ids))})", object_ids)
+
+    def _within(self, within):
+        """SQL restricting rowids to the records of a queryset, and its parameters"""
+        if within is None:
+            return '', []
+        sql, params = within.values('pk').query.sql_with_params()
+        return f" AND rowid IN ({sql})", list(params)
+
+    def rebuild(self, documents=None, batch_size=500):
+        counts = {}
+        for document in documents or INDEXED_DOCUMENTS:
+            table = connection.ops.quote_name(self.table_name(document))
+            indexed = 0
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Recreate so field changes in the document take effect
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                self._create_table(cursor, document)
+                batch = []
+                for instance in document.get_queryset().iterator(chunk_size=batch_size):
+                    batch.append(self._row(document, instance))
+                    indexed += 1
+                    if len(batch) >= batch_size:
+                        self._insert(cursor, document, batch)
+                        batch = []
+                if batch:
+                    self._insert(cursor, document, batch)
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+            counts[document.doc_type] = indexed
+        return counts
+
+    def match_expression(self, query, fields=None):
+        terms = query_terms(query)
+        if not terms:
+            return None
+        # Terms are plain word tokens, so quoting them is enough to neutralise FTS syntax
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        if fields:
+            expression = f"{{{' '.join(fields)}}} : ({expression})"
+        return expression
+
+    def search(self, document, query, limit=10, fields=None, after=None, within=None):
+        expression = self.match_expression(query, fields)
+        if expression is None:
+            return []
+
+        table = connection.ops.quote_name(self.table_name(document))
+        weights = ', '.join(str(float(weight)) for weight in document.fields.values())
+        restriction, restriction_params = self._within(within)
+        # rank can't be compared inside an FTS query, so the keyset is applied outside it
+        keyset, params = '', [expression, f'bm25({weights})', *restriction_params]
+        if after is not None:
+            keyset = "WHERE score < %s OR (score = %s AND rowid > %s)"
+            params += [after[0], after[0], after[1]]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, score FROM ("
+                f"SELECT rowid, -rank AS score FROM {table} WHERE {table} MATCH %s AND rank MATCH %s{restriction}"
+                f") {keyset} ORDER BY score DESC, rowid LIMIT %s",
+                params + [limit],
+            )
+            hits = [SearchHit(object_id, score) for object_id, score in cursor.fetchall()]
+            if hits:
+                self._add_highlights(cursor, document, table, expression, hits)
+        return hits
+
+    def _add_highlights(self, cursor, document, table, expression, hits):
+        # Highlighting only the page's rows keeps deep pages cheap
+        markers = f"char({ord(MARK_START)}), char({ord(MARK_END)})"
+        highlights = []
+        for position, field in enumerate(document.fields):
+            if field in document.snippet_fields:
+                highlights.append(f"snippet({table}, {position}, {markers}, '…', {self.snippet_tokens})")
+            else:
+                highlights.append(f"highlight({table}, {position}, {markers})")
+
+        cursor.execute(
+            f"SELECT rowid, {', '.join(highlights)} FROM {table} "
+            f"WHERE {table} MATCH %s AND rowid IN ({', '.join(['%s'] * len(hits))})",
+            [expression] + [hit.object_id for hit in hits],
+        )
+        marked = {object_id: texts for object_id, *texts in cursor.fetchall()}
+        for hit in hits:
+            hit.highlights = {
+                field: render_marked(text)
+                for field, text in zip(document.fields, marked.get(hit.object_id, ()))
+            }
+
+    def count(self, document, query, fields=None, cap=1000, within=None):
+        expression = self.match_expression(query, fields)
+        if expression is None:
+            return 0, False
+
+        table = connection.ops.quote_name(self.table_name(document))
+        restriction, restriction_params = self._within(within)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM (SELECT rowid FROM {table} WHERE {table} MATCH %s{restriction} LIMIT %s)",
+                [expression, *restriction_params, cap + 1],
+            )
+            total = cursor.fetchone()[0]
+        return min(total, cap), total > cap
+
+
+_backend = None
+
+
+def get_backend():
+    """
+    The configured search backend. ``SEARCH_BACKEND`` may name a backend
+    class; by default FTS5 is used on SQLite and postings everywhere else.
+    """
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+        if backend_path:
+            _backend = import_string(backend_path)()
+        elif SQLiteFTS5Backend.is_available():
+            _backend = SQLiteFTS5Backend()
+        else:
+            _backend = PostingsBackend()
+    return _backend
+
+
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting in ('SEARCH_BACKEND', 'DATABASES'):
+        _backend = None
+
+
+setting_changed.connect(_reset_backend)
+
+
+def encode_cursor(hit):
+    return urlsafe_b64encode(json.dumps([hit.score, hit.object_id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """``(score, object_id)`` keyset of an encoded cursor; ValueError when malformed"""
+    try:
+        score, object_id = json.loads(urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError, binascii.Error):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(score, (int, float)) or not isinstance(object_id, int):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return score, object_id
+
+
+def search_documents(doc_type, query, limit=10, fields=None, highlight=True, after=None, within=None):
+    """
+    One page of ranked ``(instance, highlights)`` pairs for a document type,
+    and the cursor of the next page (None on the last page). ``within``
+    restricts hits to the records of a queryset before the page is cut.
+    """
+    backend = get_backend()
+    document = get_document(doc_type)
+    # One extra hit tells whether another page exists
+    page = backend.search(document, query, limit=limit + 1, fields=fields, after=after, within=within)
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    hits = {hit.object_id: hit for hit in page[:limit]}
+
+    results = []
+    for instance in document.fetch(list(hits)):
+        highlights = hits[instance.pk].highlights
+        if highlight and highlights is None:
+            highlights = backend.highlight(document, instance, query)
+        results.append((instance, highlights))
+    return results, next_cursor
+
+
+def count_documents(doc_type, query, fields=None, cap=1000, within=None):
+    return get_backend().count(get_document(doc_type), query, fields=fields, cap=cap, within=within)
@@ -0,0 +1,300 @@
+# search/benchmark.py
+"""
+Synthetic corpus, query mix and reference answers used by the
+``benchmark_search`` command. The reference answers come from the words
+each record was generated from, so recall does not inherit the matching
+rules of the backends it measures.
+"""
+import math
+import random
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from academics.models import Course, Assignment
+from communication.models import News, Event, Announcement
+from .documents import DOCUMENTS
+
+User = get_user_model()
+
+# Result slots per global search category, see views._search_category
+GLOBAL_SEARCH_PAGE_SIZE = 10
+QUICK_SEARCH_LIMIT = 10
+
+WORDS = (
+    'algebra analysis anatomy ancient applied architecture art astronomy biology botany business '
+    'calculus campus career cells chemistry civic climate coding computer culture data design '
+    'digital drama ecology economics education electronics energy engineering english ethics '
+    'exam field finance french fundamentals genetics geography geology geometry global grammar '
+    'health history human island journal kinetics laboratory language law leadership library '
+    'linear literature logic machine management marine marketing materials mathematics mechanics '
+    'media medicine methods microbiology modern molecular music network neuroscience nutrition '
+    'ocean optics organic painting philosophy photography physics planning poetry policy politics '
+    'practice probability programming project psychology public quantum reading renewable research '
+    'robotics science security seminar society sociology software spanish statistics structures '
+    'studio sustainability systems theatre theory thermodynamics topology urban vision writing zoology'
+).split()
+
+FIRST_NAMES = 'amina bola chidi david emeka fatima grace hassan ibrahim joy kemi lola musa ngozi ola tunde yusuf zainab'.split()
+LAST_NAMES = 'adeyemi bello chukwu danjuma eze folarin garba ibekwe jimoh lawal musa nwosu okafor sani usman yakubu'.split()
+EMAIL_DOMAIN = 'example.edu'
+
+QUERY_MIX = (
+    ('term', 0.5),
+    ('phrase', 0.2),
+    ('prefix', 0.2),
+    ('typo', 0.1),
+)
+
+
+class Corpus:
+    """
+    Deterministic synthetic records for every global search category.
+    ``labels`` keeps the words each searchable record was generated from,
+    the ground truth the benchmark scores responses against.
+    """
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.random = random.Random(seed)
+        # Zipf-like word frequencies, so some terms match far more records than others
+        self.weights = [1 / rank for rank in range(1, len(WORDS) + 1)]
+        # doc_type -> {pk: (words of the searched fields, words of the suggested fields)}
+        self.labels = defaultdict(dict)
+        # Word lists of course and news titles, sampled by phrase queries
+        self.titles = []
+
+    def words(self, low, high):
+        return self.random.choices(WORDS, self.weights, k=self.random.randint(low, high))
+
+    def label(self, doc_type, records):
+        """Keep the words of the ``(instance, searched, suggested, searchable)`` records"""
+        for instance, searched, suggested, searchable in records:
+            if searchable:
+                self.labels[doc_type][instance.pk] = (frozenset(searched), frozenset(suggested))
+
+    def generate(self, batch_size=500):
+        """Insert ``size`` records per category"""
+        rng = self.random
+        now = timezone.now()
+
+        records = []
+        for i in range(self.size):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            user = User(
+                username=f'user{i}',
+                first_name=first_name.title(),
+                last_name=last_name.title(),
+                email=f'user{i}@{EMAIL_DOMAIN}',
+                role=rng.choice(['student', 'student', 'student', 'tutor', 'admin']),
+                password='!',
+            )
+            records.append((user, [first_name, last_name, user.username, *EMAIL_DOMAIN.split('.')], [], True))
+        users = User.objects.bulk_create([record[0] for record in records], batch_size=batch_size)
+        self.label('user', records)
+        tutors = [user for user in users if user.role == 'tutor'] or users
+        admins = [user for user in users if user.role == 'admin'] or users
+
+        records = []
+        for i in range(self.size):
+            code = f'{rng.choice(WORDS)[:3].upper()}{i:04}'
+            title, description, subject = self.words(2, 5), self.words(15, 40), rng.choice(WORDS)
+            course = Course(
+                code=code,
+                title=' '.join(title).title(),
+                description=' '.join(description),
+                subject=subject.title(),
+                tutor=rng.choice(tutors),
+                is_active=rng.random() < 0.9,
+            )
+            records.append((course, [*title, *description, subject, code.lower()], [*title, code.lower()], course.is_active))
+            self.titles.append(title)
+        courses = Course.objects.bulk_create([record[0] for record in records], batch_size=batch_size)
+        self.label('course', records)
+
+        records = []
+        for i in range(self.size):
+            title, description, instructions = self.words(2, 6), self.words(10, 30), self.words(10, 30)
+            assignment = Assignment(
+                course=rng.choice(courses),
+                tutor=rng.choice(tutors),
+                title=' '.join(title).title(),
+                description=' '.join(description),
+                instructions=' '.join(instructions),
+                due_date=now + timedelta(days=rng.randint(-30, 60)),
+                max_points=100,
+            )
+            records.append((assignment, [*title, *description, *instructions], title, True))
+        Assignment.objects.bulk_create([record[0] for record in records], batch_size=batch_size)
+        self.label('assignment', records)
+
+        records = []
+        for i in range(self.size):
+            title, content = self.words(3, 8), self.words(40, 120)
+            news = News(
+                title=' '.join(title).title(), content=' '.join(content),
+                author=rng.choice(admins), published=rng.random() < 0.9,
+            )
+            records.append((news, [*title, *content], title, news.published))
+            self.titles.append(title)
+        News.objects.bulk_create([record[0] for record in records], batch_size=batch_size)
+        self.label('news', records)
+
+        records = []
+        for i in range(self.size):
+            title, content, place = self.words(2, 6), self.words(20, 60), rng.choice(WORDS)
+            event = Event(
+                title=' '.join(title).title(),
+                content=' '.join(content),
+                location=f'{place.title()} Hall',
+                event_date=now + timedelta(days=rng.randint(-60, 90)),
+                published=rng.random() < 0.9,
+            )
+            records.append((event, [*title, *content, place, 'hall'], [], event.published))
+        Event.objects.bulk_create([record[0] for record in records], batch_size=batch_size)
+        self.label('event', records)
+
+        records = []
+        for i in range(self.size):
+            admin, title, content = rng.choice(admins), self.words(3, 7), self.words(20, 60)
+            announcement = Announcement(
+                admin=admin, title=' '.join(title).title(), content=' '.join(content), published=rng.random() < 0.9,
+            )
+            records.append((announcement, [*title, *content], [], announcement.published))
+        Announcement.objects.bulk_create([record[0] for record in records], batch_size=batch_size)
+        self.label('announcement', records)
+
+    def queries(self, count):
+        """``(kind, query, intended query)`` tuples drawn from ``QUERY_MIX``"""
+        rng = self.random
+        kinds, shares = zip(*QUERY_MIX)
+        queries = []
+        for kind in rng.choices(kinds, shares, k=count):
+            word = rng.choices(WORDS, self.weights)[0]
+            if kind == 'term':
+                queries.append((kind, word, word))
+            elif kind == 'phrase':
+                words = rng.choice(self.titles) if self.titles else [word]
+                phrase = ' '.join(rng.sample(words, min(2, len(words))))
+                queries.append((kind, phrase, phrase))
+            elif kind == 'prefix':
+                prefix = word[:rng.randint(3, 5)]
+                queries.append((kind, prefix, prefix))
+            else:
+                # Drop one inner character, the most common typo
+                while len(word) < 5:
+                    word = rng.choices(WORDS, self.weights)[0]
+                position = rng.randint(1, len(word) - 2)
+                queries.append((kind, word[:position] + word[position + 1:], word))
+        return queries
+
+
+class ReferenceIndex:
+    """
+    Relevant records of each query, judged from the corpus labels rather
+    than the search index or its tokenizer: a record is relevant to a
+    prefix query when one of its words starts with the prefix, and to any
+    other query when it holds every word the user meant to type.
+    """
+
+    def __init__(self, corpus):
+        self.labels = corpus.labels
+
+    def _answers(self, kind, intended, doc_types, suggested=False):
+        terms = intended.split()
+        answers = {}
+        for doc_type in doc_types:
+            relevant = answers[doc_type] = set()
+            for pk, labels in self.labels[doc_type].items():
+                words = labels[suggested]
+                if kind == 'prefix':
+                    matched = any(word.startswith(terms[0]) for word in words)
+                else:
+                    matched = all(term in words for term in terms)
+                if matched:
+                    relevant.add(pk)
+        return answers
+
+    def global_answers(self, kind, intended):
+        answers = self._answers(kind, intended, [document.doc_type for document in DOCUMENTS])
+        return {document.result_key: answers[document.doc_type] for document in DOCUMENTS}
+
+    def quick_answers(self, kind, intended):
+        return self._answers(kind, intended, [document.doc_type for document in DOCUMENTS if document.suggest_fields], suggested=True)
+
+
+def global_recall(response, answers):
+    """Share of the relevant records the response could show that it did show"""
+    expected = found = 0
+    for key, relevant in answers.items():
+        returned = {result['id'] for result in response['results'].get(key, [])}
+        expected += min(len(relevant), GLOBAL_SEARCH_PAGE_SIZE)
+        found += len(returned & relevant)
+    return found / expected if expected else None
+
+
+def quick_recall(response, answers):
+    limits = {document.doc_type: document.suggest_limit for document in DOCUMENTS}
+    expected = min(sum(min(len(relevant), limits[doc_type]) for doc_type, relevant in answers.items()), QUICK_SEARCH_LIMIT)
+    returned = {(suggestion['type'], suggestion['id']) for suggestion in response.get('suggestions', [])}
+    found = sum(1 for doc_type, relevant in answers.items() for pk in relevant if (doc_type, pk) in returned)
+    return min(found, expected) / expected if expected else None
+
+
+class QueryCounter:
+    """Counts SQL statements on every thread's connection, including search pool threads"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def _attach(self, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def install(self):
+        connection_created.connect(self._attach, weak=False)
+        for conn in connections.all():
+            self._attach(conn)
+
+    def uninstall(self):
+        connection_created.disconnect(self._attach)
+        if self in connection.execute_wrappers:
+            connection.execute_wrappers.remove(self)
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of ``values``"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(share * len(ordered)) - 1, 0)]
+
+
+def summarize(samples):
+    """Latency, query and recall statistics of ``(kind, seconds, queries, recall)`` samples"""
+    latencies = [seconds * 1000 for kind, seconds, queries, recall in samples]
+    query_counts = [queries for kind, seconds, queries, recall in samples]
+    summary = {
+        'requests': len(samples),
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'mean_queries': sum(query_counts) / len(query_counts) if query_counts else None,
+        'max_queries': max(query_counts, default=None),
+        'recall': {},
+    }
+    for kind, share in QUERY_MIX + (('all', None),):
+        recalls = [recall for sample_kind, seconds, queries, recall in samples if recall is not None and kind in (sample_kind, 'all')]
+        summary['recall'][kind] = sum(recalls) / len(recalls) if recalls else None
+    return summary
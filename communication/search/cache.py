@@ -0,0 +1,120 @@
+# search/cache.py
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .documents import DOCUMENTS
+from .text import tokenize, query_terms
+
+# Records are tagged by the first characters of their tokens
+TAG_PREFIX_LENGTH = 3
+
+
+def _bucket_tags(doc_type, tokens):
+    return {f'{doc_type}:{token[:length]}' for token in tokens for length in range(1, TAG_PREFIX_LENGTH + 1)}
+
+
+def query_tags(query, fuzzy_types=()):
+    """
+    Tags of a cached result set. A record can only match when one of its
+    tokens starts with the query's longest term, so tagging that term's
+    prefix bucket per document type is enough. Categories answered by fuzzy
+    matching can include any record of their type.
+    """
+    tags = set()
+    terms = query_terms(query)
+    if terms:
+        longest = max(terms, key=len)
+        tags.update(f'{document.doc_type}:{longest[:TAG_PREFIX_LENGTH]}' for document in DOCUMENTS)
+    tags.update(f'{doc_type}:*' for doc_type in fuzzy_types)
+    return tags
+
+
+def record_tags(document, instance):
+    """Tags of every cached result set the record could appear in"""
+    tokens = set()
+    for value in document.get_values(instance).values():
+        tokens.update(tokenize(value))
+    return _bucket_tags(document.doc_type, tokens) | {f'{document.doc_type}:*'}
+
+
+class SearchResultCache:
+    """
+    Search responses cached per normalized query and caller role;
+    ``variant`` distinguishes other request parameters such as the page.
+
+    Each entry remembers the version of its tags when stored; invalidating a
+    tag bumps its version, so only entries carrying that tag stop matching.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'SEARCH_CACHE_TIMEOUT', 300)
+
+    def _key(self, query, role, variant):
+        normalized = ' '.join(query_terms(query))
+        digest = hashlib.sha1(f'{normalized}|{variant}'.encode()).hexdigest()
+        return f'{self.prefix}:{role}:{digest}'
+
+    def _tag_key(self, tag):
+        return f'{self.prefix}:tag:{tag}'
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, query, role, variant=''):
+        entry = cache.get(self._key(query, role, variant))
+        if entry is not None:
+            versions = cache.get_many(list(entry['tags']))
+            if versions == entry['tags']:
+                self._count(hit=True)
+                return entry['payload']
+        self._count(hit=False)
+        return None
+
+    def set(self, query, role, payload, tags, variant=''):
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        versions = cache.get_many(tag_keys)
+        # Fresh unique versions, so evicted tags never revalidate old entries
+        missing = {tag_key: time.time_ns() for tag_key in tag_keys if tag_key not in versions}
+        if missing:
+            cache.set_many(missing, timeout=None)
+            versions.update(missing)
+        cache.set(self._key(query, role, variant), {'tags': versions, 'payload': payload}, self.timeout)
+
+    def invalidate(self, tags):
+        for tag in tags:
+            tag_key = self._tag_key(tag)
+            try:
+                cache.incr(tag_key)
+            except ValueError:
+                cache.set(tag_key, time.time_ns(), timeout=None)
+        with self._lock:
+            self.invalidations += 1
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+            'miss_ratio': self.misses / lookups if lookups else None,
+            'invalidations': self.invalidations,
+        }
+
+
+global_search_cache = SearchResultCache('search:global')
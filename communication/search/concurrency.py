@@ -0,0 +1,104 @@
+# search/concurrency.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.SEARCH_WORKERS,
+                thread_name_prefix='search',
+            )
+    return _executor
+
+
+def _reset_executor(setting, **kwargs):
+    global _executor
+    if setting == 'SEARCH_WORKERS':
+        with _executor_lock:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+setting_changed.connect(_reset_executor)
+
+
+class _Task:
+    """A pool task remembering when a worker picked it up"""
+
+    def __init__(self, function):
+        self.function = function
+        self.started = threading.Event()
+        self.started_at = None
+
+    def __call__(self):
+        self.started_at = time.monotonic()
+        self.started.set()
+        try:
+            return self.function()
+        finally:
+            # Pool threads hold their own connections; release them like a request would
+            close_old_connections()
+
+
+def _run_inline(tasks):
+    results, failed = {}, []
+    for name, task in tasks.items():
+        try:
+            results[name] = task()
+        except Exception:
+            logger.exception("Search task %s failed", name)
+            failed.append(name)
+    return results, [], failed
+
+
+def run_concurrently(tasks, timeout):
+    """
+    Run ``tasks`` (name -> callable) on the shared search thread pool.
+
+    Returns ``(results, timed_out, failed)``: results of the tasks that
+    finished within ``timeout`` seconds of starting, the names of those that
+    did not, and the names of those that raised (logged). A task still
+    queued ``timeout`` seconds after the call, behind other searches, is
+    cancelled and counts as timed out. Late tasks keep running in the
+    background and their results are dropped. With ``SEARCH_CONCURRENCY``
+    below 2 tasks run inline, without a deadline.
+    """
+    if settings.SEARCH_CONCURRENCY < 2:
+        return _run_inline(tasks)
+
+    executor = _get_executor()
+    pending = {name: _Task(task) for name, task in tasks.items()}
+    futures = {name: executor.submit(task) for name, task in pending.items()}
+    queued_until = time.monotonic() + timeout
+
+    results, timed_out, failed = {}, [], []
+    for name, future in futures.items():
+        task = pending[name]
+        if not task.started.wait(max(queued_until - time.monotonic(), 0)) and future.cancel():
+            timed_out.append(name)
+            continue
+        # cancel() fails only once a worker has the task, so it is starting
+        task.started.wait()
+        try:
+            results[name] = future.result(timeout=max(task.started_at + timeout - time.monotonic(), 0))
+        except TimeoutError:
+            timed_out.append(name)
+        except Exception:
+            logger.exception("Search task %s failed", name)
+            failed.append(name)
+    return results, timed_out, failed
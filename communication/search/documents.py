@@ -0,0 +1,335 @@
+# search/documents.py
+from django.contrib.auth import get_user_model
+from academics.models import Course, Assignment
+from communication.models import News, Event, Announcement, BookPage
+
+User = get_user_model()
+
+
+class SearchDocument:
+    """
+    Describes how one model is indexed and how its hits are rendered
+    in the global search response.
+
+    ``fields`` maps each searchable field to its ranking weight; backends
+    index exactly these fields and return highlights keyed by field name.
+    """
+    doc_type = None
+    result_key = None
+    model = None
+    fields = {}
+    # Long text fields are highlighted as a snippet rather than in full
+    snippet_fields = ()
+    # Model fields feeding the search fields; saves touching none of them skip re-indexing
+    indexed_fields = ()
+    # Autocomplete: model fields matched by quick search and suggestions returned per query
+    suggest_fields = ()
+    suggest_limit = 0
+    # Relation -> fields of the related record shown in results; editing them evicts cached results
+    embedded_fields = {}
+
+    def get_queryset(self):
+        """Records that may appear in search results"""
+        return self.model.objects.all()
+
+    def is_searchable(self, instance):
+        return True
+
+    def get_values(self, instance):
+        """Text of every search field for ``instance``"""
+        raise NotImplementedError
+
+    def format_result(self, instance, highlights):
+        raise NotImplementedError
+
+    def suggestion_text(self, instance):
+        return str(instance)
+
+    def fetch(self, object_ids):
+        """Load the given records, keeping the ranked order of ``object_ids``"""
+        records = self.get_queryset().in_bulk(object_ids)
+        return [records[pk] for pk in object_ids if pk in records]
+
+
+class CourseDocument(SearchDocument):
+    doc_type = 'course'
+    result_key = 'courses'
+    model = Course
+    fields = {'title': 4, 'code': 4, 'subject': 2, 'description': 1}
+    snippet_fields = ('description',)
+    indexed_fields = ('title', 'code', 'description', 'subject', 'is_active')
+    suggest_fields = ('title', 'code')
+    suggest_limit = 5
+    embedded_fields = {'tutor': ('username',)}
+
+    def get_queryset(self):
+        return Course.objects.filter(is_active=True).select_related('tutor')
+
+    def is_searchable(self, instance):
+        return instance.is_active
+
+    def get_values(self, instance):
+        return {
+            'title': instance.title,
+            'code': instance.code,
+            'subject': instance.subject or '',
+            'description': instance.description or '',
+        }
+
+    def suggestion_text(self, instance):
+        return f"{instance.code} - {instance.title}"
+
+    def format_result(self, course, highlights):
+        return {
+            'id': course.id,
+            'title': course.title,
+            'type': 'course',
+            'subtitle': f"{course.code} - {course.subject or 'General'}",
+            'description': course.description[:100] + '...' if course.description else '',
+            'tutor': course.tutor.username if course.tutor else 'Unassigned',
+            'url': f'/courses/{course.id}',
+            'match_highlights': {
+                'title': highlights.get('title'),
+                'code': highlights.get('code')
+            }
+        }
+
+
+class AssignmentDocument(SearchDocument):
+    doc_type = 'assignment'
+    result_key = 'assignments'
+    model = Assignment
+    fields = {'title': 4, 'description': 1, 'instructions': 1}
+    snippet_fields = ('description', 'instructions')
+    indexed_fields = ('title', 'description', 'instructions')
+    suggest_fields = ('title',)
+    suggest_limit = 3
+    embedded_fields = {'course': ('code', 'title'), 'tutor': ('username',)}
+
+    def get_queryset(self):
+        return Assignment.objects.select_related('course', 'tutor')
+
+    def get_values(self, instance):
+        return {
+            'title': instance.title,
+            'description': instance.description or '',
+            'instructions': instance.instructions or '',
+        }
+
+    def suggestion_text(self, instance):
+        return f"Assignment: {instance.title}"
+
+    def format_result(self, assignment, highlights):
+        return {
+            'id': assignment.id,
+            'title': assignment.title,
+            'type': 'assignment',
+            'subtitle': f"{assignment.course.code} - {assignment.course.title}",
+            'description': assignment.description[:100] + '...' if assignment.description else '',
+            'tutor': assignment.tutor.username,
+            'due_date': assignment.due_date,
+            'url': f'/assignments/{assignment.id}',
+            'match_highlights': {
+                'title': highlights.get('title'),
+                'description': highlights.get('description')
+            }
+        }
+
+
+class NewsDocument(SearchDocument):
+    doc_type = 'news'
+    result_key = 'news'
+    model = News
+    fields = {'title': 4, 'content': 1}
+    snippet_fields = ('content',)
+    indexed_fields = ('title', 'content', 'published')
+    suggest_fields = ('title',)
+    suggest_limit = 3
+    embedded_fields = {'author': ('username',)}
+
+    def get_queryset(self):
+        return News.objects.filter(published=True).select_related('author')
+
+    def is_searchable(self, instance):
+        return instance.published
+
+    def get_values(self, instance):
+        return {
+            'title': instance.title,
+            'content': instance.content,
+        }
+
+    def suggestion_text(self, instance):
+        return f"News: {instance.title}"
+
+    def format_result(self, article, highlights):
+        return {
+            'id': article.id,
+            'title': article.title,
+            'type': 'news',
+            'subtitle': f"Published {article.created_at.strftime('%B %d, %Y')}",
+            'description': article.content[:150] + '...' if article.content else '',
+            'author': article.author.username if article.author else 'Staff',
+            'image_url': article.get_image,
+            'url': f'/news/{article.id}',
+            'match_highlights': {
+                'title': highlights.get('title'),
+                'content': highlights.get('content')
+            }
+        }
+
+
+class EventDocument(SearchDocument):
+    doc_type = 'event'
+    result_key = 'events'
+    model = Event
+    fields = {'title': 4, 'location': 2, 'content': 1}
+    snippet_fields = ('content',)
+    indexed_fields = ('title', 'content', 'location', 'published')
+
+    def get_queryset(self):
+        return Event.objects.filter(published=True)
+
+    def is_searchable(self, instance):
+        return instance.published
+
+    def get_values(self, instance):
+        return {
+            'title': instance.title,
+            'location': instance.location or '',
+            'content': instance.content,
+        }
+
+    def format_result(self, event, highlights):
+        return {
+            'id': event.id,
+            'title': event.title,
+            'type': 'event',
+            'subtitle': f"{event.location or 'TBD'} - {event.event_date.strftime('%B %d, %Y') if event.event_date else 'Date TBD'}",
+            'description': event.content[:150] + '...' if event.content else '',
+            'event_date': event.event_date,
+            'location': event.location,
+            'url': f'/events/{event.id}',
+            'match_highlights': {
+                'title': highlights.get('title'),
+                'location': highlights.get('location')
+            }
+        }
+
+
+class UserDocument(SearchDocument):
+    doc_type = 'user'
+    result_key = 'users'
+    model = User
+    fields = {'name': 4, 'email': 2}
+    indexed_fields = ('username', 'first_name', 'last_name', 'email')
+
+    def get_values(self, instance):
+        return {
+            'name': f"{instance.first_name} {instance.last_name} {instance.username}",
+            'email': instance.email,
+        }
+
+    def format_result(self, user, highlights):
+        full_name = f"{user.first_name} {user.last_name}"
+        return {
+            'id': user.id,
+            'title': full_name.strip() or user.username,
+            'type': 'user',
+            'subtitle': f"{user.role.title()} - {user.email}",
+            'description': f"Username: {user.username}",
+            'role': user.role,
+            'email': user.email,
+            'url': f'/users/{user.id}',
+            'match_highlights': {
+                'name': highlights.get('name'),
+                'email': highlights.get('email')
+            }
+        }
+
+
+class AnnouncementDocument(SearchDocument):
+    doc_type = 'announcement'
+    result_key = 'announcements'
+    model = Announcement
+    fields = {'title': 4, 'content': 1}
+    snippet_fields = ('content',)
+    indexed_fields = ('title', 'content', 'published')
+    embedded_fields = {'admin': ('username',)}
+
+    def get_queryset(self):
+        return Announcement.objects.filter(published=True).select_related('admin')
+
+    def is_searchable(self, instance):
+        return instance.published
+
+    def get_values(self, instance):
+        return {
+            'title': instance.title,
+            'content': instance.content,
+        }
+
+    def format_result(self, announcement, highlights):
+        return {
+            'id': announcement.id,
+            'title': announcement.title,
+            'type': 'announcement',
+            'subtitle': f"{announcement.target_audience.title()} - {announcement.created_at.strftime('%B %d, %Y')}",
+            'description': announcement.content[:150] + '...' if announcement.content else '',
+            'admin': announcement.admin.username,
+            'priority': announcement.priority,
+            'url': f'/announcements/{announcement.id}',
+            'match_highlights': {
+                'title': highlights.get('title'),
+                'content': highlights.get('content')
+            }
+        }
+
+
+class BookPageDocument(SearchDocument):
+    """PDF page text, searched through the book catalogue rather than global search"""
+    doc_type = 'book_page'
+    model = BookPage
+    fields = {'text': 1}
+    snippet_fields = ('text',)
+    indexed_fields = ('text',)
+
+    def get_queryset(self):
+        return BookPage.objects.select_related('book')
+
+    def get_values(self, instance):
+        return {'text': instance.text}
+
+    def format_result(self, page, highlights):
+        return {
+            'page': page.page_number,
+            'snippet': highlights.get('text')
+        }
+
+
+# Order matches the categories of the global search response
+DOCUMENTS = [
+    CourseDocument(),
+    AssignmentDocument(),
+    NewsDocument(),
+    EventDocument(),
+    UserDocument(),
+    AnnouncementDocument(),
+]
+
+# Every indexed document, including those outside global search
+INDEXED_DOCUMENTS = DOCUMENTS + [BookPageDocument()]
+
+
+def get_document(doc_type):
+    for document in INDEXED_DOCUMENTS:
+        if document.doc_type == doc_type:
+            return document
+    raise KeyError(doc_type)
+
+
+def get_document_for_model(model):
+    for document in INDEXED_DOCUMENTS:
+        if document.model is model:
+            return document
+    return None
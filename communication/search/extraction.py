@@ -0,0 +1,150 @@
+# search/extraction.py
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from communication.models import Book, BookPage
+from .backends import get_backend
+from .documents import get_document
+from .pdf import extract_pages, extract_stored_pages
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(replace=False):
+    global _executor
+    with _executor_lock:
+        if _executor is None or replace:
+            # Spawned workers import only the Django-free pdf module
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PDF_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _extraction_job(book):
+    """
+    Function and arguments extracting a book's PDF. Whoever runs them reads
+    the file, so a worker job never makes the scheduling process read it.
+    """
+    try:
+        return extract_pages, (book.pdf_file.path,)
+    except NotImplementedError:
+        # Remote storages have no local path, the worker opens the file through the storage
+        return extract_stored_pages, (book.pdf_file.storage, book.pdf_file.name)
+
+
+def store_pages(book_id, pdf_name, pages):
+    """
+    Replace the indexed pages of a book with freshly extracted text. Results
+    for a PDF that has since been replaced are dropped.
+    """
+    with transaction.atomic():
+        book = Book.objects.select_for_update().filter(pk=book_id).first()
+        if book is None or book.pdf_file.name != pdf_name:
+            return
+        _replace_pages(book, pages)
+        Book.objects.filter(pk=book_id).update(
+            text_status='extracted',
+            pages=book.pages or len(pages),
+            updated_at=timezone.now(),
+        )
+
+
+def _replace_pages(book, pages):
+    """
+    Swap a book's pages for ``pages`` (text per page, falsy for none) with
+    one delete and one bulk insert, updating the search index in bulk too
+    """
+    backend, document = get_backend(), get_document('book_page')
+    old_pages = BookPage.objects.filter(book_id=book.pk)
+    backend.remove_records(document, old_pages.values_list('pk', flat=True))
+    # Pages have no signals or dependents, so this is a single DELETE
+    old_pages.delete()
+
+    new_pages = BookPage.objects.bulk_create(
+        [BookPage(book=book, page_number=number, text=text) for number, text in enumerate(pages, start=1) if text],
+        batch_size=500,
+    )
+    if new_pages and new_pages[0].pk is None:
+        # Backends that can't return ids from a bulk insert
+        new_pages = list(BookPage.objects.filter(book_id=book.pk))
+    backend.index_records(document, new_pages)
+
+
+def _mark_failed(book_id, pdf_name):
+    Book.objects.filter(pk=book_id, pdf_file=pdf_name).update(text_status='failed', updated_at=timezone.now())
+
+
+def _finish(book_id, pdf_name, future):
+    # Runs on the executor's result thread, outside any request
+    try:
+        pages = future.result()
+    except Exception:
+        logger.exception("Text extraction failed for book %s", book_id)
+        _mark_failed(book_id, pdf_name)
+    else:
+        try:
+            store_pages(book_id, pdf_name, pages)
+        except Exception:
+            logger.exception("Storing extracted text failed for book %s", book_id)
+            _mark_failed(book_id, pdf_name)
+    finally:
+        close_old_connections()
+
+
+def extract_book_text(book):
+    """Extract and index a book's PDF in the calling process"""
+    if not book.pdf_file:
+        clear_book_text(book.pk)
+        return
+    function, args = _extraction_job(book)
+    try:
+        pages = function(*args)
+    except Exception:
+        logger.exception("Text extraction failed for book %s", book.pk)
+        _mark_failed(book.pk, book.pdf_file.name)
+        return
+    store_pages(book.pk, book.pdf_file.name, pages)
+
+
+def clear_book_text(book_id):
+    with transaction.atomic():
+        _replace_pages(Book(pk=book_id), [])
+        Book.objects.filter(pk=book_id).update(text_status='none', updated_at=timezone.now())
+
+
+def schedule_extraction(book_id):
+    """
+    Queue text extraction of a book's current PDF on the worker pool and
+    return immediately. ``PDF_EXTRACTION_WORKERS`` below 1 extracts inline.
+    """
+    book = Book.objects.filter(pk=book_id).first()
+    if book is None:
+        return
+    if not book.pdf_file:
+        clear_book_text(book_id)
+        return
+    if settings.PDF_EXTRACTION_WORKERS < 1:
+        extract_book_text(book)
+        return
+
+    Book.objects.filter(pk=book_id).update(text_status='pending', updated_at=timezone.now())
+    function, args = _extraction_job(book)
+    try:
+        future = _get_executor().submit(function, *args)
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool, start a new one
+        future = _get_executor(replace=True).submit(function, *args)
+    future.add_done_callback(partial(_finish, book_id, book.pdf_file.name))
@@ -0,0 +1,139 @@
+# search/facets.py
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from communication.models import Book, BookFacetCount
+
+# Book fields offered as catalogue filters, in sidebar order
+FACET_FIELDS = ('genre', 'language', 'publication_year', 'is_available')
+
+
+# Stored in cells for books without the value: NULLs never conflict in a unique
+# constraint, so concurrent first inserts of a NULL cell would both succeed
+UNSET = {'genre': '', 'publication_year': 0}
+
+
+def _cell(values):
+    cell = {field: values[field] for field in FACET_FIELDS}
+    for field, unset in UNSET.items():
+        if cell[field] is None:
+            cell[field] = unset
+    return cell
+
+
+def _decrement(cell):
+    BookFacetCount.objects.filter(book_count__gt=0, **cell).update(book_count=F('book_count') - 1)
+
+
+def _increment(cell):
+    # Cells are created on first use; the loop covers a concurrent first insert
+    while not BookFacetCount.objects.filter(**cell).update(book_count=F('book_count') + 1):
+        try:
+            with transaction.atomic():
+                BookFacetCount.objects.create(book_count=1, **cell)
+            return
+        except IntegrityError:
+            continue
+
+
+def record_change(previous, current):
+    """
+    Move a book between facet cells. ``previous`` and ``current`` hold the
+    book's facet values before and after the change, None when it is being
+    created or deleted.
+    """
+    old = _cell(previous) if previous is not None else None
+    new = _cell(current) if current is not None else None
+    if old == new:
+        return
+    with transaction.atomic():
+        if old is not None:
+            _decrement(old)
+        if new is not None:
+            _increment(new)
+
+
+def rebuild():
+    """Recount every cell from the books table, returning the number of cells"""
+    counts = Counter()
+    # NULL and unset values share a cell, so groups are merged after mapping them
+    for group in Book.objects.order_by().values(*FACET_FIELDS).annotate(book_count=Count('id')):
+        counts[tuple(_cell(group).values())] += group['book_count']
+    with transaction.atomic():
+        BookFacetCount.objects.all().delete()
+        created = BookFacetCount.objects.bulk_create(
+            BookFacetCount(book_count=count, **dict(zip(FACET_FIELDS, cell))) for cell, count in counts.items()
+        )
+    return len(created)
+
+
+def parse_filters(params):
+    """
+    Facet filters of a query string. Repeating a parameter selects any of
+    its values, e.g. ``?genre=Fiction&genre=History``. Raises ValueError on
+    malformed years and availability flags.
+    """
+    filters = {}
+    for field in FACET_FIELDS:
+        values = [value for value in params.getlist(field) if value != '']
+        if not values:
+            continue
+        if field == 'publication_year':
+            try:
+                values = [int(value) for value in values]
+            except ValueError:
+                raise ValueError("publication_year must be a year")
+        elif field == 'is_available':
+            flags = {'true': True, '1': True, 'false': False, '0': False}
+            if any(value.lower() not in flags for value in values):
+                raise ValueError("is_available must be true or false")
+            values = [flags[value.lower()] for value in values]
+        filters[field] = set(values)
+    return filters
+
+
+def filter_books(queryset, filters):
+    for field, values in filters.items():
+        queryset = queryset.filter(**{f'{field}__in': values})
+    return queryset
+
+
+def facet_counts(filters, available_only=False):
+    """
+    Counts of every facet value, read from the precomputed cells. A facet's
+    counts apply the filters of all other facets but not its own, so the
+    sidebar shows how many books each alternative value would give.
+
+    Returns ``(facets, total)`` where ``total`` matches all filters.
+    """
+    cells = BookFacetCount.objects.filter(book_count__gt=0)
+    if available_only:
+        cells = cells.filter(is_available=True)
+    fields = FACET_FIELDS if not available_only else FACET_FIELDS[:-1]
+
+    counts = {field: {} for field in fields}
+    total = 0
+    for cell in cells.values(*FACET_FIELDS, 'book_count'):
+        cell.update({field: None for field, unset in UNSET.items() if cell[field] == unset})
+        unmatched = [field for field, values in filters.items() if cell[field] not in values]
+        if not unmatched:
+            total += cell['book_count']
+        for field in fields:
+            # Skipped when the cell fails a filter on some other facet
+            if unmatched and unmatched != [field]:
+                continue
+            value = cell[field]
+            if value is None or value == '':
+                continue
+            counts[field][value] = counts[field].get(value, 0) + cell['book_count']
+
+    facets = {
+        field: [
+            {'value': value, 'count': count, 'selected': value in filters.get(field, ())}
+            for value, count in sorted(values.items(), key=lambda item: (-item[1], str(item[0])))
+        ]
+        for field, values in counts.items()
+    }
+    return facets, total
@@ -0,0 +1,38 @@
+# search/pdf.py
+"""
+Text extraction run inside worker processes. Kept free of Django imports so
+spawned workers start quickly and never touch the database.
+"""
+import io
+import re
+
+_whitespace = re.compile(r'\s+')
+
+
+def extract_pages(source):
+    """
+    Text of every page of a PDF, given its file path or contents.
+    Requires ``pypdf``.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    pages = []
+    for page in reader.pages:
+        try:
+            text = page.extract_text() or ''
+        except Exception:
+            # A single malformed page shouldn't lose the rest of the book
+            text = ''
+        pages.append(_whitespace.sub(' ', text).strip())
+    return pages
+
+
+def extract_stored_pages(storage, name):
+    """
+    Text of every page of the PDF ``name`` kept in a Django file storage
+    without local paths. The worker downloads the file itself, so the
+    process scheduling the extraction never reads it.
+    """
+    with storage.open(name, 'rb') as pdf:
+        return extract_pages(pdf.read())
@@ -0,0 +1,206 @@
+# search/prefix.py
+import logging
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .documents import DOCUMENTS
+from .text import tokenize, query_terms, PREFIX_END
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    """
+    Per-process autocomplete index answering quick search without the database.
+
+    Every token of the suggestion fields is stored in one sorted array of
+    ``(token, doc_type, object_id)`` tuples, so the records matching a prefix
+    are a contiguous slice found with two bisections. The index is built on
+    first use and patched by model signals. Once it is older than
+    ``QUICK_SEARCH_INDEX_MAX_AGE`` seconds, which bounds staleness from
+    writes made by other processes, one background thread rebuilds it while
+    queries keep using the current index.
+    """
+
+    def __init__(self, documents):
+        self.documents = [document for document in documents if document.suggest_fields]
+        self._lock = threading.RLock()
+        # Held for the first build, which queries have to wait for
+        self._build_lock = threading.Lock()
+        self._refreshing = False
+        # Signal updates made while a rebuild reads the database, replayed onto its result
+        self._changes = None
+        self._tokens = []
+        # (doc_type, object_id) -> (suggestion text, sort name, tokens)
+        self._entries = {}
+        self._built_at = None
+        self.built_at = None
+        self.build_seconds = None
+        self.updates = 0
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'QUICK_SEARCH_INDEX_MAX_AGE', 300)
+
+    def _entry(self, document, instance):
+        values = [getattr(instance, field) or '' for field in document.suggest_fields]
+        tokens = tuple(sorted({token for value in values for token in tokenize(value)}))
+        return document.suggestion_text(instance), values[0].lower(), tokens
+
+    def rebuild(self):
+        started = time.perf_counter()
+        with self._lock:
+            self._changes = []
+        entries = {}
+        for document in self.documents:
+            queryset = document.get_queryset().select_related(None).only(*document.suggest_fields)
+            for instance in queryset.iterator():
+                entries[(document.doc_type, instance.pk)] = self._entry(document, instance)
+        tokens = sorted(
+            (token, doc_type, object_id)
+            for (doc_type, object_id), (text, name, entry_tokens) in entries.items()
+            for token in entry_tokens
+        )
+        with self._lock:
+            changes, self._changes = self._changes, None
+            self._entries = entries
+            self._tokens = tokens
+            for key, entry in changes:
+                self._apply(key, entry)
+            self._built_at = time.monotonic()
+            self.built_at = timezone.now()
+        self.build_seconds = time.perf_counter() - started
+
+    def ensure_built(self):
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self.rebuild()
+            return
+        if time.monotonic() - self._built_at <= self.max_age:
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name='quick-search-refresh', daemon=True).start()
+
+    def _refresh(self):
+        try:
+            self.rebuild()
+        except Exception:
+            # The current index keeps serving; the next query past max_age retries
+            logger.exception("Rebuilding the quick search index failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+            close_old_connections()
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for token in entry[2]:
+            position = bisect_left(self._tokens, (token, *key))
+            if position < len(self._tokens) and self._tokens[position] == (token, *key):
+                del self._tokens[position]
+
+    def _apply(self, key, entry):
+        """Replace the entry of ``key``; None removes it"""
+        self._remove(key)
+        if entry is not None:
+            self._entries[key] = entry
+            for token in entry[2]:
+                insort(self._tokens, (token, *key))
+
+    def _record(self, key, entry):
+        with self._lock:
+            if self._built_at is None and self._changes is None:
+                # Nothing to patch until the index has been built
+                return
+            self._apply(key, entry)
+            if self._changes is not None:
+                self._changes.append((key, entry))
+            self.updates += 1
+
+    def update(self, document, instance):
+        """Apply a saved record"""
+        entry = self._entry(document, instance) if document.is_searchable(instance) else None
+        self._record((document.doc_type, instance.pk), entry)
+
+    def remove(self, document, instance):
+        self._record((document.doc_type, instance.pk), None)
+
+    def _matching_keys(self, terms):
+        matches = None
+        # Longest terms select the narrowest slices, so intersect those first
+        for term in sorted(terms, key=len, reverse=True):
+            start = bisect_left(self._tokens, (term,))
+            end = bisect_left(self._tokens, (term + PREFIX_END,))
+            keys = {(doc_type, object_id) for token, doc_type, object_id in self._tokens[start:end]}
+            matches = keys if matches is None else matches & keys
+            if not matches:
+                break
+        return matches or set()
+
+    def suggest(self, query):
+        """Suggestions grouped in document order, each group capped at its ``suggest_limit``"""
+        terms = query_terms(query)
+        if not terms:
+            return []
+        self.ensure_built()
+        prefix = query.strip().lower()
+
+        with self._lock:
+            grouped = {}
+            for doc_type, object_id in self._matching_keys(terms):
+                text, name, tokens = self._entries[(doc_type, object_id)]
+                grouped.setdefault(doc_type, []).append((not name.startswith(prefix), len(name), name, object_id, text))
+
+        suggestions = []
+        for document in self.documents:
+            ranked = sorted(grouped.get(document.doc_type, []))[:document.suggest_limit]
+            suggestions.extend(
+                {'text': text, 'type': document.doc_type, 'id': object_id}
+                for *rank, object_id, text in ranked
+            )
+        return suggestions
+
+    def memory_bytes(self):
+        """Approximate heap size of the index structures"""
+        seen = set()
+
+        def size(obj):
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            total = sys.getsizeof(obj)
+            if isinstance(obj, (tuple, list)):
+                total += sum(size(item) for item in obj)
+            return total
+
+        with self._lock:
+            total = size(self._tokens) + sys.getsizeof(self._entries)
+            for key, entry in self._entries.items():
+                total += size(key) + size(entry)
+        return total
+
+    def metrics(self):
+        return {
+            'built': self._built_at is not None,
+            'built_at': self.built_at,
+            'build_seconds': self.build_seconds,
+            'entries': len(self._entries),
+            'tokens': len(self._tokens),
+            'memory_bytes': self.memory_bytes(),
+            'incremental_updates': self.updates,
+        }
+
+
+quick_search_index = PrefixIndex(DOCUMENTS)
@@ -0,0 +1,75 @@
+# search/text.py
+import re
+from collections import Counter
+
+from django.utils.html import escape
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = 64
+MAX_QUERY_TERMS = 8
+SNIPPET_TOKENS = 12
+
+# Upper bound for prefix range scans (highest code point)
+PREFIX_END = '\U0010ffff'
+
+# Markers wrapped around matches before the text is HTML-escaped
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_RE.findall((text or '').lower())]
+
+
+def token_counts(text):
+    return Counter(tokenize(text))
+
+
+def query_terms(query):
+    """Distinct query terms, each matched as a token prefix"""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def render_marked(text):
+    """
+    Escape text carrying match markers and turn the markers into <mark> tags.
+    Returns None when nothing matched.
+    """
+    if not text or MARK_START not in text:
+        return None
+    return escape(text).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def mark_terms(text, terms, snippet=False):
+    """
+    Wrap every word of ``text`` starting with one of ``terms`` in match markers.
+    With ``snippet`` only a window of words around the first match is kept.
+    """
+    text = text or ''
+    matches = [
+        match for match in TOKEN_RE.finditer(text)
+        if any(match.group().lower().startswith(term) for term in terms)
+    ]
+    if not matches:
+        return None
+
+    start, end = 0, len(text)
+    if snippet:
+        words = list(TOKEN_RE.finditer(text))
+        first = next(i for i, word in enumerate(words) if word.start() == matches[0].start())
+        window = words[max(first - SNIPPET_TOKENS // 2, 0):first + SNIPPET_TOKENS // 2]
+        start = window[0].start() if first > SNIPPET_TOKENS // 2 else 0
+        end = window[-1].end() if words[-1] is not window[-1] else len(text)
+
+    marked, position = [], start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        marked.append(text[position:match.start()])
+        marked.append(MARK_START + match.group() + MARK_END)
+        position = match.end()
+    marked.append(text[position:end])
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(text) else ''
+    return render_marked(prefix + ''.join(marked) + suffix)
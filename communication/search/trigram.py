@@ -0,0 +1,128 @@
+# search/trigram.py
+from math import ceil
+
+from django.db import transaction
+from django.db.models import Count
+
+from academics.models import Course
+from communication.models import Book, TrigramEntry
+from .text import tokenize
+
+# doc_type -> (model, fields matched fuzzily)
+TRIGRAM_SOURCES = {
+    'course': (Course, ('title', 'code', 'subject')),
+    'book': (Book, ('title', 'author', 'genre')),
+}
+
+DEFAULT_THRESHOLD = 0.4
+
+
+def trigrams(text):
+    """
+    Distinct trigrams of every word, padded like pg_trgm so that word
+    starts and ends carry extra weight.
+    """
+    grams = set()
+    for word in tokenize(text):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def get_source(model):
+    for doc_type, (source_model, fields) in TRIGRAM_SOURCES.items():
+        if source_model is model:
+            return doc_type, fields
+    return None, ()
+
+
+def build_entries(doc_type, fields, instance):
+    entries = []
+    for field in fields:
+        grams = trigrams(getattr(instance, field))
+        entries.extend(
+            TrigramEntry(
+                doc_type=doc_type,
+                object_id=instance.pk,
+                field=field,
+                trigram=gram,
+                gram_count=len(grams),
+            )
+            for gram in grams
+        )
+    return entries
+
+
+def index_instance(instance):
+    doc_type, fields = get_source(type(instance))
+    with transaction.atomic():
+        TrigramEntry.objects.filter(doc_type=doc_type, object_id=instance.pk).delete()
+        TrigramEntry.objects.bulk_create(build_entries(doc_type, fields, instance))
+
+
+def remove_instance(instance):
+    doc_type, fields = get_source(type(instance))
+    TrigramEntry.objects.filter(doc_type=doc_type, object_id=instance.pk).delete()
+
+
+def rebuild(doc_types=None, batch_size=1000):
+    counts = {}
+    for doc_type in doc_types or TRIGRAM_SOURCES:
+        model, fields = TRIGRAM_SOURCES[doc_type]
+        indexed = 0
+        with transaction.atomic():
+            TrigramEntry.objects.filter(doc_type=doc_type).delete()
+            batch = []
+            for instance in model.objects.only('pk', *fields).iterator(chunk_size=batch_size):
+                batch.extend(build_entries(doc_type, fields, instance))
+                indexed += 1
+                if len(batch) >= batch_size:
+                    TrigramEntry.objects.bulk_create(batch)
+                    batch = []
+            TrigramEntry.objects.bulk_create(batch)
+        counts[doc_type] = indexed
+    return counts
+
+
+def indexed_count(doc_type):
+    return TrigramEntry.objects.filter(doc_type=doc_type).values('object_id').distinct().count()
+
+
+def sync(doc_types=None):
+    """Rebuild the trigrams of the types whose entries cover a different number of records"""
+    stale = [t for t in doc_types or TRIGRAM_SOURCES if indexed_count(t) != TRIGRAM_SOURCES[t][0].objects.count()]
+    return rebuild(stale) if stale else {}
+
+
+def search(doc_type, query, limit=10, threshold=DEFAULT_THRESHOLD, within=None):
+    """
+    Return ``(object_id, similarity)`` pairs for records whose fields share
+    enough trigrams with the query, best first.
+
+    Candidates come from the (doc_type, trigram) index, so only rows sharing
+    at least one trigram with the query are read. Similarity is the share of
+    the query's trigrams found in the field value; shorter values win ties.
+    ``within`` (a queryset of the source model) restricts the candidates to
+    the records it selects before the limit is applied.
+    """
+    grams = trigrams(query)
+    if not grams:
+        return []
+
+    entries = TrigramEntry.objects.filter(doc_type=doc_type, trigram__in=grams)
+    if within is not None:
+        entries = entries.filter(object_id__in=within.values('pk'))
+    candidates = (
+        entries
+        .values('object_id', 'field', 'gram_count')
+        .annotate(shared=Count('id'))
+        .filter(shared__gte=max(1, ceil(threshold * len(grams))))
+        .order_by('-shared', 'gram_count', 'object_id')
+    )
+
+    matches = {}
+    # Each record can match on several fields, keep its best one
+    for candidate in candidates[:limit * len(TRIGRAM_SOURCES[doc_type][1])]:
+        if candidate['object_id'] not in matches:
+            matches[candidate['object_id']] = candidate['shared'] / len(grams)
+    return list(matches.items())[:limit]
@@ -1,14 +1,16 @@
 
 from rest_framework import serializers
-from .models import ContactMessage, Testimonial, Statistics, News, Event, CampusLife, Message, Notification, Announcement, Book
-from users.serializers import UserSerializer
+from .models import ContactMessage, Testimonial, Statistics, StatisticsSnapshot, News, Event, CampusLife, Message, Notification, Announcement, Book
+from users.serializers import PublicUserSerializer
+from config.excerpts import ExcerptField
+from config.sparse import SparseFieldsetsMixin
 
 # -------------------------------------
 # Messages
 # -------------------------------------
 
 
-class ContactMessageSerializer(serializers.ModelSerializer):
+class ContactMessageSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactMessage
         fields = "__all__"
@@ -17,10 +19,11 @@ class ContactMessageSerializer(serializers.ModelSerializer):
 # Testimonials
 # --------------------------------------
 
-class TestimonialSerializer(serializers.ModelSerializer):
+class TestimonialSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Testimonial
         fields = "__all__"
+        expandable_fields = {'submitted_by': PublicUserSerializer}
 
 # --------------------------------------
 # Statistics
@@ -30,41 +33,72 @@ class StatisticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = Statistics
         fields = '__all__'
+        # Maintained by the counter signals and reconcile_statistics
+        read_only_fields = [
+            'active_students', 'courses', 'success_rate', 'tutors', 'total_users', 'total_enrollments',
+            'active_enrollments', 'completed_enrollments', 'dropped_enrollments', 'reconciled_at',
+        ]
+
+
+class StatisticsSnapshotSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StatisticsSnapshot
+        exclude = ['id', 'created_at']
 
 # --------------------------------------
 # News
 # --------------------------------------
 
-class NewsSerializer(serializers.ModelSerializer):
+class NewsSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = News
         fields = '__all__'
+        expandable_fields = {'author': PublicUserSerializer}
+
+
+class NewsListSerializer(NewsSerializer):
+    """News in lists, with an excerpt instead of the full content"""
+    content_excerpt = ExcerptField('content')
+
+    class Meta(NewsSerializer.Meta):
+        fields = None
+        exclude = ['content']
 
 # --------------------------------------
 # Event
 # --------------------------------------
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = '__all__'
 
 
+class EventListSerializer(EventSerializer):
+    """Events in lists, with an excerpt instead of the full details"""
+    content_excerpt = ExcerptField('content')
+
+    class Meta(EventSerializer.Meta):
+        fields = None
+        exclude = ['content']
+
+
 # --------------------------------------
 # CampusLife
 # --------------------------------------
 
 
-class CampusLifeSerializer(serializers.ModelSerializer):
+class CampusLifeSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = CampusLife
         fields = '__all__'
+        expandable_fields = {'uploaded_by': PublicUserSerializer}
 
 # --------------------------------------
 # Message
 # --------------------------------------
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     sender_username = serializers.CharField(source='sender.username', read_only=True)
     receiver_username = serializers.CharField(source='receiver.username', read_only=True)
     course_title = serializers.CharField(source='course.title', read_only=True)
@@ -74,12 +108,13 @@ class MessageSerializer(serializers.ModelSerializer):
         model = Message
         fields = '__all__'
         read_only_fields = ['sent_at', 'is_read', 'read_at']
+        expandable_fields = {'sender': PublicUserSerializer, 'receiver': PublicUserSerializer}
 
 # --------------------------------------
 # Notification
 # --------------------------------------
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     sender_username = serializers.CharField(source='sender.username', read_only=True)
     user_username = serializers.CharField(source='user.username', read_only=True)
     course_title = serializers.CharField(source='course.title', read_only=True)
@@ -89,21 +124,23 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = '__all__'
         read_only_fields = ['created_at', 'is_read', 'read_at']
+        expandable_fields = {'user': PublicUserSerializer, 'sender': PublicUserSerializer}
 
 # --------------------------------------
 # Announcement
 # --------------------------------------
 
-class AnnouncementSerializer(serializers.ModelSerializer):
+class AnnouncementSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     admin_username = serializers.CharField(source='admin.username', read_only=True)
 
     class Meta:
         model = Announcement
         fields = '__all__'
         read_only_fields = ['created_at']
+        expandable_fields = {'admin': PublicUserSerializer}
 
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     uploaded_by_name = serializers.CharField(source='uploaded_by.get_full_name', read_only=True)
     cover_image_url = serializers.CharField(source='get_cover_image', read_only=True)
     pdf_file_url = serializers.CharField(source='get_pdf_file', read_only=True)
@@ -114,6 +151,20 @@ class BookSerializer(serializers.ModelSerializer):
             'id', 'title', 'author', 'description', 'cover_image', 'cover_image_url',
             'pdf_file', 'pdf_file_url', 'isbn', 'genre', 'publication_year',
             'language', 'pages', 'is_available', 'uploaded_by', 'uploaded_by_name',
-            'created_at', 'updated_at'
+            'text_status', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['uploaded_by', 'created_at', 'updated_at']
+        read_only_fields = ['uploaded_by', 'text_status', 'created_at', 'updated_at']
+        expandable_fields = {'uploaded_by': PublicUserSerializer}
+        field_sources = {
+            'uploaded_by_name': ['uploaded_by', 'uploaded_by__first_name', 'uploaded_by__last_name'],
+            'cover_image_url': ['cover_image'],
+            'pdf_file_url': ['pdf_file'],
+        }
+
+
+class BookListSerializer(BookSerializer):
+    """Books in lists, with an excerpt instead of the full description"""
+    description_excerpt = ExcerptField('description')
+
+    class Meta(BookSerializer.Meta):
+        fields = [field for field in BookSerializer.Meta.fields if field != 'description'] + ['description_excerpt']
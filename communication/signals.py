@@ -0,0 +1,249 @@
+# signals.py
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+
+from academics.models import Course, Enrollment
+from config.conditional import record_removal
+from config.tracking import track_previous_values, previous_values
+from . import counters
+from .models import News, Event, Testimonial, CampusLife, Book, SearchPosting, TrigramEntry
+from .home import HOME_CONTENT_MODELS, refresh_home_content
+from .search.backends import get_backend
+from .search.documents import DOCUMENTS, INDEXED_DOCUMENTS, get_document_for_model
+from .search.extraction import schedule_extraction
+from .search.prefix import quick_search_index
+from .search import trigram, facets
+from .search.cache import global_search_cache, record_tags
+
+
+def sync_search_index(sender, verbosity=1, using=DEFAULT_DB_ALIAS, apps=None, **kwargs):
+    """
+    After migrations, create the search tables and index the records the
+    index is missing, so existing rows are searchable as soon as a deploy
+    finishes
+    """
+    if using != DEFAULT_DB_ALIAS:
+        return
+    try:
+        for model in {document.model for document in INDEXED_DOCUMENTS} | {SearchPosting, TrigramEntry}:
+            apps.get_model(model._meta.label)
+    except LookupError:
+        # Migrated back to before the search models existed
+        return
+    counts = get_backend().sync()
+    counts.update({f'{doc_type} trigram': count for doc_type, count in trigram.sync().items()})
+    if verbosity >= 1:
+        for doc_type, count in counts.items():
+            print(f"  Indexed {count} {doc_type} record(s) for search")
+
+
+def update_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Re-index a searchable record after it is saved"""
+    if raw:
+        return
+    document = get_document_for_model(sender)
+    # e.g. logins only touch last_login, which is not searchable
+    if update_fields is not None and not set(update_fields) & set(document.indexed_fields):
+        return
+    get_backend().index_instance(instance)
+    if document.suggest_fields:
+        # The in-memory index must not see writes that get rolled back
+        transaction.on_commit(lambda: quick_search_index.update(document, instance))
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    get_backend().remove_instance(instance)
+    document = get_document_for_model(sender)
+    if document.suggest_fields:
+        transaction.on_commit(lambda: quick_search_index.remove(document, instance))
+
+
+def invalidate_search_cache(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Evict cached searches that could include the record before or after the save"""
+    if raw:
+        return
+    document = get_document_for_model(sender)
+    if update_fields is not None and not set(update_fields) & set(document.indexed_fields):
+        return
+    tags = record_tags(document, instance)
+    previous = previous_values(instance)
+    if previous is not None:
+        tags |= record_tags(document, sender(**previous))
+    transaction.on_commit(lambda: global_search_cache.invalidate(tags))
+
+
+def invalidate_search_cache_on_delete(sender, instance, **kwargs):
+    tags = record_tags(get_document_for_model(sender), instance)
+    transaction.on_commit(lambda: global_search_cache.invalidate(tags))
+
+
+def _dependent_tags(model, instance, changed=None):
+    """
+    Tags of the cached results showing fields of ``instance`` through a
+    relation, limited to the relations whose shown fields are in ``changed``
+    """
+    tags = set()
+    for document in DOCUMENTS:
+        for relation, fields in document.embedded_fields.items():
+            if document.model._meta.get_field(relation).related_model is not model:
+                continue
+            if changed is not None and not set(fields) & changed:
+                continue
+            for record in document.get_queryset().filter(**{relation: instance}):
+                tags |= record_tags(document, record)
+    return tags
+
+
+def invalidate_dependent_search_results(sender, instance, created=False, raw=False, **kwargs):
+    """Evict cached searches showing a field the save changed, e.g. a tutor's username"""
+    if created or raw:
+        return
+    previous = previous_values(instance)
+    if previous is None:
+        return
+    changed = {field for field, value in previous.items() if getattr(instance, field) != value}
+    tags = _dependent_tags(sender, instance, changed) if changed else set()
+    if tags:
+        transaction.on_commit(lambda: global_search_cache.invalidate(tags))
+
+
+def invalidate_dependent_search_results_on_delete(sender, instance, **kwargs):
+    # Before the delete, while dependents still point at the record (SET_NULL skips their signals)
+    tags = _dependent_tags(sender, instance)
+    if tags:
+        transaction.on_commit(lambda: global_search_cache.invalidate(tags))
+
+
+def update_trigram_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    doc_type, fields = trigram.get_source(sender)
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    trigram.index_instance(instance)
+
+
+def remove_from_trigram_index(sender, instance, **kwargs):
+    trigram.remove_instance(instance)
+
+
+def update_book_facets(sender, instance, created=False, raw=False, **kwargs):
+    """Move the book's facet count to its new combination of facet values"""
+    if raw:
+        return
+    previous = previous_values(instance)
+    if not created and previous is None:
+        return
+    current = {field: getattr(instance, field) for field in facets.FACET_FIELDS}
+    facets.record_change(previous, current)
+
+
+def remove_from_book_facets(sender, instance, **kwargs):
+    facets.record_change({field: getattr(instance, field) for field in facets.FACET_FIELDS}, None)
+
+
+def extract_book_text(sender, instance, created=False, raw=False, **kwargs):
+    """Queue text extraction when a book gets a new PDF"""
+    if raw:
+        return
+    previous = previous_values(instance)
+    if created:
+        if not instance.pdf_file:
+            return
+    elif previous is None or previous['pdf_file'] == instance.pdf_file.name:
+        return
+    # Workers must only see committed books, and the request doesn't wait for them
+    transaction.on_commit(lambda: schedule_extraction(instance.pk))
+
+
+def refresh_home_content_on_change(sender, instance, raw=False, **kwargs):
+    """Rebuild the landing page payload and its snapshot once the change is committed"""
+    if raw:
+        return
+    transaction.on_commit(refresh_home_content)
+
+
+def count_user(sender, instance, created=False, raw=False, **kwargs):
+    """Keep the user counters of the statistics row current"""
+    if raw:
+        return
+    previous = previous_values(instance)
+    if created:
+        counters.record_user_change(None, instance.role)
+    elif previous is not None and previous['role'] != instance.role:
+        counters.record_user_change(previous['role'], instance.role)
+
+
+def uncount_user(sender, instance, **kwargs):
+    counters.record_user_change(instance.role, None)
+
+
+def count_enrollment(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = previous_values(instance)
+    if created:
+        counters.record_enrollment_change(None, instance.status)
+    elif previous is not None and previous['status'] != instance.status:
+        counters.record_enrollment_change(previous['status'], instance.status)
+
+
+def uncount_enrollment(sender, instance, **kwargs):
+    counters.record_enrollment_change(instance.status, None)
+
+
+def count_course(sender, instance, created=False, raw=False, **kwargs):
+    if created and not raw:
+        counters.record_course_change(1)
+
+
+def uncount_course(sender, instance, **kwargs):
+    counters.record_course_change(-1)
+
+
+for document in INDEXED_DOCUMENTS:
+    post_save.connect(update_search_index, sender=document.model, dispatch_uid=f'search_index_save_{document.doc_type}')
+    post_delete.connect(remove_from_search_index, sender=document.model, dispatch_uid=f'search_index_delete_{document.doc_type}')
+
+for document in DOCUMENTS:
+    track_previous_values(document.model, document.indexed_fields)
+    post_save.connect(invalidate_search_cache, sender=document.model, dispatch_uid=f'search_cache_save_{document.doc_type}')
+    post_delete.connect(invalidate_search_cache_on_delete, sender=document.model, dispatch_uid=f'search_cache_delete_{document.doc_type}')
+
+embedded = {}
+for document in DOCUMENTS:
+    for relation, fields in document.embedded_fields.items():
+        embedded.setdefault(document.model._meta.get_field(relation).related_model, set()).update(fields)
+for model, fields in embedded.items():
+    track_previous_values(model, fields)
+    post_save.connect(invalidate_dependent_search_results, sender=model, dispatch_uid=f'search_cache_dependents_save_{model._meta.model_name}')
+    pre_delete.connect(invalidate_dependent_search_results_on_delete, sender=model, dispatch_uid=f'search_cache_dependents_delete_{model._meta.model_name}')
+
+for doc_type, (model, fields) in trigram.TRIGRAM_SOURCES.items():
+    post_save.connect(update_trigram_index, sender=model, dispatch_uid=f'trigram_index_save_{doc_type}')
+    post_delete.connect(remove_from_trigram_index, sender=model, dispatch_uid=f'trigram_index_delete_{doc_type}')
+
+track_previous_values(Book, facets.FACET_FIELDS)
+post_save.connect(update_book_facets, sender=Book, dispatch_uid='book_facets_save')
+post_delete.connect(remove_from_book_facets, sender=Book, dispatch_uid='book_facets_delete')
+
+track_previous_values(Book, ['pdf_file'])
+post_save.connect(extract_book_text, sender=Book, dispatch_uid='book_text_extraction')
+
+for model in HOME_CONTENT_MODELS:
+    post_save.connect(refresh_home_content_on_change, sender=model, dispatch_uid=f'home_content_save_{model._meta.model_name}')
+    post_delete.connect(refresh_home_content_on_change, sender=model, dispatch_uid=f'home_content_delete_{model._meta.model_name}')
+
+for model in (News, Event, Testimonial, CampusLife, Book):
+    post_delete.connect(record_removal, sender=model, dispatch_uid=f'conditional_get_delete_{model._meta.model_name}')
+
+User = get_user_model()
+track_previous_values(User, ['role'])
+post_save.connect(count_user, sender=User, dispatch_uid='statistics_user_save')
+post_delete.connect(uncount_user, sender=User, dispatch_uid='statistics_user_delete')
+track_previous_values(Enrollment, ['status'])
+post_save.connect(count_enrollment, sender=Enrollment, dispatch_uid='statistics_enrollment_save')
+post_delete.connect(uncount_enrollment, sender=Enrollment, dispatch_uid='statistics_enrollment_delete')
+post_save.connect(count_course, sender=Course, dispatch_uid='statistics_course_save')
+post_delete.connect(uncount_course, sender=Course, dispatch_uid='statistics_course_delete')
@@ -1,3 +1,765 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from pypdf import PdfWriter
+from rest_framework.test import APITestCase
+
+from academics.models import Course, Assignment
+from config.excerpts import ExcerptField
+from users.models import CustomUser
+
+from .models import News, Event, Book, BookFacetCount, BookPage
+from .search.backends import (
+    PostingsBackend, SQLiteFTS5Backend, get_backend, search_documents, count_documents,
+    encode_cursor, decode_cursor, SearchHit,
+)
+from . import history, home
+from .counters import get_statistics
+from .search.documents import DOCUMENTS, get_document
+from .search.extraction import store_pages, clear_book_text, schedule_extraction
+from .search.pdf import extract_stored_pages
+from .search.benchmark import Corpus, ReferenceIndex
+from .search.cache import global_search_cache, query_tags
+from .search.concurrency import run_concurrently
+from .search import facets, trigram
+from .search.prefix import PrefixIndex
+from .search.text import tokenize, query_terms, MAX_QUERY_TERMS
+
+POSTINGS = 'communication.search.backends.PostingsBackend'
+FTS5 = 'communication.search.backends.SQLiteFTS5Backend'
+
+
+def fts5_available():
+    # Checked without Django's connection, which is not set up at import time
+    if connection.vendor != 'sqlite':
+        return False
+    options = sqlite3.connect(':memory:').execute('PRAGMA compile_options').fetchall()
+    return ('ENABLE_FTS5',) in options
+
+
+class SearchTextTests(TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize('Héllo, WORLD_wide 42!'), ['héllo', 'world_wide', '42'])
+        self.assertEqual(tokenize(None), [])
+
+    def test_query_terms_are_distinct_and_capped(self):
+        self.assertEqual(query_terms('data Data science'), ['data', 'science'])
+        self.assertEqual(len(query_terms(' '.join(f'term{i}' for i in range(20)))), MAX_QUERY_TERMS)
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor(SearchHit(12, 3.5))), (3.5, 12))
+        for cursor in ('not-base64!', encode_cursor(SearchHit('12', 1))):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+class BackendSelectionTests(TestCase):
+    @skipUnless(fts5_available(), "SQLite without FTS5")
+    def test_fts5_is_the_default_on_sqlite(self):
+        self.assertIsInstance(get_backend(), SQLiteFTS5Backend)
+
+    def test_setting_overrides_the_backend(self):
+        with override_settings(SEARCH_BACKEND=POSTINGS):
+            self.assertIsInstance(get_backend(), PostingsBackend)
+
+    def test_postings_without_fts5(self):
+        # What other databases and SQLite builds without FTS5 get
+        with mock.patch.object(SQLiteFTS5Backend, 'is_available', return_value=False), \
+                override_settings(SEARCH_BACKEND=None):
+            self.assertIsInstance(get_backend(), PostingsBackend)
+
+
+class SearchBackendTestsMixin:
+    """Behaviour every backend shares; subclasses pick the backend"""
+    backend_path = None
+
+    def setUp(self):
+        override = override_settings(SEARCH_BACKEND=self.backend_path)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def add_news(self, title, content='', published=True):
+        return News.objects.create(title=title, content=content, published=published)
+
+    def search(self, query, **kwargs):
+        results, next_cursor = search_documents('news', query, **kwargs)
+        return [news.title for news, highlights in results]
+
+    def test_prefix_terms_must_all_match(self):
+        self.add_news('Quantum physics lecture')
+        self.add_news('Quantum chemistry')
+        self.assertEqual(sorted(self.search('quan')), ['Quantum chemistry', 'Quantum physics lecture'])
+        self.assertEqual(self.search('quantum phys'), ['Quantum physics lecture'])
+        self.assertEqual(self.search('   '), [])
+
+    def test_field_weights_rank_titles_first(self):
+        self.add_news('Campus notes', content='A talk about robotics')
+        self.add_news('Robotics club opens')
+        self.assertEqual(self.search('robotics'), ['Robotics club opens', 'Campus notes'])
+
+    def test_fields_restrict_matching(self):
+        self.add_news('Campus notes', content='A talk about robotics')
+        self.add_news('Robotics club opens')
+        self.assertEqual(self.search('robotics', fields=['content']), ['Campus notes'])
+
+    def test_keyset_pages_cover_every_hit_once(self):
+        for number in range(7):
+            self.add_news(f'Library update {number}')
+        titles, after = [], None
+        while True:
+            results, next_cursor = search_documents('news', 'library', limit=3, after=after)
+            titles += [news.title for news, highlights in results]
+            if next_cursor is None:
+                break
+            after = decode_cursor(next_cursor)
+        self.assertEqual(sorted(titles), [f'Library update {number}' for number in range(7)])
+
+    def test_highlights_and_snippets(self):
+        words = ' '.join(f'word{i}' for i in range(60))
+        self.add_news('Scholarship <deadline>', content=f'{words} scholarship {words}')
+        [(news, highlights)] = search_documents('news', 'scholar')[0]
+        self.assertEqual(highlights['title'], '<mark>Scholarship</mark> &lt;deadline&gt;')
+        snippet = highlights['content']
+        self.assertIn('<mark>scholarship</mark>', snippet)
+        self.assertTrue(snippet.startswith('…') and snippet.endswith('…'))
+        self.assertLess(len(snippet), len(news.content))
+
+    def test_count_caps_to_an_estimate(self):
+        for number in range(5):
+            self.add_news(f'Sports day {number}')
+        self.assertEqual(count_documents('news', 'sports'), (5, False))
+        self.assertEqual(count_documents('news', 'sports', cap=3), (3, True))
+
+    def test_signals_maintain_the_index(self):
+        news = self.add_news('Orientation week')
+        self.assertEqual(self.search('orientation'), ['Orientation week'])
+
+        news.title = 'Welcome week'
+        news.save()
+        self.assertEqual(self.search('orientation'), [])
+        self.assertEqual(self.search('welcome'), ['Welcome week'])
+
+        news.published = False
+        news.save()
+        self.assertEqual(self.search('welcome'), [])
+
+        news.published = True
+        news.save()
+        news.delete()
+        self.assertEqual(self.search('welcome'), [])
+
+    def test_sync_indexes_records_missing_from_the_index(self):
+        News.objects.bulk_create([News(title=f'Graduation {number}', content='') for number in range(3)])
+        self.assertEqual(self.search('graduation'), [])
+        backend = get_backend()
+        self.assertEqual(backend.sync([get_document('news')]), {'news': 3})
+        self.assertEqual(len(self.search('graduation')), 3)
+        self.assertEqual(backend.sync([get_document('news')]), {})
+
+    def add_book(self, title, pages, is_available=True):
+        book = Book.objects.create(title=title, author='Author', pdf_file='books/pdfs/book.pdf', is_available=is_available)
+        store_pages(book.pk, book.pdf_file.name, pages)
+        return book
+
+    def search_pages(self, query, **kwargs):
+        results, next_cursor = search_documents('book_page', query, **kwargs)
+        return [(page.book.title, page.page_number) for page, highlights in results]
+
+    def test_stored_pages_are_replaced_in_bulk(self):
+        book = self.add_book('Optics', ['Light and lenses', '', 'More lenses'])
+        self.assertEqual(sorted(self.search_pages('lenses')), [('Optics', 1), ('Optics', 3)])
+
+        with CaptureQueriesContext(connection) as queries:
+            store_pages(book.pk, book.pdf_file.name, [f'Mirrors page {number}' for number in range(50)])
+        self.assertLess(len(queries), 15)
+        self.assertEqual(sum(query['sql'].startswith('DELETE FROM "communication_bookpage"') for query in queries), 1)
+        self.assertEqual(self.search_pages('lenses'), [])
+        self.assertEqual(len(self.search_pages('mirrors', limit=100)), 50)
+
+        clear_book_text(book.pk)
+        self.assertEqual(self.search_pages('mirrors'), [])
+        self.assertFalse(book.text_pages.exists())
+
+    def test_within_restricts_hits_before_the_page_is_cut(self):
+        self.add_book('Hidden', ['Atlas of maps'] * 3, is_available=False)
+        self.add_book('Shown', ['Atlas of maps'] * 3)
+        within = BookPage.objects.filter(book__is_available=True)
+        hits, after = [], None
+        while True:
+            results, next_cursor = search_documents('book_page', 'atlas', limit=2, after=after, within=within)
+            self.assertTrue(results)
+            hits += [page.book.title for page, highlights in results]
+            if next_cursor is None:
+                break
+            after = decode_cursor(next_cursor)
+        self.assertEqual(hits, ['Shown'] * 3)
+        self.assertEqual(count_documents('book_page', 'atlas', within=within), (3, False))
+
+
+class PostingsBackendTests(SearchBackendTestsMixin, TestCase):
+    backend_path = POSTINGS
+
+
+@skipUnless(fts5_available(), "SQLite without FTS5")
+class SQLiteFTS5BackendTests(SearchBackendTestsMixin, TestCase):
+    backend_path = FTS5
+
+
+class PrefixIndexTests(TestCase):
+    def setUp(self):
+        self.index = PrefixIndex(DOCUMENTS)
+
+    def titles(self, query):
+        return [suggestion['text'] for suggestion in self.index.suggest(query)]
+
+    def test_updates_patch_the_built_index(self):
+        self.index.rebuild()
+        document = get_document('news')
+        news = News.objects.create(title='Robotics fair', content='')
+        self.index.update(document, news)
+        self.assertEqual(self.titles('robo'), ['News: Robotics fair'])
+        self.index.remove(document, news)
+        self.assertEqual(self.titles('robo'), [])
+
+    def test_stale_index_is_refreshed_once_in_the_background(self):
+        News.objects.create(title='Robotics fair', content='')
+        self.index.rebuild()
+        self.index._built_at -= self.index.max_age + 1
+        started, release = threading.Event(), threading.Event()
+
+        def slow_rebuild():
+            started.set()
+            release.wait(5)
+
+        with mock.patch.object(self.index, 'rebuild', side_effect=slow_rebuild) as rebuild:
+            self.assertEqual(self.titles('robo'), ['News: Robotics fair'])
+            self.assertTrue(started.wait(5))
+            # Queries during the refresh use the current index and start no other rebuild
+            self.assertEqual(self.titles('robo'), ['News: Robotics fair'])
+            release.set()
+            for thread in threading.enumerate():
+                if thread.name == 'quick-search-refresh':
+                    thread.join(5)
+        self.assertEqual(rebuild.call_count, 1)
+        self.assertFalse(self.index._refreshing)
+
+
+class TrigramSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_misspellings_match_through_the_index(self):
+        course = Course.objects.create(code='PHY201', title='Thermodynamics', description='', subject='Physics')
+        [(object_id, similarity)] = trigram.search('course', 'thermodinamics')
+        self.assertEqual(object_id, course.pk)
+        self.assertGreaterEqual(similarity, trigram.DEFAULT_THRESHOLD)
+        self.assertEqual(trigram.search('course', 'zoology'), [])
+
+        course.title = 'Optics'
+        course.save()
+        self.assertEqual(trigram.search('course', 'thermodinamics'), [])
+        self.assertEqual([object_id for object_id, similarity in trigram.search('course', 'optiks')], [course.pk])
+        course.delete()
+        self.assertEqual(trigram.search('course', 'optiks'), [])
+
+    def test_within_restricts_candidates_before_the_limit(self):
+        for number in range(3):
+            Course.objects.create(code=f'OLD{number}', title='Thermodynamics', description='', subject='', is_active=False)
+        active = Course.objects.create(code='NEW', title='Thermodynamics lab', description='', subject='')
+        self.assertNotIn(active.pk, dict(trigram.search('course', 'thermodinamics', limit=1)))
+        matches = trigram.search('course', 'thermodinamics', limit=1, within=Course.objects.filter(is_active=True))
+        self.assertEqual([object_id for object_id, similarity in matches], [active.pk])
+
+    def test_book_search_ranks_only_available_books(self):
+        for _ in range(25):
+            Book.objects.create(title='Oceanography', author='Author', is_available=False)
+        Book.objects.create(title='Oceanography atlas', author='Author')
+        response = self.client.get(reverse('books-search'), {'q': 'oceanografy'})
+        self.assertEqual([book['title'] for book in response.data['results']], ['Oceanography atlas'])
+
+    def test_course_fallback_ranks_only_active_courses(self):
+        for number in range(12):
+            Course.objects.create(code=f'OLD{number}', title='Thermodynamics', description='', subject='', is_active=False)
+        Course.objects.create(code='NEW', title='Thermodynamics lab', description='', subject='')
+        response = self.client.get(reverse('global_search'), {'q': 'thermodinamics', 'type': 'courses'})
+        self.assertEqual([course['title'] for course in response.data['results']], ['Thermodynamics lab'])
+        self.assertTrue(response.data['fuzzy'])
+
+
+class SearchResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tutor = CustomUser.objects.create_user(username='tutor', email='tutor@example.com', role='tutor')
+        self.course = Course.objects.create(
+            code='BIO101', title='Genetics', description='', subject='Biology', tutor=self.tutor
+        )
+
+    def cache_results(self, query):
+        global_search_cache.set(query, 'admin', {'cached': True}, query_tags(query))
+
+    def assertCached(self, query, cached=True):
+        self.assertEqual(global_search_cache.get(query, 'admin') is not None, cached)
+
+    def test_cache_reads_and_writes_skip_the_database(self):
+        with self.assertNumQueries(0), mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            self.cache_results('genetics')
+            self.assertCached('genetics')
+        # New tag versions are written together
+        set_many.assert_called_once()
+
+    def test_renaming_a_related_record_evicts_results_showing_it(self):
+        Assignment.objects.create(
+            title='Lab report', description='', course=self.course, tutor=self.tutor,
+            due_date='2030-01-01T00:00:00Z', max_points=10,
+        )
+        self.cache_results('genetics')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tutor.email = 'new@example.com'
+            self.tutor.save()
+        self.assertCached('genetics')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tutor.username = 'renamed'
+            self.tutor.save()
+        self.assertCached('genetics', cached=False)
+
+        # The assignment result shows the course code
+        self.cache_results('lab')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.code = 'BIO201'
+            self.course.save()
+        self.assertCached('lab', cached=False)
+
+    def test_deleting_a_related_record_evicts_results_showing_it(self):
+        self.cache_results('genetics')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tutor.delete()
+        self.assertCached('genetics', cached=False)
+
+
+class SearchBenchmarkTests(TestCase):
+    def test_reference_answers_come_from_the_generated_words(self):
+        corpus = Corpus(30, seed=1)
+        corpus.generate()
+        reference = ReferenceIndex(corpus)
+        news = News.objects.filter(published=True).first()
+        word = news.title.split()[0].lower()
+        relevant = reference.global_answers('term', word)['news']
+        self.assertIn(news.pk, relevant)
+        self.assertEqual(relevant, {pk for pk, (searched, suggested) in corpus.labels['news'].items() if word in searched})
+        # Misspellings are judged by the word meant, hidden records never count
+        self.assertEqual(reference.global_answers('typo', word)['news'], relevant)
+        self.assertFalse(set(News.objects.filter(published=False).values_list('pk', flat=True)) & set(corpus.labels['news']))
+        self.assertEqual(set(reference.quick_answers('prefix', word[:3])), {'course', 'assignment', 'news'})
+
+    def test_command_reports_every_endpoint(self):
+        # The command builds its own database, so it runs outside the test database
+        finished = subprocess.run(
+            [sys.executable, 'manage.py', 'benchmark_search', '--size', '20', '--queries', '5', '--warmup', '1', '--json'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(finished.returncode, 0, finished.stderr)
+        report = json.loads(finished.stdout)
+        self.assertEqual(set(report['endpoints']), {'global', 'quick'})
+        for summary in report['endpoints'].values():
+            self.assertEqual(summary['requests'], 5)
+            self.assertIsNotNone(summary['recall']['all'])
+
+
+@override_settings(SEARCH_CONCURRENCY=6, SEARCH_WORKERS=1)
+class RunConcurrentlyTests(TestCase):
+    def sleeper(self, seconds, ran=None):
+        def task():
+            if ran is not None:
+                ran.append(True)
+            time.sleep(seconds)
+            return seconds
+        return task
+
+    def test_budget_starts_when_a_task_starts(self):
+        # With one worker the second task waits for the first one
+        results, timed_out, failed = run_concurrently({'a': self.sleeper(0.2), 'b': self.sleeper(0.2)}, timeout=0.3)
+        self.assertEqual((results, timed_out, failed), ({'a': 0.2, 'b': 0.2}, [], []))
+
+    def test_tasks_still_queued_after_the_budget_are_cancelled(self):
+        ran = []
+        results, timed_out, failed = run_concurrently({'a': self.sleeper(0.3), 'b': self.sleeper(0, ran)}, timeout=0.1)
+        self.assertEqual((results, timed_out, failed), ({}, ['a', 'b'], []))
+        time.sleep(0.3)
+        self.assertEqual(ran, [])
+
+    def test_failing_tasks_are_reported(self):
+        def fail():
+            raise RuntimeError("database table is locked")
+
+        for concurrency in (1, 6):
+            with self.subTest(concurrency=concurrency), override_settings(SEARCH_CONCURRENCY=concurrency), \
+                    self.assertLogs('communication.search.concurrency', 'ERROR'):
+                results, timed_out, failed = run_concurrently({'a': self.sleeper(0), 'b': fail}, timeout=1)
+                self.assertEqual((results, timed_out, failed), ({'a': 0}, [], ['b']))
+
+
+@override_settings(SEARCH_CONCURRENCY=1)
+class GlobalSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def add_news(self, number):
+        # Repeated titles give tied scores that the cursor must still order
+        return {News.objects.create(title=f'Chess {"club " * (i % 3)}news', content='').pk for i in range(number)}
+
+    def page(self, **params):
+        return self.client.get(reverse('global_search'), {'q': 'chess', 'type': 'news', **params})
+
+    def test_cursor_pages_cover_every_match_once(self):
+        expected = self.add_news(23)
+        seen, cursor, totals = [], None, []
+        while True:
+            response = self.page(page_size=5, **({'cursor': cursor} if cursor else {}))
+            self.assertEqual(response.status_code, 200)
+            seen += [result['id'] for result in response.data['results']]
+            totals.append((response.data['total'], response.data['total_is_estimate']))
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), expected)
+        self.assertEqual(set(totals), {(23, False)})
+
+    def test_count_is_capped(self):
+        self.add_news(12)
+        with self.settings(SEARCH_COUNT_CAP=10):
+            response = self.page(page_size=5)
+        self.assertEqual((response.data['total'], response.data['total_is_estimate']), (10, True))
+
+    def test_invalid_requests_are_rejected(self):
+        self.add_news(1)
+        for params in ({'cursor': 'not-a-cursor'}, {'cursor': encode_cursor(SearchHit('x', 1.0))}, {'page_size': 0}, {'type': 'nope'}):
+            with self.subTest(params=params):
+                response = self.page(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.data)
+
+    def test_failing_category_returns_a_partial_response(self):
+        News.objects.create(title='Chess tournament', content='')
+        Course.objects.create(code='CHS101', title='Chess openings', description='', subject='Games')
+        with mock.patch.object(get_document('course'), 'format_result', side_effect=RuntimeError), \
+                self.assertLogs('communication.search.concurrency', 'ERROR'):
+            response = self.client.get(reverse('global_search'), {'q': 'chess'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['partial'])
+        self.assertEqual(response.data['failed'], ['courses'])
+        self.assertEqual(len(response.data['results']['news']), 1)
+
+
+class BookContentSearchTests(APITestCase):
+    def test_hidden_books_do_not_shorten_anonymous_pages(self):
+        for title, is_available in (('Hidden', False), ('Shown', True)):
+            book = Book.objects.create(title=title, author='Author', pdf_file='books/pdfs/book.pdf', is_available=is_available)
+            store_pages(book.pk, book.pdf_file.name, ['Tide tables'] * 25)
+        response = self.client.get(reverse('books-content-search'), {'q': 'tide'})
+        [result] = response.data['results']
+        self.assertEqual(result['book']['title'], 'Shown')
+        self.assertEqual(len(result['pages']), 20)
+        response = self.client.get(reverse('books-content-search'), {'q': 'tide', 'cursor': response.data['next_cursor']})
+        self.assertEqual(len(response.data['results'][0]['pages']), 5)
+        self.assertIsNone(response.data['next_cursor'])
+
+
+class BookTextExtractionTests(TestCase):
+    def setUp(self):
+        self.storage = FileSystemStorage(location=tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.storage.location)
+        writer = PdfWriter()
+        writer.add_blank_page(width=72, height=72)
+        pdf = BytesIO()
+        writer.write(pdf)
+        self.pdf_name = self.storage.save('book.pdf', ContentFile(pdf.getvalue()))
+
+    def test_remote_files_are_read_by_the_worker(self):
+        book = Book.objects.create(title='Optics', author='Author', pdf_file='books/pdfs/remote.pdf')
+        executor = mock.Mock()
+        # A storage without local paths, which must not be read while scheduling
+        with mock.patch('django.core.files.storage.FileSystemStorage.path', side_effect=NotImplementedError), \
+                mock.patch('django.core.files.storage.FileSystemStorage.open') as read, \
+                mock.patch('communication.search.extraction._get_executor', return_value=executor):
+            schedule_extraction(book.pk)
+        read.assert_not_called()
+        function, storage, name = executor.submit.call_args.args
+        self.assertIs(function, extract_stored_pages)
+        self.assertEqual(name, 'books/pdfs/remote.pdf')
+        self.assertEqual(Book.objects.get(pk=book.pk).text_status, 'pending')
+
+    def test_workers_open_stored_files_themselves(self):
+        self.assertEqual(extract_stored_pages(self.storage, self.pdf_name), [''])
+
+
+class HomeContentTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        override = override_settings(HOME_CONTENT_SNAPSHOT_DIR=snapshot_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_changes_reach_other_workers(self):
+        # Each worker process has its own snapshot reader
+        other_worker = home.SnapshotReader()
+        etag = other_worker.get()['etag']
+        with self.captureOnCommitCallbacks(execute=True):
+            News.objects.create(title='Open day', content='', published=True)
+        self.assertNotEqual(other_worker.get()['etag'], etag)
+        self.assertEqual(other_worker.get()['payload']['news'][0]['title'], 'Open day')
+
+    def test_revalidation_needs_no_database(self):
+        etag = self.client.get(reverse('home-content'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home-content'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_content_is_not_recompressed(self):
+        home.publish_snapshot()
+        written = os.stat(home.snapshot_path('br')).st_mtime_ns
+        home.invalidate_home_content()
+        with mock.patch('time.time', return_value=time.time() + 60):
+            entry = home.publish_snapshot()
+        self.assertEqual(os.stat(home.snapshot_path('br')).st_mtime_ns, written)
+        with open(home.snapshot_path('identity') + '.meta') as f:
+            self.assertEqual(json.load(f), {'etag': entry['etag'], 'expires_at': entry['expires_at']})
+
+
+class StatisticsCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        snapshot_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(snapshot_dir.cleanup)
+        override = override_settings(HOME_CONTENT_SNAPSHOT_DIR=snapshot_dir.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_counter_changes_rebuild_the_snapshot_lazily(self):
+        get_statistics()
+        home.snapshot_reader.get()
+        with mock.patch.object(home, 'publish_snapshot', wraps=home.publish_snapshot) as publish, \
+                self.captureOnCommitCallbacks(execute=True):
+            CustomUser.objects.create_user(username='newcomer', email='new@example.com', role='student')
+        publish.assert_not_called()
+
+        statistics = home.snapshot_reader.get()
+        self.assertEqual(json.loads(statistics['bodies']['identity'])['statistics']['active_students'], 1)
+        self.assertFalse(os.path.exists(home.stale_marker_path()))
+
+    def test_admins_cannot_edit_counters(self):
+        admin = CustomUser.objects.create_user(username='admin', email='admin@example.com', role='admin', is_staff=True)
+        self.client.force_authenticate(admin)
+        statistics = get_statistics()
+        response = self.client.patch(reverse('statistics-detail', args=[statistics.pk]), {'total_users': 500})
+        self.assertEqual(response.status_code, 200)
+        statistics.refresh_from_db()
+        self.assertEqual(statistics.total_users, 1)
+
+
+class StatisticsHistoryTests(TestCase):
+    def add_user(self, username, joined, role='student'):
+        user = CustomUser.objects.create_user(username=username, email=f'{username}@example.com', role=role)
+        CustomUser.objects.filter(pk=user.pk).update(date_joined=joined)
+
+    def test_past_days_get_the_levels_of_their_end(self):
+        today = timezone.localdate()
+        past = today - timedelta(days=10)
+        self.add_user('early', timezone.now() - timedelta(days=20))
+        self.add_user('tutor', timezone.now() - timedelta(days=20), role='tutor')
+        self.add_user('late', timezone.now() - timedelta(days=2))
+
+        snapshot = history.record_day(past)
+        self.assertEqual((snapshot.total_users, snapshot.active_students, snapshot.tutors), (2, 1, 1))
+        self.assertIsNone(snapshot.active_enrollments)
+
+        snapshot = history.record_day()
+        self.assertEqual((snapshot.total_users, snapshot.active_students), (3, 2))
+        self.assertEqual(snapshot.active_enrollments, 0)
+
+
+class EventPaginationTests(APITestCase):
+    def test_pages_cover_undated_and_tied_events(self):
+        day = timezone.now() + timedelta(days=7)
+        for title, event_date in (('Fair', day), ('Concert', day), ('Talk', None), ('Gala', day + timedelta(days=1))):
+            Event.objects.create(title=title, content='', event_date=event_date)
+        titles, url = [], f"{reverse('events-list')}?page_size=1"
+        while url:
+            response = self.client.get(url)
+            titles += [event['title'] for event in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(titles, ['Gala', 'Concert', 'Fair', 'Talk'])
+
+        response = self.client.get(reverse('events-list'), {'fields': 'id,title', 'page_size': 1})
+        self.assertEqual([event['title'] for event in response.data['results']], ['Gala'])
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.older = News.objects.create(title='Open day', content='')
+        self.newer = News.objects.create(title='Robotics fair', content='')
+        self.list_url = reverse('news-list')
+        self.detail_url = reverse('news-detail', args=[self.newer.pk])
+
+    def get(self, url, **headers):
+        return self.client.get(url, headers=headers)
+
+    def test_matching_etag_gets_not_modified(self):
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url=url):
+                response = self.get(url)
+                self.assertEqual(response.status_code, 200)
+                revalidated = self.get(url, **{'If-None-Match': response['ETag']})
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.content, b'')
+                self.assertEqual(revalidated['ETag'], response['ETag'])
+
+    def test_updates_change_the_etag(self):
+        etags = {url: self.get(url)['ETag'] for url in (self.list_url, self.detail_url)}
+        self.newer.title = 'Robotics fair moved'
+        self.newer.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.get(url, **{'If-None-Match': etag})
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_deletes_change_the_list_validators(self):
+        response = self.get(self.list_url)
+        # Deleting the older record leaves MAX(updated_at) as it was
+        with mock.patch('config.conditional.timezone.now', return_value=timezone.now() + timedelta(hours=1)):
+            self.older.delete()
+        self.assertNotEqual(self.get(self.list_url)['ETag'], response['ETag'])
+        revalidated = self.get(self.list_url, **{'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertEqual([news['title'] for news in revalidated.data['results']], ['Robotics fair'])
+
+    def test_query_string_varies_the_etag(self):
+        response = self.get(self.list_url)
+        paged = self.client.get(self.list_url, {'page_size': 1})
+        self.assertNotEqual(paged['ETag'], response['ETag'])
+        self.assertEqual(self.client.get(self.list_url, {'page_size': 1}, headers={'If-None-Match': response['ETag']}).status_code, 200)
+        self.assertEqual(self.client.get(self.list_url, {'page_size': 1}, headers={'If-None-Match': paged['ETag']}).status_code, 304)
+
+
+class ExcerptTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.long = News.objects.create(title='Long', content='Tide tables ' * 50)
+        self.short = News.objects.create(title='Short', content='Brief note')
+
+    def test_excerpts_are_cut_at_the_length(self):
+        field = ExcerptField('content', length=10)
+        self.assertEqual(field.to_representation('Tide tables and more'), 'Tide table…')
+        self.assertEqual(field.to_representation('Tide table'), 'Tide table')
+        self.assertEqual(ExcerptField('content', length=5).to_representation('Tide tables'), 'Tide…')
+        self.assertIsNone(field.to_representation(None))
+
+    def test_list_sends_excerpts_and_retrieve_the_full_text(self):
+        results = {news['title']: news for news in self.client.get(reverse('news-list')).data['results']}
+        self.assertNotIn('content', results['Long'])
+        self.assertEqual(results['Long']['content_excerpt'], self.long.content[:200].rstrip() + '…')
+        self.assertEqual(results['Short']['content_excerpt'], 'Brief note')
+
+        detail = self.client.get(reverse('news-detail', args=[self.long.pk])).data
+        self.assertNotIn('content_excerpt', detail)
+        self.assertEqual(detail['content'], self.long.content)
+
+    def test_full_text_is_not_loaded_for_lists(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('news-list'))
+        [select] = [query['sql'] for query in queries if 'FROM "communication_news"' in query['sql'] and 'COUNT' not in query['sql']]
+        columns, excerpt = select.split(' FROM ')[0].split('SUBSTR')
+        self.assertEqual(excerpt, '("communication_news"."content", 1, 201) AS "content_excerpt"')
+        self.assertNotIn('"content"', columns)
+
+
+class PublicExpansionTests(APITestCase):
+    def test_anonymous_expansion_hides_private_user_fields(self):
+        author = CustomUser.objects.create_user(
+            username='editor', email='editor@example.com', first_name='Ada', last_name='Obi', role='admin'
+        )
+        News.objects.create(title='Open day', content='', author=author)
+        for params in ({'expand': 'author'}, {'expand': 'author', 'fields': 'id,author'}):
+            response = self.client.get(reverse('news-list'), params)
+            self.assertEqual(
+                response.data['results'][0]['author'],
+                {'id': author.pk, 'username': 'editor', 'display_name': 'Ada Obi'},
+            )
+
+
+class BookFacetTests(TestCase):
+    def add_book(self, genre=None, year=None, language='English', available=True):
+        return Book.objects.create(
+            title='Book', author='Author', genre=genre, publication_year=year,
+            language=language, is_available=available,
+        )
+
+    def counts(self, filters=None):
+        found, total = facets.facet_counts(filters or {})
+        return {field: {entry['value']: entry['count'] for entry in entries} for field, entries in found.items()}, total
+
+    def cells(self):
+        return sorted(BookFacetCount.objects.filter(book_count__gt=0).values_list(*facets.FACET_FIELDS, 'book_count'))
+
+    def test_books_without_values_share_one_cell(self):
+        self.add_book()
+        self.add_book(genre='')
+        self.add_book(genre='History', year=1990)
+        self.assertEqual(self.cells(), [('', 'English', 0, True, 2), ('History', 'English', 1990, True, 1)])
+        counts, total = self.counts()
+        self.assertEqual(total, 3)
+        self.assertEqual(counts['genre'], {'History': 1})
+        self.assertEqual(counts['publication_year'], {1990: 1})
+        self.assertEqual(counts['language'], {'English': 3})
+
+    def test_unset_cells_are_unique(self):
+        self.add_book()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            BookFacetCount.objects.create(genre='', language='English', publication_year=0, is_available=True)
+
+    def test_signals_move_books_between_cells(self):
+        book = self.add_book(genre='Fiction', year=2001)
+        self.add_book(genre='Fiction', year=2001, language='French')
+        book.genre = None
+        book.is_available = False
+        book.save()
+        counts, total = self.counts({'genre': {'Fiction'}})
+        self.assertEqual(total, 1)
+        # A facet's own filter does not narrow its counts
+        self.assertEqual(counts['genre'], {'Fiction': 1})
+        self.assertEqual(counts['language'], {'French': 1})
+        self.assertEqual(counts['is_available'], {True: 1})
+
+        book.delete()
+        self.assertEqual(self.cells(), [('Fiction', 'French', 2001, True, 1)])
+
+    def test_rebuild_matches_incremental_counts(self):
+        for genre, year in [(None, None), ('', None), ('Poetry', None), ('Poetry', 1850), (None, 1850)]:
+            self.add_book(genre=genre, year=year)
+        incremental = self.cells()
+        facets.rebuild()
+        self.assertEqual(self.cells(), incremental)
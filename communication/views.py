@@ -1,18 +1,36 @@
 # views.py
 
 from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Q
+from functools import partial
+import os
+from django.conf import settings
+from django.http import HttpResponse
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from .models import Statistics, News, Event, Testimonial, CampusLife, ContactMessage, Message, Notification, Announcement, Book
+from django.utils.dateparse import parse_date
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+from .models import Statistics, StatisticsSnapshot, News, Event, Testimonial, CampusLife, ContactMessage, Message, Notification, Book, BookPage
 from academics.models import Course, Assignment, ClassSchedule, Enrollment
+from config.conditional import ConditionalGetMixin
+from config.excerpts import ListSerializerMixin
+from config.sparse import SparseQuerysetMixin
+from . import history, home
+from .counters import get_statistics
+from .search.backends import search_documents, count_documents, decode_cursor
+from .search.cache import global_search_cache, query_tags
+from .search import trigram, facets
+from .search.concurrency import run_concurrently
+from .search.documents import DOCUMENTS, get_document
+from .search.prefix import quick_search_index
 from .serializers import (
-    StatisticsSerializer, NewsSerializer, EventSerializer, TestimonialSerializer,
-    CampusLifeSerializer, ContactMessageSerializer, MessageSerializer,
-    NotificationSerializer, AnnouncementSerializer, BookSerializer
+    StatisticsSerializer, StatisticsSnapshotSerializer, NewsSerializer, NewsListSerializer, EventSerializer,
+    EventListSerializer, TestimonialSerializer, CampusLifeSerializer, ContactMessageSerializer, MessageSerializer,
+    NotificationSerializer, AnnouncementSerializer, BookSerializer, BookListSerializer
 )
 
 User = get_user_model()
@@ -33,19 +51,60 @@ class StatisticsViewSet(viewsets.ModelViewSet):
         """
         Set permissions based on action
         """
-        if self.action == 'list':
+        if self.action in ['list', 'history']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
 
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        Statistics history for growth charts: ``?period=day|week|month``
+        with an optional ``start``/``end`` date range (YYYY-MM-DD)
+        """
+        period = request.query_params.get('period', 'day')
+        if period not in history.PERIODS:
+            return Response({
+                'error': f"Invalid period. Choose one of: {', '.join(history.PERIODS)}"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            end = self._date_param('end') or timezone.localdate()
+            start = self._date_param('start') or history.DEFAULT_RANGES[period](end)
+        except ValueError:
+            return Response({'error': 'Dates must be formatted YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({'error': 'start must not be after end'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        snapshots = StatisticsSnapshot.objects.filter(
+            period=period,
+            period_start__range=(history.period_start(start, period), end)
+        ).order_by('period_start')[:history.MAX_POINTS]
+        return Response({
+            'period': period,
+            'start': start,
+            'end': end,
+            'results': StatisticsSnapshotSerializer(snapshots, many=True).data
+        })
+
+    def _date_param(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise ValueError(value)
+        return parsed
 
-class NewsViewSet(viewsets.ModelViewSet):
+
+class NewsViewSet(ConditionalGetMixin, SparseQuerysetMixin, ListSerializerMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing news articles
     """
     queryset = News.objects.all()
     serializer_class = NewsSerializer
+    list_serializer_class = NewsListSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
@@ -67,21 +126,27 @@ class NewsViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, SparseQuerysetMixin, ListSerializerMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing events
     """
     queryset = Event.objects.all()
     serializer_class = EventSerializer
+    list_serializer_class = EventListSerializer
     permission_classes = [IsAuthenticated]
+    # Cursor pages are positioned on the leading field alone, so it can't be
+    # the nullable event_date: undated events sort by their creation time
+    ordering = ('-listed_date', '-id')
     
     def get_queryset(self):
         """
         Return only published events for non-admin users
         """
         if self.request.user.is_staff or self.request.user.is_superuser:
-            return Event.objects.all()
-        return Event.objects.filter(published=True)
+            events = Event.objects.all()
+        else:
+            events = Event.objects.filter(published=True)
+        return events.annotate(listed_date=Coalesce('event_date', 'created_at'))
     
     def get_permissions(self):
         """
@@ -94,7 +159,7 @@ class EventViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class TestimonialViewSet(viewsets.ModelViewSet):
+class TestimonialViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing testimonials
     """
@@ -121,7 +186,7 @@ class TestimonialViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class CampusLifeViewSet(viewsets.ModelViewSet):
+class CampusLifeViewSet(ConditionalGetMixin, SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing campus life images
     """
@@ -148,7 +213,7 @@ class CampusLifeViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class ContactMessageViewSet(viewsets.ModelViewSet):
+class ContactMessageViewSet(SparseQuerysetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing contact messages (admin only)
     """
@@ -173,47 +238,51 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
 @permission_classes([AllowAny])
 def get_home_content(request):
     """
-    Get content for the homepage (news, events, statistics, testimonials)
+    Get content for the homepage (news, events, statistics, testimonials).
+    Served from the snapshot; a matching If-None-Match gets a 304 without
+    touching the database.
     """
     try:
-        # Get latest statistics
-        latest_stats = Statistics.objects.first()
-        
-        # Get latest published news (limit to 3)
-        latest_news = News.objects.filter(published=True).order_by('-created_at')[:3]
-        
-        # Get upcoming events (limit to 3)
-        upcoming_events = Event.objects.filter(
-            published=True,
-            event_date__gte=timezone.now()
-        ).order_by('event_date')[:3]
-        
-        # Get approved testimonials (limit to 3)
-        testimonials = Testimonial.objects.filter(approved=True).order_by('-created_at')[:3]
-        
-        # Get campus life images (limit to 6)
-        campus_images = CampusLife.objects.filter(published=True).order_by('-created_at')[:6]
-        
-        # Serialize the data
-        stats_data = StatisticsSerializer(latest_stats).data if latest_stats else None
-        news_data = NewsSerializer(latest_news, many=True).data
-        events_data = EventSerializer(upcoming_events, many=True).data
-        testimonials_data = TestimonialSerializer(testimonials, many=True).data
-        campus_data = CampusLifeSerializer(campus_images, many=True).data
-        
-        return Response({
-            'statistics': stats_data,
-            'news': news_data,
-            'events': events_data,
-            'testimonials': testimonials_data,
-            'campus_life': campus_data
-        })
-        
+        entry = home.current_home_content()
     except Exception as e:
         return Response({
             'error': 'Failed to fetch home content',
             'details': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    response = get_conditional_response(request, etag=entry['etag'])
+    if response is None:
+        response = Response(entry['payload'])
+    response['ETag'] = entry['etag']
+    # Browsers may keep the payload but must revalidate it on every visit
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def home_content_snapshot(request):
+    """
+    Pre-rendered homepage content, answered from the in-memory copy of the
+    snapshot files without DRF or the ORM
+    """
+    snapshot = home.snapshot_reader.get()
+    encoding = home.choose_encoding(request.headers.get('Accept-Encoding', ''))
+    
+    response = get_conditional_response(request, etag=snapshot['etag'])
+    if response is None:
+        accel_prefix = settings.HOME_CONTENT_SNAPSHOT_ACCEL_PREFIX
+        if accel_prefix:
+            # The proxy streams the file itself
+            response = HttpResponse(content_type='application/json')
+            response['X-Accel-Redirect'] = accel_prefix + os.path.basename(home.snapshot_path(encoding))
+        else:
+            response = HttpResponse(snapshot['bodies'][encoding], content_type='application/json')
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+    response['ETag'] = snapshot['etag']
+    response['Vary'] = 'Accept-Encoding'
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
 
 
 @api_view(['GET'])
@@ -269,12 +338,12 @@ def dashboard_stats(request):
             ]
             
         elif user.role == 'admin':
-            # Admin stats
-            from users.models import CustomUser
-            stats['total_users'] = CustomUser.objects.count()
-            stats['total_students'] = CustomUser.objects.filter(role='student').count()
-            stats['total_tutors'] = CustomUser.objects.filter(role='tutor').count()
-            stats['total_courses'] = Course.objects.count()
+            # Admin stats, platform totals from the statistics row
+            statistics = get_statistics()
+            stats['total_users'] = statistics.total_users
+            stats['total_students'] = statistics.active_students
+            stats['total_tutors'] = statistics.tutors
+            stats['total_courses'] = statistics.courses
             stats['total_assignments'] = Assignment.objects.count()
             
             # Recent messages
@@ -305,7 +374,10 @@ def dashboard_stats(request):
 @permission_classes([AllowAny])
 def global_search(request):
     """
-    Global search endpoint that searches across multiple models
+    Global search endpoint that searches across multiple models.
+
+    ``?type=<category>`` pages through a single category: pass the category's
+    ``next_cursor`` as ``?cursor=`` to get the following ``page_size`` results.
     """
     query = request.GET.get('q', '').strip()
     
@@ -322,179 +394,149 @@ def global_search(request):
             'total_results': 0
         })
     
-    # Search courses
-    courses = Course.objects.filter(
-        Q(title__icontains=query) |
-        Q(code__icontains=query) |
-        Q(description__icontains=query) |
-        Q(subject__icontains=query),
-        is_active=True
-    ).select_related('tutor')[:10]
-    
-    course_results = []
-    for course in courses:
-        course_results.append({
-            'id': course.id,
-            'title': course.title,
-            'type': 'course',
-            'subtitle': f"{course.code} - {course.subject or 'General'}",
-            'description': course.description[:100] + '...' if course.description else '',
-            'tutor': course.tutor.username if course.tutor else 'Unassigned',
-            'url': f'/courses/{course.id}',
-            'match_highlights': {
-                'title': query if query.lower() in course.title.lower() else None,
-                'code': query if query.lower() in course.code.lower() else None
-            }
-        })
-    
-    # Search assignments
-    assignments = Assignment.objects.filter(
-        Q(title__icontains=query) |
-        Q(description__icontains=query) |
-        Q(instructions__icontains=query)
-    ).select_related('course', 'tutor')[:10]
-    
-    assignment_results = []
-    for assignment in assignments:
-        assignment_results.append({
-            'id': assignment.id,
-            'title': assignment.title,
-            'type': 'assignment',
-            'subtitle': f"{assignment.course.code} - {assignment.course.title}",
-            'description': assignment.description[:100] + '...' if assignment.description else '',
-            'tutor': assignment.tutor.username,
-            'due_date': assignment.due_date,
-            'url': f'/assignments/{assignment.id}',
-            'match_highlights': {
-                'title': query if query.lower() in assignment.title.lower() else None,
-                'description': query if query.lower() in (assignment.description or '').lower() else None
-            }
-        })
-    
-    # Search news
-    news = News.objects.filter(
-        Q(title__icontains=query) |
-        Q(content__icontains=query),
-        published=True
-    ).select_related('author')[:10]
-    
-    news_results = []
-    for article in news:
-        news_results.append({
-            'id': article.id,
-            'title': article.title,
-            'type': 'news',
-            'subtitle': f"Published {article.created_at.strftime('%B %d, %Y')}",
-            'description': article.content[:150] + '...' if article.content else '',
-            'author': article.author.username if article.author else 'Staff',
-            'image_url': article.get_image,
-            'url': f'/news/{article.id}',
-            'match_highlights': {
-                'title': query if query.lower() in article.title.lower() else None,
-                'content': query if query.lower() in article.content[:200].lower() else None
-            }
-        })
-    
-    # Search events
-    events = Event.objects.filter(
-        Q(title__icontains=query) |
-        Q(content__icontains=query) |
-        Q(location__icontains=query),
-        published=True
-    )[:10]
+    search_type = request.GET.get('type')
+    if search_type:
+        return _global_search_page(request, query, search_type)
     
-    event_results = []
-    for event in events:
-        event_results.append({
-            'id': event.id,
-            'title': event.title,
-            'type': 'event',
-            'subtitle': f"{event.location or 'TBD'} - {event.event_date.strftime('%B %d, %Y') if event.event_date else 'Date TBD'}",
-            'description': event.content[:150] + '...' if event.content else '',
-            'event_date': event.event_date,
-            'location': event.location,
-            'url': f'/events/{event.id}',
-            'match_highlights': {
-                'title': query if query.lower() in event.title.lower() else None,
-                'location': query if query.lower() in (event.location or '').lower() else None
-            }
-        })
-    
-    # Search users (for admin/staff)
-    users = User.objects.filter(
-        Q(username__icontains=query) |
-        Q(first_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(email__icontains=query)
-    )[:10]
-    
-    user_results = []
-    for user in users:
-        user_results.append({
-            'id': user.id,
-            'title': f"{user.first_name} {user.last_name}".strip() or user.username,
-            'type': 'user',
-            'subtitle': f"{user.role.title()} - {user.email}",
-            'description': f"Username: {user.username}",
-            'role': user.role,
-            'email': user.email,
-            'url': f'/users/{user.id}',
-            'match_highlights': {
-                'name': query if query.lower() in user.username.lower() or query.lower() in f"{user.first_name} {user.last_name}".lower() else None,
-                'email': query if query.lower() in user.email.lower() else None
-            }
-        })
+    role = request.user.role if request.user.is_authenticated else 'anonymous'
+    payload = global_search_cache.get(query, role)
+    if payload is None:
+        payload, tags = _run_global_search(query)
+        # Partial results are never cached, the next request retries the slow categories
+        if not payload['partial']:
+            global_search_cache.set(query, role, payload, tags)
     
-    # Search announcements
-    announcements = Announcement.objects.filter(
-        Q(title__icontains=query) |
-        Q(content__icontains=query),
-        published=True
-    ).select_related('admin')[:10]
+    return Response({
+        'query': query,
+        **payload,
+        'search_time': timezone.now().isoformat()
+    })
+
+
+SEARCH_PAGE_SIZE = 10
+SEARCH_MAX_PAGE_SIZE = 50
+
+
+def _global_search_page(request, query, search_type):
+    """
+    One page of a single global search category
+    """
+    documents = {document.result_key: document for document in DOCUMENTS}
+    document = documents.get(search_type)
+    if document is None:
+        return Response({
+            'error': f"Invalid type. Choose one of: {', '.join(documents)}"
+        }, status=status.HTTP_400_BAD_REQUEST)
     
-    announcement_results = []
-    for announcement in announcements:
-        announcement_results.append({
-            'id': announcement.id,
-            'title': announcement.title,
-            'type': 'announcement',
-            'subtitle': f"{announcement.target_audience.title()} - {announcement.created_at.strftime('%B %d, %Y')}",
-            'description': announcement.content[:150] + '...' if announcement.content else '',
-            'admin': announcement.admin.username,
-            'priority': announcement.priority,
-            'url': f'/announcements/{announcement.id}',
-            'match_highlights': {
-                'title': query if query.lower() in announcement.title.lower() else None,
-                'content': query if query.lower() in announcement.content[:200].lower() else None
-            }
-        })
+    cursor = request.GET.get('cursor') or None
+    after = None
+    try:
+        if cursor:
+            after = decode_cursor(cursor)
+        page_size = min(int(request.GET.get('page_size', SEARCH_PAGE_SIZE)), SEARCH_MAX_PAGE_SIZE)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if page_size < 1:
+        return Response({'error': 'page_size must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    role = request.user.role if request.user.is_authenticated else 'anonymous'
+    variant = f'{search_type}:{cursor}:{page_size}'
+    payload = global_search_cache.get(query, role, variant)
+    if payload is None:
+        page = _search_category(document, query, page_size=page_size, after=after)
+        payload = {
+            'type': search_type,
+            'results': page['results'],
+            'next_cursor': page['next_cursor'],
+            'total': page['total'],
+            'total_is_estimate': page['total_is_estimate'],
+            'fuzzy': page['fuzzy'],
+        }
+        fuzzy_types = [document.doc_type] if page['fuzzy'] else []
+        global_search_cache.set(query, role, payload, query_tags(query, fuzzy_types), variant)
     
-    # Compile results
-    results = {
-        'courses': course_results,
-        'assignments': assignment_results,
-        'news': news_results,
-        'events': event_results,
-        'users': user_results,
-        'announcements': announcement_results
+    return Response({
+        'query': query,
+        **payload,
+        'search_time': timezone.now().isoformat()
+    })
+
+
+def _run_global_search(query):
+    """
+    Search every category, returning the cacheable part of the response
+    and the cache tags it depends on
+    """
+    # Categories are searched concurrently, each within the timeout budget
+    tasks = {
+        document.result_key: partial(_search_category, document, query)
+        for document in DOCUMENTS
     }
+    completed, timed_out, failed = run_concurrently(tasks, settings.SEARCH_TIMEOUT_BUDGET)
+    
+    results = {}
+    totals = {}
+    next_cursors = {}
+    fuzzy_categories = []
+    fuzzy_types = []
+    for document in DOCUMENTS:
+        page = completed.get(document.result_key)
+        if page is None:
+            results[document.result_key] = []
+            continue
+        results[document.result_key] = page['results']
+        totals[document.result_key] = {'count': page['total'], 'is_estimate': page['total_is_estimate']}
+        next_cursors[document.result_key] = page['next_cursor']
+        if page['fuzzy']:
+            # Any record of the type could now enter this category, not just prefix matches
+            fuzzy_types.append(document.doc_type)
+            if page['results']:
+                fuzzy_categories.append(document.result_key)
     
     # Calculate total results
-    total_results = (
-        len(course_results) + 
-        len(assignment_results) + 
-        len(news_results) + 
-        len(event_results) + 
-        len(user_results) + 
-        len(announcement_results)
-    )
+    total_results = sum(total['count'] for total in totals.values())
     
-    return Response({
-        'query': query,
+    payload = {
         'results': results,
         'total_results': total_results,
-        'search_time': timezone.now().isoformat()
-    })
+        'total_is_estimate': any(total['is_estimate'] for total in totals.values()),
+        'totals': totals,
+        'next_cursors': next_cursors,
+        'fuzzy_categories': fuzzy_categories,
+        'partial': bool(timed_out or failed),
+        'timed_out': timed_out,
+        'failed': failed,
+    }
+    return payload, query_tags(query, fuzzy_types)
+
+
+def _search_category(document, query, page_size=SEARCH_PAGE_SIZE, after=None):
+    """
+    One page of ranked, formatted results of a category with its next
+    cursor and total, and whether the fuzzy fallback was used
+    """
+    hits, next_cursor = search_documents(document.doc_type, query, limit=page_size, after=after)
+    page = {
+        'results': [document.format_result(instance, highlights) for instance, highlights in hits],
+        'next_cursor': next_cursor,
+        'total': len(hits),
+        'total_is_estimate': False,
+        'fuzzy': False,
+    }
+    if next_cursor is not None or after is not None:
+        # A first page holding every match is its own exact total, anything else is counted
+        total, is_estimate = count_documents(document.doc_type, query, cap=settings.SEARCH_COUNT_CAP)
+        page.update(total=total, total_is_estimate=is_estimate)
+    
+    # Misspelled course codes and titles fall back to trigram similarity, first page only
+    if page['results'] or after is not None or document.doc_type not in trigram.TRIGRAM_SOURCES:
+        return page
+    # Restricted before the limit, so hidden records cannot crowd out visible ones
+    matches = trigram.search(document.doc_type, query, limit=page_size, within=document.get_queryset())
+    instances = document.fetch([object_id for object_id, similarity in matches])
+    page['results'] = [document.format_result(instance, {}) for instance in instances]
+    page.update(total=len(page['results']), fuzzy=True)
+    return page
 
 
 @api_view(['GET'])
@@ -508,46 +550,8 @@ def quick_search(request):
     if len(query) < 2:
         return Response({'suggestions': []})
     
-    suggestions = []
-    
-    # Course suggestions
-    course_suggestions = Course.objects.filter(
-        Q(title__icontains=query) |
-        Q(code__icontains=query),
-        is_active=True
-    )[:5]
-    
-    for course in course_suggestions:
-        suggestions.append({
-            'text': f"{course.code} - {course.title}",
-            'type': 'course',
-            'id': course.id
-        })
-    
-    # Assignment suggestions
-    assignment_suggestions = Assignment.objects.filter(
-        title__icontains=query
-    )[:3]
-    
-    for assignment in assignment_suggestions:
-        suggestions.append({
-            'text': f"Assignment: {assignment.title}",
-            'type': 'assignment',
-            'id': assignment.id
-        })
-    
-    # News suggestions
-    news_suggestions = News.objects.filter(
-        title__icontains=query,
-        published=True
-    )[:3]
-    
-    for article in news_suggestions:
-        suggestions.append({
-            'text': f"News: {article.title}",
-            'type': 'news',
-            'id': article.id
-        })
+    # Answered from the in-memory prefix index, no database round trip
+    suggestions = quick_search_index.suggest(query)
     
     return Response({
         'query': query,
@@ -555,12 +559,26 @@ def quick_search(request):
     })
 
 
-class BookViewSet(viewsets.ModelViewSet):
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def search_metrics(request):
+    """
+    Runtime metrics of the in-process search structures
+    """
+    return Response({
+        'quick_search_index': quick_search_index.metrics(),
+        'global_search_cache': global_search_cache.metrics()
+    })
+
+
+class BookViewSet(ConditionalGetMixin, SparseQuerysetMixin, ListSerializerMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing digital bookshelf books
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    list_serializer_class = BookListSerializer
+    list_actions = ('list', 'faceted')
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -568,19 +586,119 @@ class BookViewSet(viewsets.ModelViewSet):
         Return only available books for non-admin users
         """
         if self.request.user.is_staff or self.request.user.is_superuser:
-            return Book.objects.all()
-        return Book.objects.filter(is_available=True)
+            queryset = Book.objects.all()
+        else:
+            queryset = Book.objects.filter(is_available=True)
+        return facets.filter_books(queryset, getattr(self, 'facet_filters', {}))
 
     def get_permissions(self):
         """
         Set permissions based on action
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search', 'faceted', 'content_search']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAdminUser]
         return [permission() for permission in permission_classes]
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Typo-tolerant search over title, author and genre, ranked by trigram similarity
+        """
+        query = request.query_params.get('q', '').strip()
+        # Unavailable books are filtered before the top 20 is taken
+        queryset = self.get_queryset()
+        matches = trigram.search('book', query, limit=20, within=queryset)
+        books = queryset.select_related('uploaded_by').in_bulk([object_id for object_id, similarity in matches])
+
+        results = []
+        for object_id, similarity in matches:
+            if object_id in books:
+                data = self.get_serializer(books[object_id]).data
+                data['similarity'] = round(similarity, 3)
+                results.append(data)
+        return Response({'query': query, 'results': results})
+
+    @action(detail=False, methods=['get'])
+    def content_search(self, request):
+        """
+        Full-text search inside the extracted PDF pages, grouping page hits
+        with snippets under their book in rank order
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'query': query, 'results': [], 'next_cursor': None})
+        
+        cursor = request.query_params.get('cursor')
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Hidden books are filtered before the page is cut, so pages stay full
+        show_hidden = request.user.is_staff or request.user.is_superuser
+        within = None if show_hidden else BookPage.objects.filter(book__is_available=True)
+        hits, next_cursor = search_documents('book_page', query, limit=20, after=after, within=within)
+        
+        results = {}
+        for page, highlights in hits:
+            if page.book_id not in results:
+                results[page.book_id] = {
+                    'book': {
+                        'id': page.book.id,
+                        'title': page.book.title,
+                        'author': page.book.author,
+                        'cover_image_url': page.book.get_cover_image
+                    },
+                    'pages': []
+                }
+            results[page.book_id]['pages'].append(get_document('book_page').format_result(page, highlights))
+        
+        return Response({
+            'query': query,
+            'results': list(results.values()),
+            'next_cursor': next_cursor
+        })
+
+    def list(self, request, *args, **kwargs):
+        """
+        List books, filtered by ``genre``, ``language``, ``publication_year``
+        and ``is_available`` (each may be repeated)
+        """
+        try:
+            self.facet_filters = facets.parse_filters(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def faceted(self, request):
+        """
+        Filtered books together with the count of every filter value,
+        read from the precomputed facet counts
+        """
+        try:
+            self.facet_filters = facets.parse_filters(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Hidden books are neither listed nor counted for regular users
+        available_only = not (request.user.is_staff or request.user.is_superuser)
+        facet_counts, total = facets.facet_counts(self.facet_filters, available_only=available_only)
+        
+        books = self.filter_queryset(self.get_queryset().select_related('uploaded_by'))
+        page = self.paginate_queryset(books)
+        if page is not None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            response.data.update({'facets': facet_counts, 'total': total})
+            return response
+        return Response({
+            'results': self.get_serializer(books, many=True).data,
+            'facets': facet_counts,
+            'total': total
+        })
+
     def perform_create(self, serializer):
         """
         Set the uploaded_by field when creating a book
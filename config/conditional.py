@@ -0,0 +1,78 @@
+# config/conditional.py
+"""
+Conditional GET for model viewsets: list and detail responses carry an
+ETag and Last-Modified computed from cheap queries before anything is
+serialized, and matching ``If-None-Match``/``If-Modified-Since`` requests
+get an empty 304.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .pagination import OPT_OUT_HEADER
+
+
+def _removed_at_key(model):
+    return f'removed-at:{model._meta.label_lower}'
+
+
+def record_removal(sender, **kwargs):
+    """post_delete handler: deletions don't show in MAX(updated_at), so remember when the last one happened"""
+    cache.set(_removed_at_key(sender), timezone.now(), None)
+
+
+class ConditionalGetMixin:
+    """
+    Validators of a list are the MAX(``modified_field``) and COUNT of the
+    whole table, which change with every insert, update and delete, plus
+    the SQL of the filtered queryset and the query string, which tell apart
+    the views of the same table. A detail validator is the record's own
+    ``modified_field``. Records whose serialized data depends on related
+    rows are only revalidated when they are saved themselves.
+    """
+    modified_field = 'updated_at'
+
+    @property
+    def required_columns(self):
+        # Kept loaded when a sparse fieldset narrows the queryset
+        return (self.modified_field,)
+
+    def _etag(self, *parts):
+        parts += (
+            self.request.accepted_media_type,
+            self.request.META.get('QUERY_STRING', ''),
+            self.request.headers.get(OPT_OUT_HEADER, ''),
+        )
+        return f'"{hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:32]}"'
+
+    def _conditional_response(self, etag, last_modified, respond):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = respond()
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Staff see unpublished records, so responses depend on the token
+        patch_vary_headers(response, ('Authorization', OPT_OUT_HEADER))
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        version = queryset.model._default_manager.aggregate(modified=Max(self.modified_field), count=Count('pk'))
+        removed_at = cache.get(_removed_at_key(queryset.model))
+        last_modified = max(filter(None, (version['modified'], removed_at)), default=None)
+        etag = self._etag(queryset.query, version['modified'], version['count'])
+        return self._conditional_response(etag, last_modified, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        modified = getattr(instance, self.modified_field)
+        etag = self._etag(instance._meta.label_lower, instance.pk, modified.isoformat())
+        return self._conditional_response(etag, modified, lambda: Response(self.get_serializer(instance).data))
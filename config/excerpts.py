@@ -0,0 +1,66 @@
+# config/excerpts.py
+"""
+List/detail serializer split. List responses send short excerpts of large
+text columns, cut in SQL, and leave the full columns unloaded; retrieving a
+single record still returns the full text.
+"""
+from django.db.models.functions import Substr
+from rest_framework import serializers
+
+
+class ExcerptField(serializers.ReadOnlyField):
+    """
+    First ``length`` characters of the ``column`` text field, with an
+    ellipsis when the text is longer. The value is read from an annotation
+    named after the field, see ``with_excerpts``.
+    """
+    # Reads an annotation, not a model column (see config.sparse)
+    sparse_columns = ()
+
+    def __init__(self, column, length=200, **kwargs):
+        self.column = column
+        self.length = length
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if value is None or len(value) <= self.length:
+            return value
+        return value[:self.length].rstrip() + '…'
+
+
+def with_excerpts(queryset, serializer_class):
+    """Annotate the excerpts of ``serializer_class`` and defer their full columns"""
+    excerpts = {
+        name: field for name, field in serializer_class._declared_fields.items()
+        if isinstance(field, ExcerptField)
+    }
+    if not excerpts:
+        return queryset
+    # One character more than shown tells whether the text was cut
+    queryset = queryset.annotate(**{
+        name: Substr(field.column, 1, field.length + 1) for name, field in excerpts.items()
+    })
+    return queryset.defer(*{field.column for field in excerpts.values()})
+
+
+class ListSerializerMixin:
+    """
+    Viewset mixin serving ``list_serializer_class`` for the actions in
+    ``list_actions``, with its excerpts annotated on the queryset
+    """
+    list_serializer_class = None
+    list_actions = ('list',)
+
+    def _lists(self):
+        return self.list_serializer_class is not None and self.action in self.list_actions
+
+    def get_serializer_class(self):
+        if self._lists():
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self._lists():
+            queryset = with_excerpts(queryset, self.list_serializer_class)
+        return queryset
@@ -0,0 +1,51 @@
+# config/pagination.py
+"""
+Project-wide cursor pagination. Pages are keyed on each list's natural
+ordering with an id tiebreak, so deep pages cost the same as the first one
+and rows inserted while paging are neither skipped nor repeated.
+"""
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import CursorPagination
+
+# Clients that still expect a bare list send ``X-Pagination: off``
+OPT_OUT_HEADER = 'X-Pagination'
+
+
+def pagination_disabled(request):
+    return request.headers.get(OPT_OUT_HEADER, '').strip().lower() in ('off', 'false', '0')
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Views choose their ordering with an ``ordering`` attribute (default:
+    the model's ``Meta.ordering``, then newest first), or let clients pick
+    it through an ``OrderingFilter`` backend, and may override
+    ``page_size`` and ``max_page_size``. ``?page_size=`` picks a size up
+    to the maximum. The cursor holds the value of the leading ordering
+    field only, so that field must never be NULL.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', ()):
+            if issubclass(backend, OrderingFilter):
+                # The filter validates ``?ordering=`` against ``ordering_fields``
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = ordering or getattr(view, 'ordering', None) or queryset.model._meta.ordering or ('-id',)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            # Rows sharing the leading value still come back in a stable order
+            ordering += ('-id' if ordering[0].startswith('-') else 'id',)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if pagination_disabled(request):
+            return None
+        self.page_size = getattr(view, 'page_size', None) or self.__class__.page_size
+        self.max_page_size = getattr(view, 'max_page_size', None) or self.__class__.max_page_size
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,62 @@
+# config/sideload.py
+"""
+Compact, side-loaded list responses. With ``?compact=true`` rows keep only
+the ids of their related records, drop the fields copied from them (names,
+titles) and each referenced record is sent once in an ``included``
+dictionary, e.g. ``{"users": {"12": {...}}, "courses": {"3": {...}}}``.
+"""
+from rest_framework.response import Response
+
+COMPACT_PARAM = 'compact'
+
+
+def compact_requested(request):
+    return request is not None and request.query_params.get(COMPACT_PARAM, '').lower() in ('1', 'true', 'yes')
+
+
+def sideloaded_relations(serializer):
+    """``Meta.sideload_fields`` of a serializer: relation -> (included key, fields)"""
+    return getattr(getattr(serializer, 'Meta', None), 'sideload_fields', {})
+
+
+def included_records(rows, serializer):
+    """
+    The records ``rows`` refer to through the side-loaded relations the
+    serializer still shows, read with one query per included key
+    """
+    model = serializer.Meta.model
+    wanted = {}
+    for relation, (key, fields) in sideloaded_relations(serializer).items():
+        if relation not in serializer.fields:
+            continue
+        attname = model._meta.get_field(relation).attname
+        ids = {getattr(row, attname) for row in rows} - {None}
+        related_model = model._meta.get_field(relation).related_model
+        entry = wanted.setdefault(key, (related_model, set(), set()))
+        entry[1].update(ids)
+        entry[2].update(fields)
+
+    included = {}
+    for key, (related_model, ids, fields) in wanted.items():
+        records = related_model._default_manager.filter(pk__in=ids).values('pk', *sorted(fields))
+        included[key] = {record.pop('pk'): record for record in records}
+    return included
+
+
+class SideloadMixin:
+    """Viewset mixin answering ``?compact=true`` lists in the side-loaded format"""
+
+    def list(self, request, *args, **kwargs):
+        if not compact_requested(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+        serializer = self.get_serializer(rows, many=True)
+        data = serializer.data
+        included = included_records(rows, serializer.child)
+        if page is not None:
+            response = self.get_paginated_response(data)
+            response.data['included'] = included
+            return response
+        return Response({'results': data, 'included': included})
@@ -0,0 +1,66 @@
+# config/spa.py
+"""
+In-memory ``index.html`` of the React app with the data the first render
+needs injected, saving the SPA its initial API round trips.
+"""
+import os
+import threading
+
+from django.conf import settings
+from django.utils.html import json_script
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+# The SPA reads the data with JSON.parse(document.getElementById(...).textContent)
+BOOTSTRAP_ELEMENT_ID = 'initial-data'
+
+
+class IndexTemplate:
+    """
+    ``index.html`` split around ``</head>``, re-read only when the file's
+    modification time changes
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._parts = None
+
+    def parts(self):
+        """``(head, tail)`` of the page, or None when it hasn't been built"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        html = f.read()
+                    position = html.lower().rfind('</head>')
+                    if position == -1:
+                        position = 0
+                    self._parts = (html[:position], html[position:])
+                    self._mtime = mtime
+        return self._parts
+
+    def render(self, bootstrap):
+        parts = self.parts()
+        if parts is None:
+            return None
+        head, tail = parts
+        return f'{head}{json_script(bootstrap, BOOTSTRAP_ELEMENT_ID)}{tail}'
+
+
+def user_from_cookie(request):
+    """User of a valid access token in the ``AUTH_TOKEN_COOKIE`` cookie, or None"""
+    raw_token = request.COOKIES.get(settings.AUTH_TOKEN_COOKIE)
+    if not raw_token:
+        return None
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
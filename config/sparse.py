@@ -0,0 +1,143 @@
+# config/sparse.py
+"""
+Sparse fieldsets and field expansion. ``?fields=id,code,title`` keeps only
+the listed fields, ``?omit=description`` drops fields, and ``?expand=tutor``
+replaces a related id with the nested object. The viewset then loads only
+the columns and joins the remaining fields read.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .sideload import compact_requested, sideloaded_relations
+
+
+def _names(request, param):
+    value = request.query_params.get(param, '') if request is not None else ''
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin. ``Meta.expandable_fields`` maps a relation to the
+    serializer of its expanded form; ``Meta.field_sources`` lists the
+    model fields a method field or property reads (an empty list: none
+    besides the primary key); custom fields may list them in a
+    ``sparse_columns`` attribute instead. Only the top-level serializer of
+    a request follows the query parameters.
+    """
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_top_level():
+            return fields
+        request = self.context.get('request')
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        expand = _names(request, 'expand')
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            raise ValidationError({'expand': f"Cannot expand: {', '.join(unknown)}"})
+        for name in expand:
+            fields[name] = expandable[name](read_only=True)
+
+        if compact_requested(request):
+            # Values copied from side-loaded records are sent once in ``included``
+            sideloaded = sideloaded_relations(self)
+            fields = {
+                name: field for name, field in fields.items()
+                if not _reads_through(field.source or name, sideloaded)
+            }
+
+        keep, omit = _names(request, 'fields'), _names(request, 'omit')
+        unknown = [name for name in keep + omit if name not in fields]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+        if keep:
+            fields = {name: field for name, field in fields.items() if name in keep or name in expand}
+        for name in omit:
+            fields.pop(name)
+        return fields
+
+    def required_columns(self):
+        """ORM paths of the columns the selected fields read, for ``QuerySet.only()``"""
+        return serializer_columns(self)
+
+
+def _reads_through(source, relations):
+    relation, dot, attribute = source.partition('.')
+    return bool(dot) and relation in relations
+
+
+def serializer_columns(serializer, prefix=''):
+    """Columns a model serializer's fields read, as ORM paths under ``prefix``"""
+    model = serializer.Meta.model
+    sources = getattr(serializer.Meta, 'field_sources', {})
+    columns = set()
+    for name, field in serializer.fields.items():
+        if name in sources:
+            columns.update(prefix + column for column in sources[name])
+        elif hasattr(field, 'sparse_columns'):
+            columns.update(prefix + column for column in field.sparse_columns)
+        elif field.source == '*':
+            columns.update(_columns(model, [], prefix))
+        elif isinstance(field, serializers.ListSerializer):
+            # To-many relations are read with a query of their own
+            continue
+        elif isinstance(field, serializers.ModelSerializer):
+            # The relation (and any relation on the way to it) plus the nested fields' columns
+            attributes = field.source.split('.')
+            columns.update(prefix + '__'.join(attributes[:depth]) for depth in range(1, len(attributes) + 1))
+            columns.update(serializer_columns(field, f"{prefix}{'__'.join(attributes)}__"))
+        else:
+            columns.update(_columns(model, field.source.split('.'), prefix))
+    return columns
+
+
+def _columns(model, attributes, prefix=''):
+    """Columns of ``model`` needed to read the dotted ``attributes`` path"""
+    if attributes:
+        try:
+            field = model._meta.get_field(attributes[0])
+        except FieldDoesNotExist:
+            field = None
+        if field is not None and not field.concrete:
+            # Reverse and many-to-many relations are read with a query of their own
+            return set()
+        if field is not None and field.is_relation and len(attributes) > 1:
+            return {prefix + field.name} | _columns(field.related_model, attributes[1:], f'{prefix}{field.name}__')
+        if field is not None:
+            return {prefix + field.name}
+    # A property or method may read anything on the model
+    return {prefix + field.name for field in model._meta.concrete_fields}
+
+
+class SparseQuerysetMixin:
+    """
+    Viewset mixin for ``SparseFieldsetsMixin`` serializers: reads restrict
+    the queryset to the columns of the selected fields and join the
+    relations those fields traverse. Columns the view itself reads are
+    listed in ``required_columns``.
+    """
+    required_columns = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        request = self.request
+        narrowed = compact_requested(request) or any(_names(request, param) for param in ('fields', 'omit', 'expand'))
+        if request.method not in ('GET', 'HEAD') or not narrowed:
+            return queryset
+        serializer = self.get_serializer()
+        if not isinstance(serializer, SparseFieldsetsMixin):
+            return queryset
+        columns = serializer.required_columns() | set(self.required_columns)
+        if hasattr(self.paginator, 'get_ordering'):
+            # Cursor positions are read from the ordering fields; annotations are selected anyway
+            ordering = [field.lstrip('-') for field in self.paginator.get_ordering(request, queryset, self)]
+            columns.update(field for field in ordering if field not in queryset.query.annotations)
+        relations = {column.rsplit('__', 1)[0] for column in columns if '__' in column}
+        return queryset.select_related(None).select_related(*relations).only(*columns)
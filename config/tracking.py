@@ -0,0 +1,27 @@
+# config/tracking.py
+"""
+Gives post_save handlers access to the values a record had before it was
+saved, e.g. to move a counter from the old status to the new one.
+"""
+from django.db.models.signals import pre_save
+
+_tracked_fields = {}
+
+
+def track_previous_values(model, fields):
+    """Load ``fields`` of ``model`` rows from the database before each save"""
+    _tracked_fields.setdefault(model, set()).update(fields)
+    pre_save.connect(_remember_previous_values, sender=model, dispatch_uid=f'track_previous_{model._meta.label_lower}')
+
+
+def _remember_previous_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    fields = _tracked_fields[sender]
+    if raw or instance._state.adding or (update_fields is not None and not fields & set(update_fields)):
+        instance._previous_values = None
+        return
+    instance._previous_values = sender._base_manager.filter(pk=instance.pk).values(*fields).first()
+
+
+def previous_values(instance):
+    """Values loaded before the current save, or None for new records and untracked saves"""
+    return getattr(instance, '_previous_values', None)
@@ -2,7 +2,7 @@
 
 from rest_framework import routers
 from django.urls import path, include
-from users.views import UserViewSet, StudentProfileViewSet, RegisterView, stats, CustomTokenObtainPairView, CurrentUserView
+from users.views import UserViewSet, StudentProfileViewSet, RegisterView, stats, CustomTokenObtainPairView, CustomTokenRefreshView, LogoutView, CurrentUserView
 from academics.views import (
     CourseViewSet, AssignmentViewSet, EnrollmentViewSet, AssignmentSubmissionViewSet,
     ClassScheduleViewSet, AttendanceViewSet,
@@ -11,10 +11,9 @@ from academics.views import (
 )
 
 
-from communication.views import StatisticsViewSet, NewsViewSet, EventViewSet, TestimonialViewSet, CampusLifeViewSet, ContactMessageViewSet, BookViewSet, get_home_content, dashboard_stats, global_search, quick_search
+from communication.views import StatisticsViewSet, NewsViewSet, EventViewSet, TestimonialViewSet, CampusLifeViewSet, ContactMessageViewSet, BookViewSet, get_home_content, home_content_snapshot, dashboard_stats, global_search, quick_search, search_metrics
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
-    TokenRefreshView,
 )
 
 
@@ -42,11 +41,13 @@ urlpatterns = [
     path('', include(router.urls)),
     path('auth/register/', RegisterView.as_view(), name='register'),
     path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/logout/', LogoutView.as_view(), name='logout'),
     # Add endpoint for getting current user data
     path('auth/user/', CurrentUserView.as_view(), name='current_user'),
     path('stats/', stats, name='stats'),
     path('home-content/', get_home_content, name='home-content'),
+    path('home-content/snapshot/', home_content_snapshot, name='home-content-snapshot'),
     path('dashboard-stats/', dashboard_stats, name='dashboard-stats'),
     
     # Dashboard Analytics Endpoints
@@ -62,4 +63,5 @@ urlpatterns = [
     # Search Endpoints
     path('search/global/', global_search, name='global_search'),
     path('search/quick/', quick_search, name='quick_search'),
+    path('search/metrics/', search_metrics, name='search_metrics'),
 ]
@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -54,6 +57,9 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Cursor pages; send "X-Pagination: off" to get the whole list instead
+    'DEFAULT_PAGINATION_CLASS': 'config.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
 }
 
 CORS_ALLOWED_ORIGINS = [
@@ -70,6 +76,12 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# HttpOnly cookie holding the JWT access token, set by the login and refresh
+# endpoints and cleared by logout; when it is valid, the served index.html
+# embeds the user's profile.
+
+AUTH_TOKEN_COOKIE = 'access_token'
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     "corsheaders.middleware.CorsMiddleware",
@@ -157,6 +169,82 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Cache
+# Cached search results and their invalidation tags must be shared by every
+# worker process, so deployments with more than one set REDIS_URL (e.g.
+# redis://127.0.0.1:6379/1). Without it each process keeps its own cache in
+# memory, which only suits a single-process development server.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Search
+# Dotted path of the search backend class. When unset, SQLite FTS5 is used if
+# the database supports it, otherwise the portable postings index.
+
+SEARCH_BACKEND = None
+
+# Seconds before the per-process quick search prefix index is rebuilt, so
+# writes handled by other worker processes show up in autocomplete.
+
+QUICK_SEARCH_INDEX_MAX_AGE = 300
+
+# Seconds a global search result set stays cached (invalidated earlier on writes)
+
+SEARCH_CACHE_TIMEOUT = 300
+
+# The per-category queries of a global search run in parallel on a pool of
+# SEARCH_WORKERS threads per process (SEARCH_CONCURRENCY below 2 runs them
+# sequentially). Each category may take SEARCH_TIMEOUT_BUDGET seconds from
+# when it starts before the response is returned without it, flagged as
+# partial. The pool has room for four searches of six categories at once;
+# categories of further searches queue, and those still queued once the
+# budget has passed are dropped the same way.
+
+SEARCH_CONCURRENCY = 6
+SEARCH_WORKERS = SEARCH_CONCURRENCY * 4
+SEARCH_TIMEOUT_BUDGET = 0.5
+
+# Per-category search totals stop counting past this many matches and are
+# then reported as an estimate.
+
+SEARCH_COUNT_CAP = 1000
+
+# Worker processes extracting the text of uploaded book PDFs (below 1
+# extracts inline, in the process saving the book).
+
+PDF_EXTRACTION_WORKERS = 2
+
+# Home content
+# Upper bound in seconds on caching the landing page payload; it is dropped
+# earlier when its content changes or the next listed event starts.
+
+HOME_CONTENT_CACHE_TIMEOUT = 3600
+
+# Directory of the pre-rendered home content files (home-content.json plus
+# .gz/.br variants). Being under MEDIA_ROOT, the front proxy can serve them
+# from /media/snapshots/ directly.
+
+HOME_CONTENT_SNAPSHOT_DIR = MEDIA_ROOT / 'snapshots'
+
+# When set, the snapshot view only answers with an X-Accel-Redirect to this
+# internal location prefix and the proxy sends the file, e.g. '/protected/snapshots/'.
+
+HOME_CONTENT_SNAPSHOT_ACCEL_PREFIX = None
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -168,3 +256,5 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+
+CORS_ALLOW_HEADERS = (*default_headers, 'x-pagination')
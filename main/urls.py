@@ -15,15 +15,24 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import logging
+
 from django.contrib import admin
 from django.urls import path, include, re_path
 from django.http import JsonResponse, HttpResponse
 from django.conf import settings
 from django.conf.urls.static import static
+from django.db import DatabaseError
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from communication.home import current_home_content
+from config.spa import IndexTemplate, user_from_cookie
+from users.serializers import UserSerializer
 import os
 
+logger = logging.getLogger(__name__)
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def home(request):
@@ -32,14 +41,30 @@ def home(request):
         "status": "OK"
     })
 
+index_template = IndexTemplate(os.path.join(settings.STATIC_ROOT, 'index.html'))
+
 def serve_react_app(request):
-    """Serve the React app for all non-API routes"""
-    index_path = os.path.join(settings.STATIC_ROOT, 'index.html')
-    if os.path.exists(index_path):
-        with open(index_path, 'r') as f:
-            return HttpResponse(f.read(), content_type='text/html')
-    else:
+    """
+    Serve the React app for all non-API routes, with the homepage content and
+    the signed-in user's profile inlined so the first paint needs no API call
+    """
+    bootstrap = {'home_content': None, 'user': None}
+    try:
+        bootstrap['home_content'] = current_home_content()['payload']
+    except (DatabaseError, OSError, ValueError):
+        # The SPA fetches the content itself when it isn't inlined
+        logger.exception("Inlining the home content failed")
+    user = user_from_cookie(request)
+    if user is not None:
+        bootstrap['user'] = UserSerializer(user).data
+
+    html = index_template.render(bootstrap)
+    if html is None:
         return HttpResponse("React app not built. Please run 'npm run build' in the frontend directory.", status=404)
+    response = HttpResponse(html, content_type='text/html')
+    patch_vary_headers(response, ['Cookie'])
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 urlpatterns = [
     path('', serve_react_app),  # Serve React app for root
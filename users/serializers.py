@@ -21,6 +21,22 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "role"]
 
 
+# -------------------------------------
+# Public User Serializer
+# -------------------------------------
+class PublicUserSerializer(serializers.ModelSerializer):
+    """What anyone may see of a user, e.g. the author of public content"""
+    display_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = CustomUser
+        fields = ["id", "username", "display_name"]
+        field_sources = {"display_name": ["username", "first_name", "last_name"]}
+
+    def get_display_name(self, obj):
+        return obj.get_full_name() or obj.username
+
+
 # -------------------------------------
 # Student Profile Serializer
 # -------------------------------------
@@ -1,3 +1,61 @@
+from unittest import mock
+
+from django.conf import settings
+from django.db import DatabaseError
 from django.test import TestCase
+from django.urls import reverse
+
+from communication.search.backends import search_documents
+from .models import CustomUser
+
+
+class UserSearchIndexTests(TestCase):
+    def search(self, query):
+        return [user.username for user, highlights in search_documents('user', query)[0]]
+
+    def test_signals_maintain_the_index(self):
+        user = CustomUser.objects.create_user(username='jdoe', email='jdoe@example.com', first_name='Jane')
+        self.assertEqual(self.search('jane'), ['jdoe'])
+
+        user.first_name = 'Janet'
+        user.last_name = 'Okafor'
+        user.save()
+        self.assertEqual(self.search('okafor'), ['jdoe'])
+
+        user.delete()
+        self.assertEqual(self.search('okafor'), [])
+
+
+class AuthCookieTests(TestCase):
+    def setUp(self):
+        CustomUser.objects.create_user(username='jdoe', email='jdoe@example.com', password='secret-pass', role='tutor')
+
+    def test_login_sets_the_cookie_the_spa_page_reads(self):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'jdoe', 'password': 'secret-pass'})
+        cookie = response.cookies[settings.AUTH_TOKEN_COOKIE]
+        self.assertEqual(cookie.value, response.data['access'])
+        self.assertTrue(cookie['httponly'])
+        self.assertEqual(cookie['samesite'], 'Lax')
+
+        with mock.patch('main.urls.index_template.render', return_value='<html></html>') as render:
+            self.client.get('/courses/')
+        [(bootstrap,), kwargs] = render.call_args
+        self.assertEqual((bootstrap['user']['username'], bootstrap['user']['role']), ('jdoe', 'tutor'))
+
+        response = self.client.post(reverse('token_refresh'), {'refresh': response.data['refresh']})
+        self.assertEqual(response.cookies[settings.AUTH_TOKEN_COOKIE].value, response.data['access'])
+
+        self.client.post(reverse('logout'))
+        with mock.patch('main.urls.index_template.render', return_value='<html></html>') as render:
+            self.client.get('/courses/')
+        self.assertIsNone(render.call_args.args[0]['user'])
+
 
-# Create your tests here.
+class SpaPageTests(TestCase):
+    def test_page_is_served_without_the_home_content(self):
+        with mock.patch('main.urls.current_home_content', side_effect=DatabaseError), \
+                mock.patch('main.urls.index_template.render', return_value='<html></html>') as render, \
+                self.assertLogs('main.urls', 'ERROR'):
+            response = self.client.get('/courses/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(render.call_args.args[0]['home_content'])
@@ -9,8 +9,10 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from .models import CustomUser, StudentProfile, TutorProfile, AdminProfile, AlumniProfile
 from .serializers import UserSerializer, StudentProfileSerializer, TutorProfileSerializer, StaffProfileSerializer, AlumniProfileSerializer, UserRegistrationSerializer
-from academics.models import Course
-from rest_framework_simplejwt.views import TokenObtainPairView
+from communication.counters import get_statistics
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from django.conf import settings
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -20,9 +22,28 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user.is_authenticated and request.user.role == 'admin'
 
 
+def set_auth_cookie(response):
+    """
+    Copy a newly issued access token into the ``AUTH_TOKEN_COOKIE`` cookie,
+    which the server reads only to inline the profile into the served
+    ``index.html``; API calls keep using the Authorization header
+    """
+    token = response.data.get('access') if response.status_code == 200 else None
+    if token:
+        response.set_cookie(
+            settings.AUTH_TOKEN_COOKIE,
+            token,
+            max_age=int(jwt_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+            httponly=True,
+            samesite='Lax',
+            secure=not settings.DEBUG,
+        )
+    return response
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+        response = set_auth_cookie(super().post(request, *args, **kwargs))
         if response.status_code == 200:
             # Get the user from the token
             token = response.data.get('access')
@@ -37,6 +58,21 @@ class CustomTokenObtainPairView(TokenObtainPairView):
         return response
 
 
+class CustomTokenRefreshView(TokenRefreshView):
+    def post(self, request, *args, **kwargs):
+        return set_auth_cookie(super().post(request, *args, **kwargs))
+
+
+class LogoutView(APIView):
+    """Drop the access token cookie; JavaScript can't, as it is HttpOnly"""
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        response = Response(status=status.HTTP_204_NO_CONTENT)
+        response.delete_cookie(settings.AUTH_TOKEN_COOKIE, samesite='Lax')
+        return response
+
+
 # Add a view to get the current user
 class CurrentUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -53,6 +89,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = '-date_joined'
 
 
     def get_permissions(self):
@@ -124,14 +161,11 @@ class RegisterView(APIView):
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def stats(request):
-    active_students = CustomUser.objects.filter(role='student').count()
-    courses = Course.objects.count()
-    tutors = CustomUser.objects.filter(role='tutor').count()
-    # Success rate: hardcoded for now, could be calculated from enrollments
-    success_rate = 95
+    # Counters are maintained by signals, this reads a single row
+    statistics = get_statistics()
     return Response({
-        'active_students': active_students,
-        'courses': courses,
-        'tutors': tutors,
-        'success_rate': success_rate
+        'active_students': statistics.active_students,
+        'courses': statistics.courses,
+        'tutors': statistics.tutors,
+        'success_rate': statistics.success_rate
     })